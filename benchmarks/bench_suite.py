@@ -0,0 +1,484 @@
+"""
+Benchmark suite for the book, models, strategy and backtesters.
+
+    python benchmarks/bench_suite.py run [--quick] [--filter hawkes] [--output results.json]
+    python benchmarks/bench_suite.py run --save-baseline
+    python benchmarks/bench_suite.py compare [BASELINE] [CURRENT] [--threshold 0.15]
+
+Every workload is seeded, so two runs time identical work. Results are JSON
+with machine metadata (Python and library versions, CPU, git commit); a
+baseline is only meaningful on the machine that produced it, and `compare`
+warns when the metadata differ.
+"""
+import argparse
+import fnmatch
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Ensure src is in python path
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+from src.backtesting.engine import BacktestEngine
+from src.data_pipeline.lob_events import apply_event, generate_synthetic_events
+from src.data_pipeline.lob_loader import generate_initial_lob, simulate_lob_step
+from src.data_pipeline.lob_structure import LimitOrderBook
+from src.models.hawkes import HawkesProcess
+from src.strategy.avellaneda_stoikov import AvellanedaStoikovMarketMaker
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+SEED = 12345
+
+# name -> (function, params). Populated by @benchmark.
+BENCHMARKS = {}
+
+
+def benchmark(name, **params):
+    """
+    Register a benchmark. The function gets `params` and returns
+    (run, n_ops, unit): a zero-argument callable doing the timed work, and how
+    many operations one call performs. Params named in `scale` are divided by
+    10 with --quick.
+    """
+    def decorator(fn):
+        BENCHMARKS[name] = (fn, params)
+        return fn
+    return decorator
+
+
+def seed_all(seed=SEED):
+    random.seed(seed)
+    np.random.seed(seed)
+    return np.random.default_rng(seed)
+
+
+def _events(n, seed=SEED):
+    return generate_synthetic_events(n, seed=seed)
+
+
+def _apply_all(lob, events):
+    ts_col = events['timestamp'].tolist()
+    kind_col = events['kind'].tolist()
+    side_col = events['side'].tolist()
+    price_col = events['price'].tolist()
+    qty_col = events['quantity'].tolist()
+    for i in range(len(ts_col)):
+        apply_event(lob, kind_col[i], side_col[i], price_col[i], qty_col[i], ts_col[i] * 1e-9)
+    return lob
+
+
+# --- Book -------------------------------------------------------------------
+
+@benchmark('lob.add_order', n=100_000, scale=('n',))
+def bench_add_order(n):
+    rng = seed_all()
+    sides = np.where(rng.random(n) < 0.5, 'buy', 'sell').tolist()
+    offsets = rng.integers(1, 40, n)
+    prices = np.round(np.where(np.array(sides) == 'buy', 100 - offsets * 0.05, 100 + offsets * 0.05), 2).tolist()
+    qty = rng.integers(1, 100, n).tolist()
+
+    def run():
+        lob = LimitOrderBook()
+        for i in range(n):
+            lob.add_order(sides[i], prices[i], qty[i], 1.0)
+    return run, n, 'orders'
+
+
+@benchmark('lob.cancel_order', n=100_000, scale=('n',))
+def bench_cancel_order(n):
+    rng = seed_all()
+    levels = 40
+    prices = [round(100 - (i + 1) * 0.05, 2) for i in range(levels)]
+    picks = rng.integers(0, levels, n).tolist()
+
+    def run():
+        lob = LimitOrderBook()
+        for p in prices:
+            lob.add_order('buy', p, 10 ** 9, 1.0)
+        lob.add_order('sell', 100.05, 10 ** 9, 1.0)
+        for i in range(n):
+            lob.cancel_order('buy', prices[picks[i]], 1, 1.0)
+    return run, n, 'cancels'
+
+
+@benchmark('lob.get_depth', n=20_000, levels=10, book_levels=200, scale=('n',))
+def bench_get_depth(n, levels, book_levels):
+    seed_all()
+    lob = generate_initial_lob(mid_price=100.0, depth=book_levels)
+
+    def run():
+        for _ in range(n):
+            lob.get_depth(levels=levels)
+    return run, n, 'calls'
+
+
+@benchmark('lob.simulate_step', n=50_000, scale=('n',))
+def bench_simulate_step(n):
+    def run():
+        seed_all()
+        lob = generate_initial_lob(mid_price=100.0, depth=50)
+        for _ in range(n):
+            simulate_lob_step(lob)
+    return run, n, 'steps'
+
+
+@benchmark('lob.apply_events', n=200_000, scale=('n',))
+def bench_apply_events(n):
+    events = _events(n)
+
+    def run():
+        _apply_all(LimitOrderBook(), events)
+    return run, len(events), 'events'
+
+
+# --- Models -----------------------------------------------------------------
+
+def _hawkes_times(n, mu=1.0, alpha=0.5, beta=1.5, seed=SEED):
+    """Exact-recursion Hawkes sample of n events (fast; the model's own simulate is O(n^2))."""
+    rng = np.random.default_rng(seed)
+    times, t, excitation = np.empty(n), 0.0, 0.0
+    for i in range(n):
+        while True:
+            bound = mu + excitation
+            w = rng.exponential(1.0 / bound)
+            excitation *= np.exp(-beta * w)
+            t += w
+            if rng.random() * bound <= mu + excitation:
+                break
+        times[i] = t
+        excitation += alpha
+    return times
+
+
+for _n in (1_000, 10_000, 100_000):
+    @benchmark(f'hawkes.log_likelihood[n={_n}]', n=_n)
+    def bench_hawkes_ll(n):
+        times = _hawkes_times(n)
+        model = HawkesProcess(1.0, 0.5, 1.5)
+        return (lambda: model.log_likelihood(times)), n, 'events'
+
+for _n in (500, 2_000, 5_000):
+    @benchmark(f'hawkes.fit[n={_n}]', n=_n)
+    def bench_hawkes_fit(n):
+        times = _hawkes_times(n)
+
+        def run():
+            HawkesProcess(1.0, 0.3, 1.0).fit(times)
+        return run, n, 'events'
+
+for _T in (100, 500, 1_000):
+    @benchmark(f'hawkes.simulate[T={_T}]', T_max=_T)
+    def bench_hawkes_simulate(T_max):
+        model = HawkesProcess(1.0, 0.5, 1.5)
+
+        def run():
+            np.random.seed(SEED)
+            model.simulate(T_max)
+        np.random.seed(SEED)
+        n_events = max(len(model.simulate(T_max)), 1)
+        return run, n_events, 'events'
+
+
+@benchmark('indicators.ofi_stream', n=200_000, scale=('n',))
+def bench_ofi(n):
+    from src.models.indicators import OFIIndicator
+    events = _events(n)
+    # Book states are precomputed, so only the indicator is timed
+    lob = LimitOrderBook()
+    tops = []
+    for i, (kind, side, price, qty) in enumerate(zip(events['kind'].tolist(), events['side'].tolist(),
+                                                     events['price'].tolist(), events['quantity'].tolist())):
+        apply_event(lob, kind, side, price, qty, i)
+        tops.append((lob.best_bid, lob.bids.get(lob.best_bid, 0), lob.best_ask, lob.asks.get(lob.best_ask, 0)))
+
+    class _Top:
+        __slots__ = ('best_bid', 'best_ask', 'bids', 'asks')
+
+    states = []
+    for bid_p, bid_v, ask_p, ask_v in tops:
+        state = _Top()
+        state.best_bid, state.best_ask = bid_p, ask_p
+        state.bids, state.asks = {bid_p: bid_v}, {ask_p: ask_v}
+        states.append(state)
+
+    def run():
+        indicator = OFIIndicator()
+        for state in states:
+            indicator.on_book(state, 0.0)
+    return run, len(states), 'updates'
+
+
+@benchmark('indicators.vpin_stream', n=200_000, scale=('n',))
+def bench_vpin_stream(n):
+    from src.models.indicators import VPINIndicator
+    rng = seed_all()
+    prices = (100 + np.cumsum(rng.normal(0, 0.05, n))).tolist()
+    volumes = rng.integers(1, 500, n).tolist()
+
+    def run():
+        indicator = VPINIndicator(window=50)
+        for price, volume in zip(prices, volumes):
+            indicator.on_trade(price, volume, None, 0.0)
+    return run, n, 'trades'
+
+
+@benchmark('microstructure.vpin_array', n=1_000_000, scale=('n',))
+def bench_vpin_array(n):
+    from src.models.microstructure import calculate_vpin
+    rng = seed_all()
+    volume = rng.integers(1, 500, n).astype(np.float64)
+    price_change = rng.normal(0, 0.05, n)
+    calculate_vpin(volume[:10], price_change[:10], 0.05)  # scipy import outside the timing
+    return (lambda: calculate_vpin(volume, price_change, 0.05)), n, 'trades'
+
+
+# --- Strategy and backtests -------------------------------------------------
+
+@benchmark('strategy.quote', n=100_000, scale=('n',))
+def bench_quote(n):
+    rng = seed_all()
+    mids = (100 + np.cumsum(rng.normal(0, 0.1, n))).tolist()
+    inventories = rng.integers(-50, 50, n).tolist()
+    strategy = AvellanedaStoikovMarketMaker(gamma=0.1, k=1.5, T=1.0)
+
+    def run():
+        for i in range(n):
+            strategy.quote(mids[i], inventories[i], 2.0, 1.0 - i / n)
+    return run, n, 'quotes'
+
+
+@benchmark('backtest.engine_steps', n=20_000, scale=('n',))
+def bench_engine_steps(n):
+    """The dashboard's fixed-horizon A-S loop: mark, quote, Bernoulli fills."""
+    rng = seed_all()
+    prices = (100 + np.concatenate(([0.0], np.cumsum(rng.normal(0, 0.1, n))))).tolist()
+    draws = rng.random((n, 2)).tolist()
+
+    def run():
+        strategy = AvellanedaStoikovMarketMaker(gamma=0.1, k=1.5, T=1.0)
+        engine = BacktestEngine(initial_capital=100000, mark_interval_ms=0)
+        for i in range(n):
+            now = i * 1_000_000_000
+            engine.update_mid(prices[i], now)
+            quotes = strategy.quote(prices[i], engine.inventory, 2.0, 1.0 - i / n)
+            prob_fill = np.exp(-1.5 * quotes['spread'] / 2)
+            if draws[i][0] < prob_fill:
+                engine.process_fill('buy', quotes['bid'], 1, now)
+            if draws[i][1] < prob_fill:
+                engine.process_fill('sell', quotes['ask'], 1, now)
+        engine.calculate_metrics()
+    return run, n, 'steps'
+
+
+@benchmark('backtest.replay', n=100_000, scale=('n',))
+def bench_replay(n):
+    from src.backtesting.replay import ReplayBacktester
+    events = _events(n)
+
+    def run():
+        strategy = AvellanedaStoikovMarketMaker(gamma=0.1, k=20.0, T=1.0)
+        ReplayBacktester(strategy, BacktestEngine(initial_capital=100000, mark_interval_ms=100),
+                         sigma=0.05).run(events)
+    return run, len(events), 'events'
+
+
+@benchmark('backtest.vectorized', n_paths=1_000, n_steps=1_000, scale=('n_paths',))
+def bench_vectorized(n_paths, n_steps):
+    from src.backtesting.vectorized import run_vectorized_backtest
+    return (lambda: run_vectorized_backtest(n_paths=n_paths, n_steps=n_steps, seed=SEED)), \
+        n_paths * n_steps, 'path-steps'
+
+
+# --- Runner -----------------------------------------------------------------
+
+def machine_metadata():
+    import pandas
+    try:
+        import scipy
+        scipy_version = scipy.__version__
+    except ImportError:
+        scipy_version = None
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'numpy': np.__version__,
+        'pandas': pandas.__version__,
+        'scipy': scipy_version,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor() or None,
+        'cpu_count': os.cpu_count(),
+        'hostname': platform.node(),
+    }
+
+
+def time_benchmark(name, quick=False, repeat=5):
+    """Set up and time one benchmark; returns its result record."""
+    fn, params = BENCHMARKS[name]
+    params = dict(params)
+    scaled = params.pop('scale', ())
+    if quick:
+        params.update({key: max(params[key] // 10, 1) for key in scaled})
+    run, n_ops, unit = fn(**params)
+
+    run()  # warm-up: imports, caches, first-call allocations
+    times = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    # The best run is the least disturbed by the rest of the machine, so
+    # per-op figures (and comparisons) use it; the median is kept for reference
+    best = min(times)
+    return {
+        'params': params,
+        'n_ops': n_ops,
+        'unit': unit,
+        'repeat': repeat,
+        'times_s': times,
+        'median_s': float(np.median(times)),
+        'min_s': best,
+        'ops_per_second': n_ops / best if best > 0 else None,
+        'ns_per_op': best / n_ops * 1e9,
+    }
+
+
+def run_suite(pattern='*', quick=False, repeat=5):
+    names = [name for name in BENCHMARKS if fnmatch.fnmatch(name, pattern) or pattern in name]
+    results = {'metadata': machine_metadata(), 'quick': quick, 'benchmarks': {}}
+    for name in names:
+        result = time_benchmark(name, quick=quick, repeat=repeat)
+        results['benchmarks'][name] = result
+        print(f"{name:36s} {result['ops_per_second']:>14,.0f} {result['unit']}/s "
+              f"{result['ns_per_op']:>12,.0f} ns/op  (best of {repeat})")
+    return results
+
+
+def compare(baseline, current, threshold=0.15):
+    """
+    Print per-benchmark speed changes (ns/op of the best run) and return the names
+    that got slower than `threshold` (0.15 = 15%).
+    """
+    meta_keys = ('python', 'numpy', 'pandas', 'scipy', 'machine', 'processor', 'cpu_count', 'hostname')
+    differ = [key for key in meta_keys
+              if baseline['metadata'].get(key) != current['metadata'].get(key)]
+    if differ:
+        print(f"Warning: machine metadata differ ({', '.join(differ)}); timings may not be comparable.")
+    if baseline.get('quick') != current.get('quick'):
+        print("Warning: comparing a --quick run with a full run.")
+
+    regressions = []
+    print(f"{'benchmark':36s} {'baseline':>12s} {'current':>12s} {'change':>8s}")
+    for name, result in current['benchmarks'].items():
+        base = baseline['benchmarks'].get(name)
+        if base is None:
+            print(f"{name:36s} {'-':>12s} {result['ns_per_op']:>10,.0f}ns {'new':>8s}")
+            continue
+        change = result['ns_per_op'] / base['ns_per_op'] - 1.0
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        elif change < -threshold:
+            flag = '  faster'
+        print(f"{name:36s} {base['ns_per_op']:>10,.0f}ns {result['ns_per_op']:>10,.0f}ns "
+              f"{change:>+8.1%}{flag}")
+    not_run = [name for name in baseline['benchmarks'] if name not in current['benchmarks']]
+    if not_run:
+        print(f"{len(not_run)} baseline benchmark(s) not in this run")
+    return regressions
+
+
+def _load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save(results, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LOB benchmark suite")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_cmd = commands.add_parser('run', help="run benchmarks and write JSON results")
+    run_cmd.add_argument('--filter', default='*', help="glob or substring of benchmark names")
+    run_cmd.add_argument('--quick', action='store_true', help="10x smaller workloads")
+    run_cmd.add_argument('--repeat', type=int, default=5)
+    run_cmd.add_argument('--output', help="results JSON (default: benchmarks/results/<timestamp>.json)")
+    run_cmd.add_argument('--save-baseline', action='store_true', help="also store as the baseline")
+    run_cmd.add_argument('--compare', action='store_true', help="compare with the baseline afterwards")
+    run_cmd.add_argument('--threshold', type=float, default=0.15)
+
+    cmp_cmd = commands.add_parser('compare', help="flag regressions of a result file against a baseline")
+    cmp_cmd.add_argument('baseline', nargs='?', default=DEFAULT_BASELINE)
+    cmp_cmd.add_argument('current', nargs='?', help="results JSON (default: latest in benchmarks/results)")
+    cmp_cmd.add_argument('--threshold', type=float, default=0.15)
+
+    commands.add_parser('list', help="list benchmark names")
+    args = parser.parse_args(argv)
+
+    results_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+    if args.command == 'list':
+        print('\n'.join(BENCHMARKS))
+        return 0
+
+    if args.command == 'run':
+        results = run_suite(args.filter, quick=args.quick, repeat=args.repeat)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        _save(results, args.output or os.path.join(results_dir, f"{stamp}.json"))
+        if args.save_baseline:
+            _save(results, DEFAULT_BASELINE)
+        if args.compare:
+            if not os.path.exists(DEFAULT_BASELINE):
+                print(f"No baseline at {DEFAULT_BASELINE}; run with --save-baseline first.")
+                return 1
+            return 1 if compare(_load(DEFAULT_BASELINE), results, args.threshold) else 0
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline first.")
+        return 1
+    current = args.current
+    if current is None:
+        candidates = sorted(os.listdir(results_dir)) if os.path.isdir(results_dir) else []
+        if not candidates:
+            print(f"No results in {results_dir}; run the suite first.")
+            return 1
+        current = os.path.join(results_dir, candidates[-1])
+    regressions = compare(_load(args.baseline), _load(current), args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print("No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,118 +2,190 @@ import streamlit as st
 import sys
 import os
 import time
+import uuid
 import pandas as pd
 import numpy as np
 
 # Ensure src is in python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.visualization.lob_plots import plot_lob_snapshot, plot_spread_evolution, plot_depth_chart
-# Person 1 Integration: Import Data Pipeline
-from src.data_pipeline.lob_structure import LimitOrderBook
-from src.data_pipeline.lob_loader import generate_initial_lob, simulate_lob_step
-from src.models.hawkes import HawkesProcess
-from src.visualization.hawkes_plots import plot_intensity
+# Only what every page needs is imported here. Page- and job-specific modules
+# (plotting, sensitivity with matplotlib/seaborn, ...) are imported where they
+# are first used, so a cold start does not pay for pages the user never opens.
+# Person 1 Integration: live book simulation
+from src.live.workers import MarketSimulationWorker, ReplayPlayer, JobRunner
+from src.live.multi_symbol import DEFAULT_SYMBOLS, MultiSymbolFeed
 # Person 3 & 1 Integration: Strategy & Backtesting
 from src.strategy.avellaneda_stoikov import AvellanedaStoikovMarketMaker
 from src.backtesting.engine import BacktestEngine
-from src.visualization.backtest_plots import create_equity_curve, create_drawdown_chart
-# Person 4: Microstructure & Analysis
-from src.models.microstructure import calculate_ofi_step, calculate_vpin, estimate_price_impact
-from src.analysis.sensitivity import run_sensitivity_analysis
+from src.analysis.result_cache import ResultCache
+from src.analysis import latency
 
 st.set_page_config(page_title="LOB Analyzer", layout="wide")
 
 st.title("Limit Order Book Dynamics & Market Microstructure")
 
-# Initialize Session State
-if 'lob' not in st.session_state:
-    st.session_state.lob = generate_initial_lob(mid_price=100.0, depth=50)
-if 'spread_history' not in st.session_state:
-    st.session_state.spread_history = []
-if 'timestamp_history' not in st.session_state:
-    st.session_state.timestamp_history = []
-# Microstructure Metrics History
-if 'ofi_history' not in st.session_state:
-    st.session_state.ofi_history = []
-if 'vpin_history' not in st.session_state:
-    st.session_state.vpin_history = []
-if 'price_history' not in st.session_state:
-    st.session_state.price_history = []
-if 'volume_history' not in st.session_state:
-    st.session_state.volume_history = []
+# Backtests and sensitivity grids are memoized on disk across reruns and sessions
+results_cache = ResultCache()
+
+def run_single_backtest(gamma, k, T, sigma, initial_capital, sim_steps, seed, progress=None):
+    """A-S backtest on a random-walk mid; returns metrics and the marked-to-mid equity curve."""
+    rng = np.random.default_rng(seed)
+    strategy = AvellanedaStoikovMarketMaker(gamma=gamma, k=k, T=T)
+    engine = BacktestEngine(initial_capital=initial_capital, mark_interval_ms=0)
+    
+    # Generate price path
+    prices = 100.0 + np.concatenate(([0.0], np.cumsum(rng.normal(0, 0.1, sim_steps))))
+    fill_draws = rng.random((sim_steps, 2))
+    
+    for i in range(sim_steps):
+        current_time = i * 1_000_000_000  # one step per second, in ns
+        current_price = float(prices[i])
+        time_left = max(0, T - (i/sim_steps)*T)
+        
+        engine.update_mid(current_price, current_time)
+        quotes = strategy.quote(current_price, engine.inventory, sigma, time_left)
+        prob_fill = np.exp(-k * quotes['spread'] / 2)
+        
+        if fill_draws[i, 0] < prob_fill: engine.process_fill('buy', quotes['bid'], 1, current_time)
+        if fill_draws[i, 1] < prob_fill: engine.process_fill('sell', quotes['ask'], 1, current_time)
+        
+        if progress is not None and i % max(1, sim_steps // 100) == 0: progress((i+1)/sim_steps)
+    
+    return {
+        'metrics': engine.calculate_metrics(),
+        'final_capital': engine.capital,
+        'offsets_ns': engine.equity.column('timestamp').copy(),
+        'equity': engine.pnl_history.copy(),
+    }
+
+def backtest_job(progress, **params):
+    # Identical inputs (params, seed, code version) are served from the cache;
+    # run_single_backtest lives in this file, so it is part of the code version
+    result = results_cache.get_or_compute(
+        'dashboard_backtest', lambda **p: run_single_backtest(progress=progress, **p),
+        code_files=(__file__,), **params)
+    return dict(result, params=params)
+
+def sensitivity_job(progress):
+    from src.analysis.sensitivity import run_sensitivity_analysis
+    return run_sensitivity_analysis(cache=results_cache, write_outputs=False, progress=progress)
+
+# Background workers live for the whole server process, not per rerun: the
+# simulator advances the book at its own rate and the UI only reads snapshots.
+# They are server-global (st.cache_resource), so every browser session sees the
+# same simulated market, symbol feeds, replay players and latency
+# instrumentation, and their controls change them for everyone. Controls are
+# applied only when a session changes them, so sessions don't reset each other
+# on every rerun. Jobs share one runner but are tagged with the session id.
+@st.cache_resource
+def get_market_worker():
+    return MarketSimulationWorker(steps_per_second=10, depth=50, history=1000, max_points=300).start()
+
+@st.cache_resource
+def get_job_runner():
+    return JobRunner()
+
+# One feed process per symbol, started on first use of the grid
+@st.cache_resource
+def get_symbol_feed():
+    return MultiSymbolFeed(DEFAULT_SYMBOLS, levels=10, steps_per_second=10, history=300).start()
+
+# One player per event file version; opening builds (or loads) the snapshot index
+@st.cache_resource
+def get_replay_player(path, mtime_ns):
+    from src.data_pipeline.event_store import EventStore
+    return ReplayPlayer(EventStore(path), speed=10, history=1000, max_points=300).start()
+
+def synthetic_day_job(path, n_events, seed, progress):
+    from src.data_pipeline.lob_events import generate_synthetic_events, save_events
+    progress(0.0, "generating events")
+    events = generate_synthetic_events(n_events, seed=seed)
+    progress(0.9, "saving")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    save_events(path, events)
+    return path
+
+market_worker = get_market_worker()
+job_runner = get_job_runner()
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+
+def session_job(name):
+    """Job name scoped to this browser session, so sessions never see each other's results."""
+    return f"{name}@{st.session_state.session_id}"
+
+def apply_feed_rate():
+    get_market_worker().set_rate(st.session_state.feed_rate)
+
+def apply_simulate():
+    if st.session_state.simulate:
+        get_market_worker().resume()
+    else:
+        get_market_worker().pause()
+
+def apply_instrumentation():
+    if st.session_state.instrument:
+        latency.enable()
+    else:
+        latency.disable()
+
+def show_job_status(job):
+    """Progress bar and cancel button for a queued/running job."""
+    st.progress(job.progress)
+    st.caption(f"{job.status} {job.message} ({job.elapsed:.1f}s)")
+    if st.button("Cancel", key=f"cancel-{job.id}"):
+        job_runner.cancel(job)
 
 # Sidebar
 st.sidebar.header("Settings")
-stock_symbol = st.sidebar.selectbox("Select Stock", ["RELIANCE", "TCS", "INFY", "MOCK-DATA"])
+stock_symbol = st.sidebar.selectbox("Select Stock", list(DEFAULT_SYMBOLS))
 refresh_rate = st.sidebar.slider("Refresh Rate (seconds)", 1, 60, 2)
 auto_refresh = st.sidebar.checkbox("Enable Auto-Refresh", value=False)
+# Shared controls start from the shared state the first time a session renders them
+st.session_state.setdefault('feed_rate', min(max(int(market_worker.steps_per_second), 1), 200))
+st.session_state.setdefault('simulate', market_worker.running)
+st.session_state.setdefault('instrument', latency.is_enabled())
+feed_rate = st.sidebar.slider("Feed Rate (updates/second)", 1, 200, key='feed_rate', on_change=apply_feed_rate)
+simulate = st.sidebar.checkbox("Run Market Simulation", key='simulate', on_change=apply_simulate)
+instrument = st.sidebar.checkbox("Latency Instrumentation", key='instrument', on_change=apply_instrumentation,
+                                 help="Time book, strategy, engine and indicator hot paths")
+st.sidebar.caption("Feed rate, simulation, replay and instrumentation are shared by every "
+                   "session connected to this server.")
 
 # Navigation
-page = st.sidebar.radio("Navigate", ["Dashboard", "Backtest & Sensitivity", "Technical Report"])
+page = st.sidebar.radio("Navigate", ["Dashboard", "Multi-Symbol Grid", "Historical Replay",
+                                     "Backtest & Sensitivity", "Latency", "Technical Report"])
+# Pages showing a moving market poll quickly while visible
+live_view = False
 
 if page == "Dashboard":
-    # Simulate Data Update
-    if auto_refresh or st.button("Manual Refresh"):
-        prev_lob = st.session_state.lob
-        st.session_state.lob = simulate_lob_step(st.session_state.lob)
-        
-        # Calculate Metrics
-        current_time = pd.Timestamp.now()
-        spread = st.session_state.lob.get_spread()
-        mid_price = st.session_state.lob.get_mid_price()
-        
-        # OFI
-        ofi = calculate_ofi_step(prev_lob, st.session_state.lob)
-        
-        # VPIN (Simplified for real-time)
-        # We need trade volume, here we simulate it or derive from LOB changes (limited accuracy without trade tape)
-        # For demo, we use random trade volume logic or LOB volume delta
-        trade_vol = np.abs(np.random.normal(100, 20)) # Mock trade volume for VPIN demo
-        price_change = mid_price - (st.session_state.price_history[-1] if st.session_state.price_history else mid_price)
-        
-        # Store for VPIN calc (needs window)
-        st.session_state.price_history.append(mid_price)
-        st.session_state.volume_history.append(trade_vol)
-        
-        if len(st.session_state.price_history) > 50:
-             prices = pd.Series(st.session_state.price_history[-50:])
-             volumes = pd.Series(st.session_state.volume_history[-50:])
-             sigma = prices.pct_change().std()
-             v_buy, v_sell = calculate_vpin(volumes, prices.diff(), sigma) # This returns vectors
-             # VPIN is aggregated metric
-             vpin_val = (np.abs(v_buy - v_sell).sum()) / (v_buy + v_sell).sum()
-             st.session_state.vpin_history.append(vpin_val)
-        else:
-             st.session_state.vpin_history.append(0.5) # Default neutral
-
-        if spread:
-            st.session_state.spread_history.append(spread)
-            st.session_state.timestamp_history.append(current_time)
-            st.session_state.ofi_history.append(ofi)
-            
-            # Keep history manageable
-            if len(st.session_state.spread_history) > 100:
-                st.session_state.spread_history.pop(0)
-                st.session_state.timestamp_history.pop(0)
-                st.session_state.ofi_history.pop(0)
-                st.session_state.vpin_history.pop(0)
+    from src.visualization.lob_plots import plot_lob_snapshot, plot_spread_evolution
+    
+    # The book advances in the background worker; a rerun only reads its latest snapshot
+    st.button("Manual Refresh")
+    snap = market_worker.snapshot()
+    history = snap['history']
+    latest = snap['latest']
+    if market_worker.error:
+        st.error(f"Simulation worker stopped:\n{market_worker.error}")
+    st.caption(f"{snap['n_steps']} book updates simulated at {market_worker.steps_per_second:.0f}/s")
 
     # Layout
     col1, col2 = st.columns(2)
     with col1:
         st.subheader("Order Book Snapshot")
-        depth_bids, depth_asks = st.session_state.lob.get_depth(levels=20)
         lob_data = {
-            'bids': pd.DataFrame(list(depth_bids.items()), columns=['price', 'volume']),
-            'asks': pd.DataFrame(list(depth_asks.items()), columns=['price', 'volume'])
+            'bids': pd.DataFrame(list(snap['bids'].items()), columns=['price', 'volume']),
+            'asks': pd.DataFrame(list(snap['asks'].items()), columns=['price', 'volume'])
         }
         fig_lob = plot_lob_snapshot(lob_data) 
         st.plotly_chart(fig_lob, use_container_width=True)
 
     with col2:
         st.subheader("Spread Evolution")
-        fig_spread = plot_spread_evolution(st.session_state.timestamp_history, st.session_state.spread_history)
+        spread_times, spreads = history['spread']
+        fig_spread = plot_spread_evolution(pd.to_datetime(spread_times, unit='s'), spreads)
         st.plotly_chart(fig_spread, use_container_width=True)
 
     st.subheader("Microstructure Indicators")
@@ -121,23 +193,169 @@ if page == "Dashboard":
     
     with m_col1:
         st.markdown("**Order Flow Imbalance (OFI)**")
-        st.line_chart(pd.Series(st.session_state.ofi_history, name="OFI").tail(100))
+        st.line_chart(pd.Series(history['ofi'][1], name="OFI"))
         
     with m_col2:
         st.markdown("**VPIN (Flow Toxicity)**")
-        st.line_chart(pd.Series(st.session_state.vpin_history, name="VPIN").tail(100))
+        st.line_chart(pd.Series(history['vpin'][1], name="VPIN"))
+
+    m_col1, m_col2 = st.columns(2)
+    
+    with m_col1:
+        st.markdown("**Depth Imbalance (Top 5 Levels)**")
+        st.line_chart(pd.Series(history['depth_imbalance'][1], name="Depth Imbalance"))
+        
+    with m_col2:
+        st.markdown("**Hawkes Trade Intensity**")
+        st.line_chart(pd.Series(history['hawkes_intensity'][1], name="Intensity"))
+        
+    m_col1, m_col2 = st.columns(2)
+    
+    with m_col1:
+        st.markdown("**Mid Price**")
+        mid_times, mids = history['mid']
+        st.line_chart(pd.Series(mids, index=pd.to_datetime(mid_times, unit='s'), name="Mid"))
+        
+    with m_col2:
+        st.markdown("**Trade Volume**")
+        st.bar_chart(pd.Series(history['trade_volume'][1], name="Volume"))
         
     # Stats
     st.write("---")
-    m_col1, m_col2, m_col3 = st.columns(3)
+    m_col1, m_col2, m_col3, m_col4 = st.columns(4)
     with m_col1:
-        st.metric("Mid Price", f"{st.session_state.lob.get_mid_price():.2f}")
+        st.metric("Mid Price", f"{snap['mid']:.2f}")
     with m_col2:
-        st.metric("Spread", f"{st.session_state.lob.get_spread():.2f}")
+        microprice = latest.get('microprice')
+        st.metric("Microprice", f"{microprice if microprice is not None else snap['mid']:.2f}")
     with m_col3:
-        st.metric("Recent Volatility", f"{st.session_state.lob.get_volatility():.4f}")
+        st.metric("Spread", f"{snap['spread']:.2f}")
+    with m_col4:
+        realized_vol = latest.get('realized_vol')
+        st.metric("Realized Volatility", f"{realized_vol or 0.0:.5f}")
+
+elif page == "Multi-Symbol Grid":
+    from src.visualization.lob_plots import plot_lob_snapshot
+
+    symbol_feed = get_symbol_feed()
+    if st.session_state.get('symbol_feed_rate') != feed_rate:
+        symbol_feed.set_rate(feed_rate)
+        st.session_state.symbol_feed_rate = feed_rate
+    live_view = simulate
+    snaps = symbol_feed.snapshots()
+    stopped = [name for name, alive in symbol_feed.alive.items() if not alive]
+    if stopped:
+        st.error(f"Feed processes stopped: {', '.join(stopped)}")
+    st.caption(f"{len(snaps)} symbols, one feed process each, "
+               f"{feed_rate} updates/s per symbol (sidebar Feed Rate)")
+
+    grid_cols = 3
+    names = list(snaps)
+    for row in range(0, len(names), grid_cols):
+        cols = st.columns(grid_cols)
+        for col, name in zip(cols, names[row:row + grid_cols]):
+            snap = snaps[name]
+            with col:
+                mid, spread = snap['mid'], snap['spread']
+                st.metric(name, f"{mid:.2f}" if mid is not None else "-",
+                          f"spread {spread:.2f}" if spread is not None else None, delta_color="off")
+                st.line_chart(pd.Series(snap['mid_history'], name="Mid"), height=120)
+                st.caption(f"{snap['n_updates']:,} updates")
+
+    # The sidebar symbol selects the detailed book below the grid
+    st.subheader(f"{stock_symbol} Order Book")
+    snap = snaps[stock_symbol]
+    lob_data = {
+        'bids': pd.DataFrame(list(snap['bids'].items()), columns=['price', 'volume']),
+        'asks': pd.DataFrame(list(snap['asks'].items()), columns=['price', 'volume'])
+    }
+    st.plotly_chart(plot_lob_snapshot(lob_data), use_container_width=True)
+
+elif page == "Historical Replay":
+    from src.visualization.lob_plots import plot_lob_snapshot, plot_spread_evolution
+
+    st.markdown("Scrub through a recorded event file: seeking rebuilds the book from the "
+                "nearest indexed snapshot plus deltas, playback runs at N x event-time speed.")
+    events_path = st.text_input("Event file (.npy or .csv)", value=".cache/replay/synthetic_day.npy")
+
+    if not os.path.exists(events_path):
+        st.warning("Event file not found.")
+        gen_col1, gen_col2 = st.columns(2)
+        with gen_col1:
+            n_events = st.number_input("Synthetic events", value=1_000_000, step=100_000, min_value=10_000)
+        with gen_col2:
+            gen_seed = st.number_input("Seed", value=42, step=1)
+        gen_job = job_runner.latest(session_job('synthetic_day'))
+        if gen_job is not None and not gen_job.done:
+            show_job_status(gen_job)
+        elif st.button("Generate Synthetic Day"):
+            job_runner.submit(session_job('synthetic_day'), synthetic_day_job, events_path, int(n_events), int(gen_seed))
+            st.experimental_rerun()
+        elif gen_job is not None and gen_job.status == 'failed':
+            st.error(gen_job.error)
+    else:
+        with st.spinner("Opening event file (the snapshot index is built once per file)..."):
+            player = get_replay_player(events_path, os.stat(events_path).st_mtime_ns)
+        store = player.store
+        if player.error:
+            st.error(f"Replay stopped:\n{player.error}")
+
+        duration = (store.end_ns - store.start_ns) / 1e9
+        ctl1, ctl2, ctl3, ctl4 = st.columns([4, 1, 1, 1])
+        with ctl1:
+            target = st.slider("Seek (seconds from start)", 0.0, max(duration, 1.0), 0.0, step=1.0)
+        with ctl2:
+            if st.button("Seek"):
+                player.seek_time(store.start_ns + int(target * 1e9))
+        with ctl3:
+            st.selectbox("Speed", [1, 10, 60, 300, 1000], index=1, format_func=lambda x: f"{x}x",
+                         key='replay_speed', on_change=lambda: player.set_speed(st.session_state.replay_speed))
+        with ctl4:
+            if player.playing:
+                if st.button("Pause"):
+                    player.pause()
+            elif st.button("Play"):
+                player.play()
+
+        snap = player.snapshot()
+        history = snap['history']
+        live_view = player.playing
+        status = (f"t = {(snap['time_ns'] - store.start_ns) / 1e9:,.1f}s of {duration:,.0f}s | "
+                  f"event {snap['position']:,} of {snap['n_events']:,} | "
+                  f"last seek {snap['seek_seconds'] * 1e3:.0f} ms")
+        if snap['lagging']:
+            status += f" | falling behind {player.speed:.0f}x"
+        st.caption(status)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.subheader("Order Book")
+            lob_data = {
+                'bids': pd.DataFrame(list(snap['bids'].items()), columns=['price', 'volume']),
+                'asks': pd.DataFrame(list(snap['asks'].items()), columns=['price', 'volume'])
+            }
+            st.plotly_chart(plot_lob_snapshot(lob_data), use_container_width=True)
+        with col2:
+            st.subheader("Spread")
+            spread_times, spreads = history['spread']
+            st.plotly_chart(plot_spread_evolution(pd.to_datetime(spread_times, unit='s'), spreads),
+                            use_container_width=True)
+
+        # All panels read the same snapshot, so they always show the same instant
+        m_col1, m_col2 = st.columns(2)
+        with m_col1:
+            st.markdown("**Order Flow Imbalance (OFI)**")
+            ofi_times, ofi = history['ofi']
+            st.line_chart(pd.Series(ofi, index=pd.to_datetime(ofi_times, unit='s'), name="OFI"))
+        with m_col2:
+            st.markdown("**VPIN (Flow Toxicity)**")
+            vpin_times, vpin = history['vpin']
+            st.line_chart(pd.Series(vpin, index=pd.to_datetime(vpin_times, unit='s'), name="VPIN"))
 
 elif page == "Backtest & Sensitivity":
+    from src.backtesting.metrics import bootstrap_metrics
+    from src.visualization.backtest_plots import create_equity_curve, create_drawdown_chart
+    
     st.header("Strategy Backtesting & Sensitivity Analysis")
     
     tab1, tab2 = st.tabs(["Single Backtest", "Sensitivity Analysis"])
@@ -154,65 +372,98 @@ elif page == "Backtest & Sensitivity":
             initial_capital = st.number_input("Initial Capital", 10000, 1000000, 100000)
             sim_steps = st.slider("Simulation Steps", 100, 5000, 1000)
 
+        seed = st.number_input("Random Seed", 0, 1_000_000, 42)
+
         if st.button("Run Backtest"):
-            strategy = AvellanedaStoikovMarketMaker(gamma=gamma, k=k_param, T=T_param)
-            engine = BacktestEngine(initial_capital=initial_capital)
-            
-            mid_price = 100.0
-            prices = [mid_price]
-            # Generate price path
-            for _ in range(sim_steps):
-                prices.append(prices[-1] + np.random.normal(0, 0.1))
-                
-            progress_bar = st.progress(0)
-            for i in range(sim_steps):
-                current_time = pd.Timestamp.now() + pd.Timedelta(seconds=i)
-                current_price = prices[i]
-                time_left = max(0, T_param - (i/sim_steps)*T_param)
-                
-                quotes = strategy.quote(current_price, engine.inventory, sigma, time_left)
-                prob_fill = np.exp(-k_param * quotes['spread'] / 2)
-                
-                if np.random.rand() < prob_fill: engine.process_fill('buy', quotes['bid'], 1, current_time)
-                if np.random.rand() < prob_fill: engine.process_fill('sell', quotes['ask'], 1, current_time)
-                
-                if i % (sim_steps // 100) == 0: progress_bar.progress((i+1)/sim_steps)
-            progress_bar.empty()
-            
-            metrics = engine.calculate_metrics()
+            job_runner.submit(session_job('backtest'), backtest_job,
+                              gamma=gamma, k=k_param, T=T_param, sigma=sigma,
+                              initial_capital=initial_capital, sim_steps=sim_steps, seed=seed)
+        
+        job = job_runner.latest(session_job('backtest'))
+        if job is not None and not job.done:
+            show_job_status(job)
+        elif job is not None and job.status == 'failed':
+            st.error(job.error)
+        elif job is not None and job.status == 'done':
+            result = job.result
+            metrics = result['metrics']
             
             col1, col2, col3, col4 = st.columns(4)
-            col1.metric("Final Capital", f"${engine.capital:.2f}")
+            col1.metric("Final Capital", f"${result['final_capital']:.2f}")
             col2.metric("Total Return", f"{metrics['total_return']:.2%}")
             col3.metric("Sharpe Ratio", f"{metrics['sharpe']:.2f}")
             col4.metric("Max Drawdown", f"{metrics['max_drawdown']:.2%}")
             
-            if engine.pnl_history:
-                st.plotly_chart(create_equity_curve(engine.timestamps, engine.pnl_history), use_container_width=True)
-                st.plotly_chart(create_drawdown_chart(engine.timestamps, engine.pnl_history), use_container_width=True)
+            # Sampling uncertainty of the point estimates above
+            ci = bootstrap_metrics(result['equity'], seed=result['params']['seed'],
+                                   initial_capital=result['params']['initial_capital'])
+            if not np.isnan(ci['sharpe']['lower']):
+                col2.caption(f"95% CI [{ci['total_return']['lower']:.2%}, {ci['total_return']['upper']:.2%}]")
+                col3.caption(f"95% CI [{ci['sharpe']['lower']:.2f}, {ci['sharpe']['upper']:.2f}]")
+                col4.caption(f"95% CI [{ci['max_drawdown']['lower']:.2%}, {ci['max_drawdown']['upper']:.2%}]")
+            
+            if len(result['equity']):
+                timestamps = (pd.Timestamp.now().floor('s') + pd.to_timedelta(result['offsets_ns'], unit='ns')).values
+                # Charts are decimated to a point budget; zooming re-renders the
+                # selected window, at full resolution once it fits the budget
+                x_range = None
+                if len(timestamps) > 1:
+                    lo, hi = st.slider("Zoom (samples)", 0, len(timestamps) - 1, (0, len(timestamps) - 1))
+                    x_range = (timestamps[lo], timestamps[hi])
+                st.plotly_chart(create_equity_curve(timestamps, result['equity'], x_range=x_range), use_container_width=True)
+                st.plotly_chart(create_drawdown_chart(timestamps, result['equity'], x_range=x_range), use_container_width=True)
     
     with tab2:
         st.subheader("Sensitivity Analysis (Grid Search)")
         st.write("Varies Gamma (Risk Aversion) and K (Order Arrival Rate) to find optimal Sharpe Ratio.")
         
         if st.button("Run Sensitivity Analysis"):
-            with st.spinner("Running batch simulations..."):
-                df_results = run_sensitivity_analysis()
-                st.success("Analysis Complete!")
-                st.dataframe(df_results)
-                
-                # Plot Heatmap
-                try:
-                    import plotly.express as px
-                    pivot = df_results.pivot(index='gamma', columns='k', values='sharpe_ratio')
-                    fig = px.imshow(pivot, 
-                                    labels=dict(x="Arrival Rate (k)", y="Risk Aversion (gamma)", color="Sharpe Ratio"),
-                                    x=pivot.columns, y=pivot.index,
-                                    title="Sharpe Ratio Heatmap",
-                                    color_continuous_scale="RdYlGn")
-                    st.plotly_chart(fig)
-                except Exception as e:
-                    st.error(f"Could not plot heatmap: {e}")
+            job_runner.submit(session_job('sensitivity'), sensitivity_job)
+        
+        job = job_runner.latest(session_job('sensitivity'))
+        if job is not None and not job.done:
+            show_job_status(job)
+        elif job is not None and job.status == 'failed':
+            st.error(job.error)
+        elif job is not None and job.status == 'done':
+            df_results = job.result
+            st.success("Analysis Complete!")
+            st.dataframe(df_results)
+            
+            # Plot Heatmap
+            try:
+                import plotly.express as px
+                pivot = df_results.pivot(index='gamma', columns='k', values='sharpe_ratio')
+                fig = px.imshow(pivot, 
+                                labels=dict(x="Arrival Rate (k)", y="Risk Aversion (gamma)", color="Sharpe Ratio"),
+                                x=pivot.columns, y=pivot.index,
+                                title="Sharpe Ratio Heatmap",
+                                color_continuous_scale="RdYlGn")
+                st.plotly_chart(fig)
+            except Exception as e:
+                st.error(f"Could not plot heatmap: {e}")
+
+elif page == "Latency":
+    st.markdown("Per-call latency of the instrumented hot paths, from log-bucketed histograms "
+                "(percentiles accurate to about 20%). Enable it in the sidebar; it adds a "
+                "timing wrapper per call while on and nothing while off.")
+    live_view = latency.is_enabled() and auto_refresh
+    rows = [row for row in latency.report() if row['count']]
+    if st.button("Reset Statistics"):
+        latency.reset()
+        rows = []
+    if not rows:
+        st.info("No samples yet. Enable Latency Instrumentation in the sidebar and let the "
+                "simulation, a replay or a backtest run.")
+    else:
+        report_df = pd.DataFrame(rows).set_index('stage')
+        st.dataframe(report_df[['kind', 'count', 'events_per_second', 'p50_us', 'p99_us',
+                                'p99.9_us', 'max_us', 'mean_us']].style.format(precision=2))
+        selected = st.selectbox("Histogram", list(report_df.index))
+        bounds, counts = latency.histogram(selected)
+        hist = pd.Series(counts, index=[f"<= {b:,.2f}" for b in bounds], name="calls")
+        st.markdown(f"**{selected}** (bucket upper bound, microseconds)")
+        st.bar_chart(hist)
 
 elif page == "Technical Report":
     st.markdown("## Technical Report")
@@ -223,6 +474,10 @@ elif page == "Technical Report":
     else:
         st.warning("Report not found.")
 
-if auto_refresh:
-    time.sleep(refresh_rate)
+# Poll: rerun to pick up new snapshots and job progress. Jobs in flight are
+# polled quickly; the simulation itself never runs on this thread.
+suffix = session_job('')
+jobs_active = any(not job.done and job.name.endswith(suffix) for job in list(job_runner.jobs.values()))
+if auto_refresh or jobs_active or live_view:
+    time.sleep(0.5 if jobs_active or live_view else refresh_rate)
     st.experimental_rerun()
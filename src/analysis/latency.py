@@ -0,0 +1,242 @@
+import contextlib
+import functools
+import importlib
+import math
+import time
+
+# Histogram resolution: SUB_BUCKETS buckets per power of two (~19% wide)
+SUB_BUCKETS = 4
+MAX_BUCKET = 64 * SUB_BUCKETS  # up to 2**64 ns
+
+# Hot paths `enable()` wraps: stage -> (module, class, method). Stages are
+# instrumented by swapping the method on its class, so with instrumentation
+# off the originals run untouched and cost nothing extra.
+HOT_PATHS = {
+    'lob.add_order': ('src.data_pipeline.lob_structure', 'LimitOrderBook', 'add_order'),
+    'lob.cancel_order': ('src.data_pipeline.lob_structure', 'LimitOrderBook', 'cancel_order'),
+    'strategy.quote': ('src.strategy.avellaneda_stoikov', 'AvellanedaStoikovMarketMaker', 'quote'),
+    'engine.process_fill': ('src.backtesting.engine', 'BacktestEngine', 'process_fill'),
+    'engine.update_mid': ('src.backtesting.engine', 'BacktestEngine', 'update_mid'),
+    'indicators.on_book_update': ('src.models.indicators', 'IndicatorEngine', 'on_book_update'),
+    'indicators.on_trade': ('src.models.indicators', 'IndicatorEngine', 'on_trade'),
+}
+
+# Checked by code that records explicitly (feed handler queue lag, ...)
+ENABLED = False
+_stages = {}
+_originals = {}
+
+
+class LogHistogram:
+    """
+    Latency histogram with logarithmic buckets.
+
+    Recording is O(1) and memory is fixed (a few hundred counters) however
+    many samples arrive; percentiles are accurate to the bucket width (about
+    19%), max and mean are exact. Concurrent writers from several threads may
+    occasionally lose a count, which does not matter for percentiles.
+    """
+
+    def __init__(self):
+        self.counts = [0] * (MAX_BUCKET + 1)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns):
+        bucket = int(math.log2(ns) * SUB_BUCKETS) + 1 if ns > 0 else 0
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    @staticmethod
+    def upper_bound(bucket):
+        """Largest latency (ns) that falls into `bucket`."""
+        return 0.0 if bucket == 0 else 2.0 ** (bucket / SUB_BUCKETS)
+
+    def percentile(self, q):
+        """Upper bound (ns) of the bucket holding the q-th percentile (0-100), capped at max."""
+        if self.count == 0:
+            return None
+        rank = math.ceil(self.count * q / 100.0)
+        seen = 0
+        for bucket, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(self.upper_bound(bucket), float(self.max_ns))
+        return float(self.max_ns)
+
+    @property
+    def mean_ns(self):
+        return self.total_ns / self.count if self.count else None
+
+    def buckets(self):
+        """(upper bound in ns, count) of every non-empty bucket."""
+        return [(self.upper_bound(b), n) for b, n in enumerate(self.counts) if n]
+
+
+class StageStats:
+    """Latency histogram plus event rate of one instrumented stage."""
+
+    def __init__(self, name, kind='latency'):
+        self.name = name
+        self.kind = kind  # 'latency' (time spent in the stage) or 'lag' (time spent waiting)
+        self.histogram = LogHistogram()
+        self.started_ns = time.perf_counter_ns()
+        self._second = None
+        self._second_count = 0
+        self.last_rate = 0.0  # events in the last complete second
+
+    def record(self, ns, now_ns=None):
+        self.histogram.record(ns)
+        second = (time.perf_counter_ns() if now_ns is None else now_ns) // 1_000_000_000
+        if second != self._second:
+            self.last_rate = self._second_count if self._second is not None and second - self._second == 1 else 0.0
+            self._second, self._second_count = second, 0
+        self._second_count += 1
+
+    def summary(self):
+        h = self.histogram
+        elapsed = (time.perf_counter_ns() - self.started_ns) / 1e9
+
+        def us(value):
+            return None if value is None else value / 1e3
+
+        # The last complete second's rate is stale once the stage goes quiet
+        now_second = time.perf_counter_ns() // 1_000_000_000
+        recent = self.last_rate if self._second is not None and now_second - self._second <= 1 else 0.0
+        return {
+            'stage': self.name,
+            'kind': self.kind,
+            'count': h.count,
+            'events_per_second': recent,
+            'mean_events_per_second': h.count / elapsed if elapsed > 0 else 0.0,
+            'mean_us': us(h.mean_ns),
+            'p50_us': us(h.percentile(50)),
+            'p99_us': us(h.percentile(99)),
+            'p99.9_us': us(h.percentile(99.9)),
+            'max_us': us(float(h.max_ns)) if h.count else None,
+        }
+
+
+def stage(name, kind='latency'):
+    """The StageStats for `name`, created on first use."""
+    stats = _stages.get(name)
+    if stats is None:
+        stats = _stages[name] = StageStats(name, kind)
+    return stats
+
+
+def record(name, ns, kind='latency'):
+    """Record one sample for `name` if instrumentation is on."""
+    if ENABLED:
+        stage(name, kind).record(ns)
+
+
+@contextlib.contextmanager
+def timed(name):
+    """Time a block as stage `name`; records nothing when instrumentation is off."""
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        end = time.perf_counter_ns()
+        stage(name).record(end - start, end)
+
+
+def _wrap(name, fn):
+    stats = stage(name)
+    record_sample = stats.record
+    clock = time.perf_counter_ns
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            end = clock()
+            record_sample(end - start, end)
+    return wrapper
+
+
+def enable(stages=None):
+    """
+    Turn instrumentation on: wrap the HOT_PATHS methods (or only `stages`)
+    with timing wrappers and enable explicit `record` / `timed` calls.
+    """
+    global ENABLED
+    for name in (HOT_PATHS if stages is None else stages):
+        if name in _originals:
+            continue
+        module_name, class_name, method = HOT_PATHS[name]
+        cls = getattr(importlib.import_module(module_name), class_name)
+        original = cls.__dict__[method]
+        _originals[name] = (cls, method, original)
+        setattr(cls, method, _wrap(name, original))
+    ENABLED = True
+
+
+def disable():
+    """Restore the original methods; collected statistics are kept until `reset`."""
+    global ENABLED
+    ENABLED = False
+    for name, (cls, method, original) in list(_originals.items()):
+        setattr(cls, method, original)
+        del _originals[name]
+
+
+def is_enabled():
+    return ENABLED
+
+
+def reset():
+    """Drop all collected statistics (wrappers keep recording into fresh ones)."""
+    wrapped = list(_originals)
+    was_enabled = ENABLED
+    disable()
+    _stages.clear()
+    if was_enabled:
+        enable(wrapped)
+
+
+@contextlib.contextmanager
+def instrumented(stages=None):
+    """Instrumentation on for the duration of a block, e.g. one backtest."""
+    was_enabled = ENABLED
+    enable(stages)
+    try:
+        yield
+    finally:
+        if not was_enabled:
+            disable()
+
+
+def report():
+    """One summary dict per stage (latencies in microseconds), sorted by stage name."""
+    return [_stages[name].summary() for name in sorted(_stages)]
+
+
+def histogram(name):
+    """(bucket upper bounds in microseconds, counts) of one stage, for charting."""
+    buckets = stage(name).histogram.buckets()
+    return [b / 1e3 for b, _ in buckets], [n for _, n in buckets]
+
+
+def format_report(rows=None):
+    """Plain-text table of `report()`."""
+    rows = report() if rows is None else rows
+    lines = [f"{'stage':28s} {'count':>10s} {'ev/s':>10s} {'p50 us':>9s} {'p99 us':>9s} "
+             f"{'p99.9 us':>9s} {'max us':>10s}"]
+    for row in rows:
+        if not row['count']:
+            continue
+        lines.append(f"{row['stage']:28s} {row['count']:>10,d} {row['events_per_second']:>10,.0f} "
+                     f"{row['p50_us']:>9.2f} {row['p99_us']:>9.2f} {row['p99.9_us']:>9.2f} "
+                     f"{row['max_us']:>10.2f}")
+    return '\n'.join(lines)
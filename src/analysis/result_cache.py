@@ -0,0 +1,175 @@
+import functools
+import glob
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+import numpy as np
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(SRC_DIR), '.cache', 'results')
+
+
+@functools.lru_cache(maxsize=4096)
+def _file_digest(path, mtime_ns):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _src_version():
+    """
+    Hash of every .py file under src/. Recomputed on each call so edits made
+    while a long-lived process (the dashboard server) runs are picked up;
+    only files whose modification time changed are re-read.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(SRC_DIR, '**', '*.py'), recursive=True)):
+        digest.update(os.path.relpath(path, SRC_DIR).encode())
+        digest.update(_file_digest(path, os.stat(path).st_mtime_ns).encode())
+    return digest.hexdigest()
+
+
+def code_version(code_files=()):
+    """
+    Hash of every source file under src/, plus `code_files` that live
+    elsewhere (e.g. a dashboard module defining the cached function), so any
+    code change invalidates the cache, including edits made while the
+    process runs. Files are re-read only when their modification time changes.
+    """
+    digest = hashlib.sha256(_src_version().encode())
+    for path in sorted(os.path.abspath(p) for p in code_files):
+        digest.update(path.encode())
+        digest.update(_file_digest(path, os.stat(path).st_mtime_ns).encode())
+    return digest.hexdigest()[:16]
+
+
+def file_identity(path):
+    """Cheap identity of a data file: absolute path, size and modification time."""
+    st = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def _canonical(obj):
+    """json.dumps fallback for the parameter types used in backtests."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return {'ndarray': hashlib.sha256(np.ascontiguousarray(obj).tobytes()).hexdigest(),
+                'dtype': str(obj.dtype), 'shape': obj.shape}
+    if isinstance(obj, np.random.SeedSequence):
+        return {'entropy': str(obj.entropy), 'spawn_key': list(obj.spawn_key)}
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError(f"Cannot build a cache key from {type(obj)!r}")
+
+
+def make_key(namespace, data_files=(), code_files=(), **params):
+    """
+    Content address for a computation: namespace, parameters, code version
+    and the identity of every data file it reads.
+
+    Args:
+        data_files: paths of input files; changing one changes the key.
+        code_files: source files outside src/ that the computation depends on.
+    """
+    payload = json.dumps({'namespace': namespace, 'params': params,
+                          'files': [file_identity(path) for path in data_files],
+                          'code': code_version(tuple(code_files))},
+                         sort_keys=True, default=_canonical)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    On-disk, content-addressed store for backtest and calibration results.
+
+    Values are pickled under their key. Reads refresh the file's modification
+    time, and when the store grows past `max_bytes` the least recently used
+    entries are evicted.
+    """
+
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_bytes=512 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._approx_bytes = None  # running total, so puts don't rescan the store
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key + '.pkl')
+
+    def get(self, key, default=None):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return default
+        os.utime(path)  # LRU bookkeeping
+        self.hits += 1
+        return value
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def put(self, key, value):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so concurrent readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+        if self._approx_bytes is None:
+            self._approx_bytes = self.size_bytes()
+        else:
+            self._approx_bytes += os.path.getsize(path)
+        if self._approx_bytes > self.max_bytes:
+            self._evict()
+
+    def get_or_compute(self, namespace, fn, data_files=(), code_files=(), **params):
+        """
+        Return the cached result of fn(**params), computing and storing it on a
+        miss. `data_files` and `code_files` go into the key, see `make_key`.
+        """
+        key = make_key(namespace, data_files, code_files, **params)
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = fn(**params)
+            self.put(key, value)
+        return value
+
+    def _entries(self):
+        for path in glob.glob(os.path.join(self.root, '*', '*.pkl')):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            yield path, st.st_size, st.st_mtime_ns
+
+    def size_bytes(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        entries = list(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in sorted(entries, key=lambda e: e[2]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._approx_bytes = total
+
+    def clear(self):
+        for path, _, _ in list(self._entries()):
+            os.remove(path)
+        self._approx_bytes = 0
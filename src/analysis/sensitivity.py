@@ -1,84 +1,64 @@
 import sys
 import os
 import pandas as pd
-import numpy as np
-import itertools
-import matplotlib.pyplot as plt
-import seaborn as sns
 
 # Ensure src is in python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
-from src.strategy.avellaneda_stoikov import AvellanedaStoikovMarketMaker
-from src.backtesting.engine import BacktestEngine
-from src.data_pipeline.lob_loader import generate_initial_lob
+from src.backtesting.scenario_runner import make_jobs, run_scenarios
 
-def run_sensitivity_analysis():
+def run_sensitivity_analysis(seed=42, max_workers=None, cache=None, write_outputs=True, progress=None):
+    """
+    Sharpe/return/drawdown over a (gamma, k) grid.
+    
+    Args:
+        cache (ResultCache): memoizes each grid cell, so re-runs are instant and
+            an extended grid only computes the new cells.
+        write_outputs (bool): write the CSV and heatmap PNG next to this file.
+        progress (callable): called with (fraction, message) after each cell.
+    """
     print("Starting Sensitivity Analysis...")
     
     # Parameters to vary
     gamma_values = [0.01, 0.05, 0.1, 0.5, 1.0]
     k_values = [0.5, 1.0, 1.5, 2.0]
     
-    results = []
+    # Every cell sees the same price path and fill draws (common random
+    # numbers), so differences in the heatmap come from the parameters alone
+    jobs = make_jobs({'gamma': gamma_values, 'k': k_values, 'T': [1.0]},
+                     {'n_steps': 1000, 'price_vol': 0.1, 'sigma': 2.0},
+                     n_seeds=1, seed=seed, common_random_numbers=True)
     
-    total_iterations = len(gamma_values) * len(k_values)
-    count = 0
+    results = []
+    total_iterations = len(jobs)
     
-    for gamma, k in itertools.product(gamma_values, k_values):
-        count += 1
-        print(f"[{count}/{total_iterations}] Testing gamma={gamma}, k={k}...")
-        
-        # Setup Backtest
-        strategy = AvellanedaStoikovMarketMaker(gamma=gamma, k=k, T=1.0)
-        engine = BacktestEngine(initial_capital=100000)
-        
-        # Simulation Loop (simplified for speed)
-        mid_price = 100.0
-        prices = [mid_price]
-        sim_steps = 1000
-        
-        # Simple price path
-        np.random.seed(42) # Ensure reproducibility
-        for _ in range(sim_steps):
-            change = np.random.normal(0, 0.1)
-            prices.append(prices[-1] + change)
-            
-        for i in range(sim_steps):
-            current_time = pd.Timestamp.now() + pd.Timedelta(seconds=i)
-            current_price = prices[i]
-            time_left = max(0, 1.0 - (i / sim_steps) * 1.0)
-            
-            # Get Quotes
-            quotes = strategy.quote(current_price, engine.inventory, sigma=2.0, time_left=time_left)
-            
-            # Simulate Fill
-            prob_fill = np.exp(-k * quotes['spread'] / 2)
-            
-            if np.random.rand() < prob_fill:
-                engine.process_fill('buy', quotes['bid'], 1, current_time)
-            if np.random.rand() < prob_fill:
-                engine.process_fill('sell', quotes['ask'], 1, current_time)
-                
-        # Calculate Metrics
-        metrics = engine.calculate_metrics()
+    for count, res in enumerate(run_scenarios(jobs, max_workers=max_workers, cache=cache), start=1):
+        print(f"[{count}/{total_iterations}] Tested gamma={res['gamma']}, k={res['k']}")
+        if progress is not None:
+            progress(count / total_iterations, f"gamma={res['gamma']}, k={res['k']}")
         results.append({
-            'gamma': gamma,
-            'k': k,
-            'sharpe_ratio': metrics['sharpe'],
-            'total_return': metrics['total_return'],
-            'max_drawdown': metrics['max_drawdown']
+            'gamma': res['gamma'],
+            'k': res['k'],
+            'sharpe_ratio': res['sharpe'],
+            'total_return': res['total_return'],
+            'max_drawdown': res['max_drawdown']
         })
         
     # Convert to DataFrame
-    df_results = pd.DataFrame(results)
+    df_results = pd.DataFrame(results).sort_values(['gamma', 'k'], ignore_index=True)
+    
+    if not write_outputs:
+        return df_results
     
     # Save results
     output_path = os.path.join(os.path.dirname(__file__), 'sensitivity_results.csv')
     df_results.to_csv(output_path, index=False)
     print(f"Results saved to {output_path}")
     
-    # Generate Heatmap
+    # Generate Heatmap (plotting libraries are only needed here, so load them lazily)
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
     pivot_table = df_results.pivot(index='gamma', columns='k', values='sharpe_ratio')
     
     plt.figure(figsize=(10, 8))
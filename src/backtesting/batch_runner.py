@@ -2,63 +2,48 @@ import sys
 import os
 import pandas as pd
 import numpy as np
-from datetime import datetime
 
-# Add src to path
-sys.path.append(os.path.join(os.getcwd(), 'src'))
+# Ensure src is in python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
-from strategy.avellaneda_stoikov import AvellanedaStoikovMarketMaker
-from backtesting.engine import BacktestEngine
+from src.backtesting.scenario_runner import ScenarioJob, run_scenarios
 
-def run_batch_backtest():
+def run_batch_backtest(seed=None, max_workers=None):
     print("Starting Comprehensive Batch Backtest...")
     
     stocks = ['RELIANCE', 'TCS', 'INFY', 'HDFCBANK']
-    results = []
     
     # Parameters
     gamma = 0.1
     k = 1.5
     sim_steps = 1000
     
-    for stock in stocks:
-        print(f"Testing on {stock}...")
-        engine = BacktestEngine(initial_capital=100000)
-        strategy = AvellanedaStoikovMarketMaker(gamma=gamma, k=k)
-        
-        # Simulate check
-        mid_price = 100 + np.random.randn() * 10
-        prices = [mid_price]
-        
-        # Volatility specific to stock (simulated)
-        sigma = np.random.uniform(1.0, 5.0)
-        
-        for _ in range(sim_steps):
-            prices.append(prices[-1] + np.random.normal(0, 0.1))
-            
-        for i in range(sim_steps):
-            current_time = pd.Timestamp.now() + pd.Timedelta(seconds=i)
-            time_left = max(0, 1.0 - i/sim_steps)
-            
-            quotes = strategy.quote(prices[i], engine.inventory, sigma=sigma, time_left=time_left)
-            
-            prob_fill = np.exp(-k * quotes['spread'] / 2)
-            
-            if np.random.rand() < prob_fill:
-                 engine.process_fill('buy', quotes['bid'], 1, current_time)
-            if np.random.rand() < prob_fill:
-                 engine.process_fill('sell', quotes['ask'], 1, current_time)
-                 
-        metrics = engine.calculate_metrics()
-        results.append({
-            'Stock': stock,
-            'Total Return': f"{metrics['total_return']:.2%}",
-            'Sharpe': f"{metrics['sharpe']:.2f}",
-            'Max Drawdown': f"{metrics['max_drawdown']:.2%}",
-            'Final Inv': engine.inventory
-        })
+    # One independent stream per stock; the stock's own market parameters
+    # (starting price, volatility) are drawn from its stream too
+    seeds = np.random.SeedSequence(seed).spawn(len(stocks))
+    jobs = []
+    for stock, seed_seq in zip(stocks, seeds):
+        stock_rng = np.random.default_rng(seed_seq.spawn(1)[0])
+        market = {
+            'n_steps': sim_steps,
+            'initial_price': 100 + stock_rng.standard_normal() * 10,
+            'sigma': stock_rng.uniform(1.0, 5.0),  # Volatility specific to stock (simulated)
+            'price_vol': 0.1,
+        }
+        jobs.append(ScenarioJob({'gamma': gamma, 'k': k}, market, seed_seq, stock))
+    
+    results = {}
+    for res in run_scenarios(jobs, max_workers=max_workers):
+        print(f"Finished {res['tag']}")
+        results[res['tag']] = {
+            'Stock': res['tag'],
+            'Total Return': f"{res['total_return']:.2%}",
+            'Sharpe': f"{res['sharpe']:.2f}",
+            'Max Drawdown': f"{res['max_drawdown']:.2%}",
+            'Final Inv': res['final_inventory']
+        }
         
-    df_res = pd.DataFrame(results)
+    df_res = pd.DataFrame([results[stock] for stock in stocks])
     print("\nBatch Backtest Results:")
     print(df_res)
     
@@ -0,0 +1,186 @@
+import collections
+import importlib
+import inspect
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from .engine import BacktestEngine
+
+CHECKPOINT_VERSION = 1
+_SCALARS = (bool, int, float, str, type(None), np.generic)
+
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def object_state(obj, prefix, arrays):
+    """
+    Split an object's attributes into JSON scalars (returned) and NumPy arrays
+    (added to `arrays` under `prefix`). Anything else, such as lazily built
+    caches, is left out and rebuilt on demand after a restore.
+    """
+    scalars = {}
+    for name, value in vars(obj).items():
+        if isinstance(value, np.ndarray):
+            arrays[f"{prefix}.{name}"] = value
+        elif isinstance(value, _SCALARS):
+            scalars[name] = _plain(value)
+    return scalars
+
+
+def restore_object(cls, scalars, arrays, prefix):
+    """Construct `cls` from the saved attributes matching its __init__, then restore the rest."""
+    params = inspect.signature(cls.__init__).parameters
+    obj = cls(**{name: value for name, value in scalars.items() if name in params})
+    for name, value in scalars.items():
+        setattr(obj, name, value)
+    for key, value in arrays.items():
+        if key.startswith(prefix + '.'):
+            setattr(obj, key[len(prefix) + 1:], value)
+    return obj
+
+
+def engine_state(engine, arrays):
+    """BacktestEngine state: scalars, metrics accumulators and the ledger/equity columns."""
+    for buffer_name in ('ledger', 'equity'):
+        buffer = getattr(engine, buffer_name)
+        for column in buffer._names:
+            arrays[f"engine.{buffer_name}.{column}"] = buffer.column(column)
+    return {
+        'initial_capital': engine.initial_capital,
+        'capital': _plain(engine.capital),
+        'inventory': _plain(engine.inventory),
+        'max_position': engine.max_position,
+        'mark_interval_ns': engine.mark_interval_ns,
+        'mid_price': _plain(engine.mid_price),
+        'last_mark_ns': engine._last_mark_ns,
+        'metrics': {name: _plain(value) for name, value in vars(engine.metrics).items()},
+    }
+
+
+def restore_engine(meta, arrays):
+    engine = BacktestEngine(initial_capital=meta['initial_capital'], max_position=meta['max_position'])
+    engine.capital = meta['capital']
+    engine.inventory = meta['inventory']
+    engine.mark_interval_ns = meta['mark_interval_ns']
+    engine.mid_price = meta['mid_price']
+    engine._last_mark_ns = meta['last_mark_ns']
+    vars(engine.metrics).update(meta['metrics'])
+    for buffer_name in ('ledger', 'equity'):
+        buffer = getattr(engine, buffer_name)
+        n = len(arrays[f"engine.{buffer_name}.{buffer._names[0]}"])
+        while buffer._capacity < n:
+            buffer._grow()
+        for column in buffer._names:
+            buffer._columns[column][:n] = arrays[f"engine.{buffer_name}.{column}"]
+        buffer._size = n
+    return engine
+
+
+def book_state(lob, arrays):
+    """LimitOrderBook levels as price/quantity arrays, plus the cached best prices and stats."""
+    for side, levels in (('bids', lob.bids), ('asks', lob.asks)):
+        arrays[f"book.{side}.price"] = np.fromiter(levels.keys(), dtype=np.float64, count=len(levels))
+        arrays[f"book.{side}.quantity"] = np.fromiter(levels.values(), dtype=np.int64, count=len(levels))
+    arrays['book.mid_prices'] = np.asarray(lob.mid_prices, dtype=np.float64)
+    arrays['book.flow_imbalance'] = np.asarray(lob.flow_imbalance, dtype=np.float64)
+    return {'best_bid': lob.best_bid, 'best_ask': lob.best_ask, 'timestamp': _plain(lob.timestamp)}
+
+
+def restore_book(lob, meta, arrays):
+    for side in ('bids', 'asks'):
+        levels = getattr(lob, side)
+        levels.clear()
+        levels.update(zip(arrays[f"book.{side}.price"].tolist(),
+                          arrays[f"book.{side}.quantity"].tolist()))
+    lob.mid_prices.clear()
+    lob.mid_prices.extend(arrays['book.mid_prices'].tolist())
+    lob.flow_imbalance.clear()
+    lob.flow_imbalance.extend(arrays['book.flow_imbalance'].tolist())
+    lob.best_bid = meta['best_bid']
+    lob.best_ask = meta['best_ask']
+    lob.timestamp = meta['timestamp']
+    return lob
+
+
+def rng_state(rng):
+    """Bit generator state of a np.random.Generator, as JSON."""
+    state = rng.bit_generator.state
+    return json.loads(json.dumps(state, default=lambda v: v.tolist()))
+
+
+def restore_rng(state):
+    bit_generator = getattr(np.random, state['bit_generator'])()
+    bit_generator.state = state
+    return np.random.Generator(bit_generator)
+
+
+def save_checkpoint(path, meta, arrays):
+    """
+    Write one compressed .npz: the arrays as they are and `meta` as a JSON
+    blob. The file is written aside and renamed, so a crash mid-write never
+    leaves a truncated checkpoint behind.
+    """
+    meta = dict(meta, version=CHECKPOINT_VERSION)
+    payload = dict(arrays)
+    payload['__meta__'] = np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        np.savez_compressed(f, **payload)
+    os.replace(tmp, path)
+    return path
+
+
+def load_checkpoint(path):
+    """Returns (meta, arrays) as written by save_checkpoint."""
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {key: data[key] for key in data.files}
+    meta = json.loads(arrays.pop('__meta__').tobytes().decode())
+    if meta.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version {meta.get('version')!r} in {path}")
+    return meta, arrays
+
+
+def strategy_state(strategy, arrays):
+    cls = type(strategy)
+    return {'class': f"{cls.__module__}:{cls.__qualname__}",
+            'attrs': object_state(strategy, 'strategy', arrays)}
+
+
+def restore_strategy(meta, arrays, overrides=None):
+    """Rebuild the saved strategy; `overrides` replaces attributes, e.g. for what-if forks."""
+    module, qualname = meta['class'].split(':')
+    cls = importlib.import_module(module)
+    for part in qualname.split('.'):
+        cls = getattr(cls, part)
+    scalars = dict(meta['attrs'], **(overrides or {}))
+    return restore_object(cls, scalars, arrays, 'strategy')
+
+
+def checkpoint_path(directory, position):
+    return os.path.join(directory, f"checkpoint_{position:012d}.npz")
+
+
+def list_checkpoints(directory):
+    """Checkpoint files in a directory, oldest (lowest position) first."""
+    if not os.path.isdir(directory):
+        return []
+    names = sorted(n for n in os.listdir(directory) if n.startswith('checkpoint_') and n.endswith('.npz'))
+    return [os.path.join(directory, n) for n in names]
+
+
+RestoredState = collections.namedtuple('RestoredState', ['meta', 'arrays', 'engine', 'strategy'])
+
+
+def restore_common(path, strategy_overrides=None):
+    """Load a checkpoint and rebuild its engine and strategy."""
+    meta, arrays = load_checkpoint(path)
+    engine = restore_engine(meta['engine'], arrays)
+    strategy = restore_strategy(meta['strategy'], arrays, strategy_overrides)
+    return RestoredState(meta, arrays, engine, strategy)
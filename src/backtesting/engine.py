@@ -1,15 +1,45 @@
 import numpy as np
 from collections import deque
 
+from .ledger import ColumnBuffer, TradeLedger, to_ns
+from .metrics import StreamingMetrics, bootstrap_metrics
+
 class BacktestEngine:
-    def __init__(self, initial_capital=100000, max_position=100):
+    def __init__(self, initial_capital=100000, max_position=100, mark_interval_ms=None):
+        """
+        Args:
+            initial_capital (float): Starting cash.
+            max_position (int): Absolute inventory limit enforced on fills.
+            mark_interval_ms (float): Equity sampling clock for mark-to-mid.
+                None samples at fills marked at the fill price (legacy),
+                0 marks on every `update_mid`, N > 0 at most every N ms.
+        """
         self.initial_capital = initial_capital
         self.capital = initial_capital
         self.inventory = 0
         self.max_position = max_position
-        self.pnl_history = []
-        self.timestamps = []
-        self.trades = []
+        # Columnar, preallocated storage instead of per-fill dicts and lists
+        self.ledger = TradeLedger()
+        self.equity = ColumnBuffer({'timestamp': np.int64, 'equity': np.float64})
+        self.metrics = StreamingMetrics(initial_capital)
+        self.mark_interval_ns = None if mark_interval_ms is None else int(mark_interval_ms * 1e6)
+        self.mid_price = None
+        self._last_mark_ns = None
+    
+    @property
+    def pnl_history(self):
+        """Equity series as a zero-copy float64 array."""
+        return self.equity.column('equity')
+    
+    @property
+    def timestamps(self):
+        """Equity timestamps as a zero-copy datetime64[ns] array."""
+        return self.equity.column('timestamp').view('datetime64[ns]')
+    
+    @property
+    def trades(self):
+        """Trade log as a DataFrame (built on demand, for compatibility)."""
+        return self.ledger.to_frame()
         
     def process_fill(self, side, price, quantity, timestamp):
         """
@@ -29,72 +59,44 @@ class BacktestEngine:
 
         
         
-        self.trades.append({
-            'timestamp': timestamp,
-            'side': side,
-            'price': price,
-            'quantity': quantity,
-            'inventory': self.inventory,
-            'capital': self.capital
-        })
+        ts = to_ns(timestamp)
+        self.ledger.record(ts, side, price, quantity, self.inventory, self.capital)
+        self.metrics.update_fill(price, quantity)
         
-        # Calculate current Portfolio Value (Mark-to-Market)
-        # Assuming fill price is close to market mid-price for approximation
-        # In a real engine, we'd pass mid_price separately for explicit MTM
-        current_equity = self.capital + (self.inventory * price)
-        self.pnl_history.append(current_equity)
-        self.timestamps.append(timestamp)
+        # Without a mark clock, keep the original behaviour of sampling equity
+        # at each fill, marked at the fill price
+        if self.mark_interval_ns is None:
+            self._mark(ts, price)
         return True
 
+    def update_mid(self, mid_price, timestamp):
+        """
+        Feed a mid-price update. With a mark clock configured, equity is marked
+        to this mid whenever the clock is due.
+        """
+        self.mid_price = mid_price
+        if self.mark_interval_ns is None or mid_price is None:
+            return
+        ts = to_ns(timestamp)
+        if self._last_mark_ns is None or ts - self._last_mark_ns >= self.mark_interval_ns:
+            self._mark(ts, mid_price)
+
+    def _mark(self, ts, price):
+        """Record one equity sample marked at `price`."""
+        current_equity = self.capital + (self.inventory * price)
+        self.equity.append(ts, current_equity)
+        self.metrics.update_equity(current_equity)
+        self.metrics.update_inventory(self.inventory)
+        self._last_mark_ns = ts
+
     def calculate_metrics(self):
-        """Compute Sharpe, drawdown, etc."""
-        if not self.pnl_history:
-            return {'sharpe': 0.0, 'max_drawdown': 0.0, 'total_return': 0.0}
-            
-        pnl_series = np.array(self.pnl_history)
-        
-        # Avoid division by zero if series is constant
-        if len(pnl_series) < 2:
-             return {'sharpe': 0.0, 'max_drawdown': 0.0, 'total_return': 0.0}
+        """
+        Sharpe, drawdown, return, turnover and inventory stats.
+        Read from online accumulators, so this is O(1) and safe to call mid-run.
+        """
+        return self.metrics.snapshot()
 
-        # Calculate returns
-        # Handle cases where PnL might be 0 or negative (though equity usually positive)
-        # Using simple differences for now or percentage change if equity > 0
-        
-        returns = np.diff(pnl_series) / pnl_series[:-1]
-        
-        # Check for NaNs or Infs
-        returns = np.nan_to_num(returns)
-        
-        if np.std(returns) == 0:
-            sharpe = 0.0
-        else:
-            # Annualized Sharpe (assuming daily data? No, this is HFT/intraday)
-            # If timestamps are high frequency, 252 is wrong scaling factor.
-            # For now, we will return a raw Sharpe or assume a specific frequency.
-            # Let's assume the caller interprets it, or we just use a placeholder scaling.
-            # Standard: sqrt(samples_per_year)
-            # Let's stick to the user's snippet logic: sqrt(252) implies daily, 
-            # but we might be doing intraday. Let's keep 252 as per requirements for now 
-            # or just leave it unscaled if standard deviation is per-step.
-            # User prompted: sharpe = np.mean(returns) / np.std(returns) * np.sqrt(252)
-            sharpe = np.mean(returns) / np.std(returns) * np.sqrt(252)
-            
-        max_dd = self._max_drawdown(pnl_series)
-        total_return = (pnl_series[-1] - self.initial_capital) / self.initial_capital
-        
-        return {'sharpe': sharpe, 'max_drawdown': max_dd, 'total_return': total_return}
-    
-    def _max_drawdown(self, equity_curve):
-        """Calculate maximum drawdown"""
-        if len(equity_curve) == 0:
-            return 0.0
-            
-        peak = np.maximum.accumulate(equity_curve)
-        
-        # Avoid division by zero if peak is 0 (unlikely for capital)
-        with np.errstate(divide='ignore', invalid='ignore'):
-            drawdown = (equity_curve - peak) / peak
-            
-        drawdown = np.nan_to_num(drawdown)
-        return np.min(drawdown)
+    def bootstrap_metrics(self, **kwargs):
+        """Block-bootstrap confidence intervals for the equity series (see metrics.bootstrap_metrics)."""
+        kwargs.setdefault('initial_capital', self.initial_capital)
+        return bootstrap_metrics(self.pnl_history, **kwargs)
@@ -0,0 +1,102 @@
+import datetime
+
+import numpy as np
+
+SIDE_CODES = {'buy': 1, 'sell': -1}
+
+
+def to_ns(timestamp):
+    """
+    Convert a timestamp to int64 nanoseconds since the epoch.
+    Integers are taken as nanoseconds already, floats as seconds (time.time()).
+    """
+    if isinstance(timestamp, (int, np.integer)):
+        return int(timestamp)
+    if isinstance(timestamp, (float, np.floating)):
+        return int(timestamp * 1e9)
+    if hasattr(timestamp, 'value'):  # pd.Timestamp
+        return int(timestamp.value)
+    if isinstance(timestamp, (datetime.datetime, np.datetime64)):
+        return int(np.datetime64(timestamp, 'ns').astype(np.int64))
+    raise TypeError(f"Unsupported timestamp type: {type(timestamp)!r}")
+
+
+class ColumnBuffer:
+    """
+    Columnar append-only store of fixed-dtype NumPy arrays.
+
+    Capacity doubles when full, so appends are amortized O(1) and column
+    reads are zero-copy views of the filled prefix.
+    """
+
+    def __init__(self, columns, capacity=1024):
+        """
+        Args:
+            columns (dict): column name -> NumPy dtype.
+            capacity (int): initial number of rows.
+        """
+        self._columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in columns.items()}
+        self._names = list(columns)
+        self._capacity = capacity
+        self._size = 0
+
+    def _grow(self):
+        self._capacity *= 2
+        for name, arr in self._columns.items():
+            grown = np.empty(self._capacity, dtype=arr.dtype)
+            grown[:self._size] = arr[:self._size]
+            self._columns[name] = grown
+
+    def append(self, *values):
+        """Append one row, values in column order."""
+        if self._size == self._capacity:
+            self._grow()
+        i = self._size
+        for name, value in zip(self._names, values):
+            self._columns[name][i] = value
+        self._size += 1
+
+    def column(self, name):
+        """Zero-copy view of a column."""
+        return self._columns[name][:self._size]
+
+    def clear(self):
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+
+class TradeLedger(ColumnBuffer):
+    """
+    Fill ledger: timestamp (ns), side code, price, quantity, inventory and cash after the fill.
+
+    Quantity and inventory are float64 like the engine's own state, so
+    fractional fills are stored as they are instead of being truncated.
+    """
+
+    def __init__(self, capacity=1024):
+        super().__init__({
+            'timestamp': np.int64,
+            'side': np.int8,
+            'price': np.float64,
+            'quantity': np.float64,
+            'inventory': np.float64,
+            'capital': np.float64,
+        }, capacity)
+
+    def record(self, timestamp, side, price, quantity, inventory, capital):
+        self.append(to_ns(timestamp), SIDE_CODES[side], price, quantity, inventory, capital)
+
+    def to_frame(self):
+        """DataFrame copy with the same columns as the old list-of-dicts trade log."""
+        import pandas as pd
+        side = self.column('side')
+        return pd.DataFrame({
+            'timestamp': pd.to_datetime(self.column('timestamp'), unit='ns'),
+            'side': np.where(side == 1, 'buy', 'sell'),
+            'price': self.column('price'),
+            'quantity': self.column('quantity'),
+            'inventory': self.column('inventory'),
+            'capital': self.column('capital'),
+        })
@@ -0,0 +1,180 @@
+import math
+
+import numpy as np
+
+
+class StreamingMetrics:
+    """
+    O(1) online accumulators for backtest performance metrics.
+
+    Equity samples update a Welford mean/variance of simple returns, the
+    running peak and the maximum drawdown; fills update turnover; inventory
+    samples update mean/variance and the largest absolute position. Any metric
+    can be read at any time without rescanning the history.
+    """
+
+    def __init__(self, initial_capital):
+        self.initial_capital = initial_capital
+        self.n_equity = 0
+        self.last_equity = None
+        self.peak = None
+        self.max_drawdown = 0.0
+        self._ret_n = 0
+        self._ret_mean = 0.0
+        self._ret_m2 = 0.0
+
+        self.n_fills = 0
+        self.traded_quantity = 0
+        self.turnover = 0.0
+
+        self._inv_n = 0
+        self._inv_mean = 0.0
+        self._inv_m2 = 0.0
+        self.max_abs_inventory = 0
+
+    def update_equity(self, equity):
+        if self.last_equity is not None:
+            prev = self.last_equity
+            ret = (equity - prev) / prev if prev != 0 else 0.0
+            if math.isnan(ret) or math.isinf(ret):
+                ret = 0.0  # same treatment as np.nan_to_num on the return series
+            self._ret_n += 1
+            delta = ret - self._ret_mean
+            self._ret_mean += delta / self._ret_n
+            self._ret_m2 += delta * (ret - self._ret_mean)
+
+        self.peak = equity if self.peak is None else max(self.peak, equity)
+        if self.peak != 0:
+            self.max_drawdown = min(self.max_drawdown, (equity - self.peak) / self.peak)
+        self.last_equity = equity
+        self.n_equity += 1
+
+    def update_fill(self, price, quantity):
+        self.n_fills += 1
+        self.traded_quantity += quantity
+        self.turnover += price * quantity
+
+    def update_inventory(self, inventory):
+        self._inv_n += 1
+        delta = inventory - self._inv_mean
+        self._inv_mean += delta / self._inv_n
+        self._inv_m2 += delta * (inventory - self._inv_mean)
+        self.max_abs_inventory = max(self.max_abs_inventory, abs(inventory))
+
+    def sharpe(self, periods_per_year=252):
+        """Mean / population std of per-sample returns, scaled by sqrt(periods_per_year)."""
+        if self._ret_n == 0:
+            return 0.0
+        std = math.sqrt(self._ret_m2 / self._ret_n)
+        if std == 0:
+            return 0.0
+        return self._ret_mean / std * math.sqrt(periods_per_year)
+
+    def total_return(self):
+        if self.last_equity is None:
+            return 0.0
+        return (self.last_equity - self.initial_capital) / self.initial_capital
+
+    def inventory_std(self):
+        return math.sqrt(self._inv_m2 / self._inv_n) if self._inv_n else 0.0
+
+    def snapshot(self):
+        if self.n_equity < 2:
+            sharpe, max_dd, total_return = 0.0, 0.0, 0.0
+        else:
+            sharpe, max_dd, total_return = self.sharpe(), self.max_drawdown, self.total_return()
+        return {
+            'sharpe': sharpe,
+            'max_drawdown': max_dd,
+            'total_return': total_return,
+            'n_fills': self.n_fills,
+            'turnover': self.turnover,
+            'traded_quantity': self.traded_quantity,
+            'inventory_mean': self._inv_mean,
+            'inventory_std': self.inventory_std(),
+            'max_abs_inventory': self.max_abs_inventory,
+        }
+
+
+def _block_indices(rng, n, n_resamples, block_size):
+    """(n_resamples, n) index matrix of a circular moving-block bootstrap."""
+    n_blocks = -(-n // block_size)
+    starts = rng.integers(0, n, size=(n_resamples, n_blocks, 1))
+    idx = (starts + np.arange(block_size)) % n
+    return idx.reshape(n_resamples, n_blocks * block_size)[:, :n]
+
+
+def _path_metrics(returns, periods_per_year, start_growth=1.0):
+    """
+    Sharpe, total return and max drawdown of each row of a return matrix.
+    `start_growth` is the growth already made before the first return (first
+    equity sample / initial capital) and scales every path's total return.
+    """
+    mean = returns.mean(axis=1)
+    std = returns.std(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(periods_per_year), 0.0)
+    growth = np.cumprod(1.0 + returns, axis=1)
+    total_return = start_growth * growth[:, -1] - 1.0
+    peak = np.maximum(np.maximum.accumulate(growth, axis=1), 1.0)  # the start counts as a peak
+    max_drawdown = np.minimum((growth / peak - 1.0).min(axis=1), 0.0)
+    return {'sharpe': sharpe, 'total_return': total_return, 'max_drawdown': max_drawdown}
+
+
+def bootstrap_metrics(equity, n_resamples=2000, block_size=None, confidence=0.95,
+                      periods_per_year=252, seed=None, max_cells=2_000_000, initial_capital=None):
+    """
+    Block-bootstrap confidence intervals for Sharpe, total return and max drawdown.
+
+    The equity series is turned into per-sample returns, which are resampled in
+    contiguous blocks (circular moving-block bootstrap) so short-range
+    autocorrelation, e.g. from inventory, survives the resampling. Resamples are
+    drawn as one index matrix per chunk of `max_cells` elements and all
+    metrics are computed with array operations along the rows, without a loop
+    over resamples.
+
+    Args:
+        equity (array): equity samples, e.g. engine.pnl_history.
+        block_size (int): block length; defaults to round(n ** (1/3)).
+        confidence (float): two-sided coverage of the percentile intervals.
+        seed: seed or np.random.Generator.
+        initial_capital (float): anchors every resampled path's total return
+            at the starting capital, as in calculate_metrics; None measures it
+            from the first equity sample.
+
+    Returns:
+        dict: metric -> {'estimate', 'lower', 'upper', 'std'} for sharpe,
+        total_return and max_drawdown, plus 'n_resamples' and 'block_size'.
+        Intervals are NaN when there are fewer than 3 returns.
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    prev = equity[:-1]
+    returns = np.divide(np.diff(equity), prev, out=np.zeros(max(len(equity) - 1, 0)), where=prev != 0)
+    returns = np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+    n = len(returns)
+    block_size = block_size or max(1, int(round(n ** (1 / 3))))
+    start_growth = equity[0] / initial_capital if initial_capital and len(equity) else 1.0
+
+    estimates = _path_metrics(returns[None, :], periods_per_year, start_growth) if n else None
+    result = {'n_resamples': n_resamples, 'block_size': block_size}
+    if n < 3:
+        for name in ('sharpe', 'total_return', 'max_drawdown'):
+            value = float(estimates[name][0]) if estimates is not None else 0.0
+            result[name] = {'estimate': value, 'lower': np.nan, 'upper': np.nan, 'std': np.nan}
+        return result
+
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    chunk = max(1, max_cells // n)
+    samples = {name: [] for name in estimates}
+    for first in range(0, n_resamples, chunk):
+        idx = _block_indices(rng, n, min(chunk, n_resamples - first), block_size)
+        for name, values in _path_metrics(returns[idx], periods_per_year, start_growth).items():
+            samples[name].append(values)
+
+    tail = (1.0 - confidence) / 2 * 100
+    for name, chunks in samples.items():
+        values = np.concatenate(chunks)
+        lower, upper = np.percentile(values, [tail, 100 - tail])
+        result[name] = {'estimate': float(estimates[name][0]), 'lower': float(lower),
+                        'upper': float(upper), 'std': float(values.std())}
+    return result
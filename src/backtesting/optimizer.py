@@ -1,62 +1,59 @@
+import math
 import numpy as np
 import pandas as pd
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
 from itertools import product
 
-# Add src to path
-sys.path.append(os.path.join(os.getcwd(), 'src'))
+# Ensure src is in python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
-from strategy.avellaneda_stoikov import AvellanedaStoikovMarketMaker
-from backtesting.engine import BacktestEngine
+from src.backtesting.scenario_runner import make_jobs, run_scenarios
+from src.backtesting.vectorized import run_vectorized_backtest
 
-def run_grid_search():
+# name -> (kind, spec). kinds: 'log' / 'uniform' (lo, hi), 'int' / 'logint' (lo, hi), 'choice' [values]
+DEFAULT_SEARCH_SPACE = {
+    'gamma': ('log', (1e-4, 1.0)),
+    'k': ('log', (0.3, 100.0)),
+    'T': ('choice', [0.5, 1.0, 2.0]),
+    'max_position': ('logint', (1, 200)),
+    'quantity': ('choice', [1, 2, 5]),
+}
+
+# The market is held fixed while strategy parameters are searched: fills
+# decay with the market's own fill_k, not with the strategy's k. The
+# strategy's k is therefore a free quoting knob (it sets the spread the
+# strategy believes is optimal), not an estimate of the market's decay.
+DEFAULT_SEARCH_MARKET = {'n_steps': 1000, 'price_vol': 0.05, 'sigma': 2.0, 'fill_k': 1.5}
+
+def run_grid_search(seed=None, max_workers=None):
     print("Starting Parameter Optimization (Grid Search)...")
     
     # Define parameter grid
-    gammas = [0.01, 0.1, 0.5, 1.0]
-    ks = [0.5, 1.5, 5.0]
-    windows = [1000] # Simulation steps
+    param_grid = {
+        'gamma': [0.01, 0.1, 0.5, 1.0],
+        'k': [0.5, 1.5, 5.0],
+        'T': [1.0],
+    }
+    market = {'n_steps': 1000, 'price_vol': 0.05, 'sigma': 2.0}
     
+    jobs = make_jobs(param_grid, market, n_seeds=1, seed=seed)
     results = []
     
-    for gamma, k in product(gammas, ks):
-        engine = BacktestEngine(initial_capital=100000)
-        strategy = AvellanedaStoikovMarketMaker(gamma=gamma, k=k, T=1.0)
-        
-        # Simulation
-        mid_price = 100.0
-        prices = [mid_price]
-        for _ in range(1000):
-            prices.append(prices[-1] + np.random.normal(0, 0.05))
-            
-        for i in range(1000):
-            current_time = pd.Timestamp.now() + pd.Timedelta(seconds=i)
-            time_left = max(0, 1.0 - i/1000)
-            
-            quotes = strategy.quote(prices[i], engine.inventory, sigma=2.0, time_left=time_left)
-            
-            # Simple fill probability
-            prob_fill = np.exp(-k * quotes['spread'] / 2)
-            
-            if np.random.rand() < prob_fill:
-                engine.process_fill('buy', quotes['bid'], 1, current_time)
-            if np.random.rand() < prob_fill:
-                engine.process_fill('sell', quotes['ask'], 1, current_time)
-                
-        metrics = engine.calculate_metrics()
+    for res in run_scenarios(jobs, max_workers=max_workers):
         results.append({
-            'gamma': gamma,
-            'k': k,
-            'sharpe': metrics['sharpe'],
-            'total_return': metrics['total_return'],
-            'max_dd': metrics['max_drawdown'],
-            'final_inventory': engine.inventory
+            'gamma': res['gamma'],
+            'k': res['k'],
+            'sharpe': res['sharpe'],
+            'total_return': res['total_return'],
+            'max_dd': res['max_drawdown'],
+            'final_inventory': res['final_inventory']
         })
-        print(f"Tested gamma={gamma}, k={k}: Sharpe={metrics['sharpe']:.2f}")
+        print(f"Tested gamma={res['gamma']}, k={res['k']}: Sharpe={res['sharpe']:.2f}")
         
     # Find best parameters
-    df_results = pd.DataFrame(results)
+    df_results = pd.DataFrame(results).sort_values(['gamma', 'k'], ignore_index=True)
     best_sharpe = df_results.loc[df_results['sharpe'].idxmax()]
     
     print("\noptimization Results:")
@@ -68,5 +65,245 @@ def run_grid_search():
     df_results.to_csv('optimization_results.csv', index=False)
     print("Results saved to optimization_results.csv")
 
+def sample_candidates(search_space, n, rng):
+    """Draw `n` random parameter sets from a search space."""
+    candidates = [{} for _ in range(n)]
+    for name, (kind, spec) in search_space.items():
+        if kind == 'log':
+            values = np.exp(rng.uniform(np.log(spec[0]), np.log(spec[1]), n))
+        elif kind == 'uniform':
+            values = rng.uniform(spec[0], spec[1], n)
+        elif kind == 'int':
+            values = rng.integers(spec[0], spec[1] + 1, n)
+        elif kind == 'logint':
+            values = np.floor(spec[0] * ((spec[1] + 1) / spec[0]) ** rng.uniform(0, 1, n)).astype(int)
+        elif kind == 'choice':
+            values = rng.choice(spec, n)
+        else:
+            raise ValueError(f"Unknown search space kind '{kind}' for {name}")
+        for candidate, value in zip(candidates, values):
+            candidate[name] = value.item()
+    return candidates
+
+def _to_unit(search_space, candidate):
+    """Map a parameter set to [0, 1] per dimension (log scale for 'log', choice index centres)."""
+    u = []
+    for name, (kind, spec) in search_space.items():
+        value = candidate[name]
+        if kind == 'log':
+            u.append(math.log(value / spec[0]) / math.log(spec[1] / spec[0]))
+        elif kind == 'uniform':
+            u.append((value - spec[0]) / (spec[1] - spec[0]))
+        elif kind == 'int':
+            u.append((value - spec[0] + 0.5) / (spec[1] - spec[0] + 1))
+        elif kind == 'logint':
+            u.append(math.log((value + 0.5) / spec[0]) / math.log((spec[1] + 1) / spec[0]))
+        elif kind == 'choice':
+            u.append((list(spec).index(value) + 0.5) / len(spec))
+        else:
+            raise ValueError(f"Unknown search space kind '{kind}' for {name}")
+    return np.array(u)
+
+def _from_unit(search_space, u):
+    """Inverse of `_to_unit` for a point in the unit cube."""
+    u = np.clip(u, 0.0, np.nextafter(1.0, 0.0))
+    candidate = {}
+    for x, (name, (kind, spec)) in zip(u, search_space.items()):
+        if kind == 'log':
+            candidate[name] = float(spec[0] * (spec[1] / spec[0]) ** x)
+        elif kind == 'uniform':
+            candidate[name] = float(spec[0] + x * (spec[1] - spec[0]))
+        elif kind == 'int':
+            candidate[name] = int(spec[0] + math.floor(x * (spec[1] - spec[0] + 1)))
+        elif kind == 'logint':
+            candidate[name] = int(math.floor(spec[0] * ((spec[1] + 1) / spec[0]) ** x))
+        elif kind == 'choice':
+            candidate[name] = spec[int(x * len(spec))]
+        else:
+            raise ValueError(f"Unknown search space kind '{kind}' for {name}")
+    return candidate
+
+def latin_hypercube_candidates(search_space, n, rng):
+    """`n` parameter sets from a Latin hypercube: every dimension is split into
+    `n` equal strata (in log space for 'log') and each stratum is hit once."""
+    d = len(search_space)
+    u = (np.argsort(rng.random((n, d)), axis=0) + rng.random((n, d))) / n
+    return [_from_unit(search_space, row) for row in u]
+
+def perturb_candidates(search_space, parents, n_per_parent, scale, rng):
+    """`n_per_parent` Gaussian neighbours of each parent, `scale` wide in unit-cube coordinates."""
+    children = []
+    for parent in parents:
+        centre = _to_unit(search_space, parent)
+        for _ in range(n_per_parent):
+            children.append(_from_unit(search_space, centre + rng.normal(0.0, scale, centre.size)))
+    return children
+
+def _evaluate_candidate(params, market, n_paths, seed):
+    """Mean/std of per-path Sharpe for one candidate on `n_paths` paths."""
+    df = run_vectorized_backtest(n_paths=n_paths, seed=np.random.default_rng(seed), **market, **params)
+    return {
+        'score': df['sharpe'].mean(),
+        'score_se': df['sharpe'].std(ddof=1) / math.sqrt(n_paths) if n_paths > 1 else float('nan'),
+        'total_return': df['total_return'].mean(),
+        'max_dd': df['max_drawdown'].mean(),
+    }
+
+def run_successive_halving(search_space=None, market=None, n_candidates=243, min_paths=2, eta=3,
+                           refine_rounds=None, refine_scale=0.1, seed=None, max_workers=None):
+    """
+    Adaptive parameter search by successive halving with common random numbers.
+    
+    Starts with `n_candidates` parameter sets from a Latin hypercube over the
+    search space, evaluated on `min_paths` Monte Carlo paths each. After every
+    round only 1/eta of the pool goes on, re-evaluated on eta times more paths.
+    Within a round every candidate sees the same paths (common random numbers),
+    so rankings reflect parameter differences rather than path luck.
+    
+    Cuts are refinement rounds (the first `refine_rounds` of them, every cut
+    that keeps at least eta candidates when None): only the best 1/eta of
+    the survivors are kept and the rest of the next pool is filled with
+    neighbours sampled around them (`refine_scale` wide in unit-cube
+    coordinates, shrinking by eta each time). The pool, and so the path
+    budget, is the same as plain halving, but the later rounds search near
+    the good region instead of only re-ranking the first draws.
+    
+    Returns:
+        (best_params, history DataFrame with one row per evaluation)
+    """
+    search_space = search_space or DEFAULT_SEARCH_SPACE
+    market = dict(DEFAULT_SEARCH_MARKET, **(market or {}))
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    rng = np.random.default_rng(root.spawn(1)[0])
+    candidates = latin_hypercube_candidates(search_space, n_candidates, rng)
+    
+    history = []
+    n_paths = min_paths
+    rnd = 0
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        while True:
+            round_seed = root.spawn(1)[0]  # shared by all candidates this round
+            futures = [pool.submit(_evaluate_candidate, c, market, n_paths, round_seed) for c in candidates]
+            scores = []
+            for candidate, future in zip(candidates, futures):
+                res = future.result()
+                history.append(dict(candidate, round=rnd, n_paths=n_paths, **res))
+                scores.append(res['score'])
+            print(f"Round {rnd}: {len(candidates)} candidates x {n_paths} paths, best score={max(scores):.3f}")
+            
+            if len(candidates) == 1:
+                break
+            keep = max(1, math.ceil(len(candidates) / eta))
+            order = np.argsort(scores)[::-1]
+            if (refine_rounds is None or rnd < refine_rounds) and keep >= eta:
+                parents = [candidates[i] for i in order[:math.ceil(keep / eta)]]
+                children = perturb_candidates(search_space, parents, eta - 1, refine_scale / eta ** rnd, rng)
+                candidates = parents + children[:keep - len(parents)]
+            else:
+                candidates = [candidates[i] for i in order[:keep]]
+            n_paths *= eta
+            rnd += 1
+    
+    return candidates[0], pd.DataFrame(history)
+
+def grid_candidates(search_space, points=4):
+    """Every combination of `points` values per continuous dimension and every choice."""
+    axes = {}
+    for name, (kind, spec) in search_space.items():
+        if kind == 'log':
+            axes[name] = np.geomspace(spec[0], spec[1], points).tolist()
+        elif kind == 'uniform':
+            axes[name] = np.linspace(spec[0], spec[1], points).tolist()
+        elif kind == 'int':
+            axes[name] = sorted(set(np.rint(np.linspace(spec[0], spec[1], points)).astype(int).tolist()))
+        elif kind == 'logint':
+            axes[name] = sorted(set(np.rint(np.geomspace(spec[0], spec[1], points)).astype(int).tolist()))
+        elif kind == 'choice':
+            axes[name] = list(spec)
+        else:
+            raise ValueError(f"Unknown search space kind '{kind}' for {name}")
+    return [dict(zip(axes, values)) for values in product(*axes.values())]
+
+def run_grid_baseline(search_space=None, market=None, points=4, n_paths=16, seed=None, max_workers=None):
+    """
+    Exhaustive grid over the same search space and evaluator as
+    `run_successive_halving`: every cell on the same `n_paths` paths.
+
+    Returns:
+        (best_params, history DataFrame with one row per cell)
+    """
+    search_space = search_space or DEFAULT_SEARCH_SPACE
+    market = dict(DEFAULT_SEARCH_MARKET, **(market or {}))
+    candidates = grid_candidates(search_space, points)
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    paths_seed = root.spawn(1)[0]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_evaluate_candidate, c, market, n_paths, paths_seed) for c in candidates]
+        history = [dict(c, n_paths=n_paths, **f.result()) for c, f in zip(candidates, futures)]
+    df = pd.DataFrame(history)
+    best = candidates[int(df['score'].idxmax())]
+    return best, df
+
+def params_at_bounds(params, search_space=None, rtol=0.02):
+    """Names of continuous parameters within `rtol` of their search-space bound."""
+    search_space = search_space or DEFAULT_SEARCH_SPACE
+    hits = []
+    for name, (kind, spec) in search_space.items():
+        if kind in ('log', 'uniform', 'int', 'logint'):
+            lo, hi = spec
+            if params[name] <= lo * (1 + rtol) or params[name] >= hi * (1 - rtol):
+                hits.append(name)
+    return hits
+
+def compare_with_grid(search_space=None, market=None, seed=None, points=4, grid_paths=16,
+                      holdout_paths=2000, max_workers=None, **halving_kwargs):
+    """
+    Budget and quality of successive halving against an exhaustive grid.
+
+    Both searches run on the same search space and evaluator; each winner is
+    then re-scored on `holdout_paths` fresh paths shared by both, so the
+    comparison is not biased by the paths the searches selected on.
+
+    Returns:
+        DataFrame with one row per method: evaluations, simulated paths,
+        in-search score, held-out score and its standard error, best params.
+    """
+    search_space = search_space or DEFAULT_SEARCH_SPACE
+    market = dict(DEFAULT_SEARCH_MARKET, **(market or {}))
+    halving_seed, grid_seed, holdout_seed = np.random.SeedSequence(seed).spawn(3)
+    best_sh, hist_sh = run_successive_halving(search_space, market, seed=halving_seed,
+                                              max_workers=max_workers, **halving_kwargs)
+    best_grid, hist_grid = run_grid_baseline(search_space, market, points=points, n_paths=grid_paths,
+                                             seed=grid_seed, max_workers=max_workers)
+    rows = []
+    for method, best, hist in (('successive_halving', best_sh, hist_sh), ('grid', best_grid, hist_grid)):
+        in_search = hist[(hist[list(best)] == pd.Series(best)).all(axis=1)]['score'].iloc[-1]
+        holdout = _evaluate_candidate(best, market, holdout_paths, holdout_seed)
+        rows.append({'method': method, 'evaluations': len(hist), 'simulated_paths': int(hist['n_paths'].sum()),
+                     'search_score': in_search, 'holdout_score': holdout['score'],
+                     'holdout_se': holdout['score_se'], 'at_bounds': params_at_bounds(best, search_space),
+                     'params': best})
+    return pd.DataFrame(rows)
+
 if __name__ == "__main__":
-    run_grid_search()
+    print("Starting Parameter Optimization (Successive Halving)...")
+    best, df_history = run_successive_halving(seed=42)
+    total_paths = df_history['n_paths'].sum()
+    
+    print("\noptimization Results (final round):")
+    print(df_history[df_history['round'] == df_history['round'].max()])
+    print(f"\nBest Parameters: {best}")
+    print(f"Simulated paths: {total_paths}")
+    for name in params_at_bounds(best):
+        print(f"Warning: best {name}={best[name]:.4g} is on the search-space bound {DEFAULT_SEARCH_SPACE[name][1]}; "
+              f"the optimum may lie outside it")
+    
+    # Separate file: optimization_results.csv holds the grid search's schema
+    df_history.to_csv('optimization_halving_results.csv', index=False)
+    print("Results saved to optimization_halving_results.csv")
+    
+    print("\nComparing against an exhaustive grid (held-out paths)...")
+    comparison = compare_with_grid(seed=42)
+    print(comparison.drop(columns='params').to_string(index=False))
+    for method, params in zip(comparison['method'], comparison['params']):
+        print(f"{method}: {params}")
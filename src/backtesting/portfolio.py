@@ -0,0 +1,269 @@
+import multiprocessing as mp
+import os
+import sys
+import time
+from threading import BrokenBarrierError
+
+import numpy as np
+import pandas as pd
+
+# Ensure src is in python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from src.backtesting.engine import BacktestEngine
+from src.backtesting.metrics import StreamingMetrics
+from src.backtesting.scenario_runner import DEFAULT_MARKET_PARAMS, ScenarioJob
+from src.live.shm import SharedArrays
+from src.strategy.avellaneda_stoikov import AvellanedaStoikovMarketMaker
+
+# Per-symbol metrics a worker publishes, in column order of the `metrics` array
+METRIC_FIELDS = ['sharpe', 'max_drawdown', 'total_return', 'n_fills', 'turnover',
+                 'traded_quantity', 'inventory_mean', 'inventory_std', 'max_abs_inventory']
+# Per-symbol state a worker publishes at every sync point
+STATE_FIELDS = ['inventory', 'capital', 'mid', 'equity', 'rejected']
+STATE = {name: i for i, name in enumerate(STATE_FIELDS)}
+
+
+def _symbol_worker(index, job, shm_name, layout, barrier, sync_every):
+    """
+    Simulate one symbol in lockstep with the coordinator.
+
+    Runs `sync_every` steps at a time. Within a batch the net position change
+    is capped by the buy/sell budget the coordinator wrote to `limits`; at the
+    end of the batch the worker publishes its state and waits for new budgets.
+    """
+    shared = SharedArrays(layout, name=shm_name)
+    try:
+        market = dict(DEFAULT_MARKET_PARAMS, **job.market_params)
+        rng = np.random.default_rng(job.seed)
+        strategy = AvellanedaStoikovMarketMaker(**job.strategy_params)
+        engine = BacktestEngine(initial_capital=market['initial_capital'],
+                                max_position=market['max_position'],
+                                mark_interval_ms=0)
+
+        n_steps = market['n_steps']
+        prices = market['initial_price'] + np.concatenate(
+            ([0.0], np.cumsum(rng.normal(0, market['price_vol'], n_steps))))
+        fill_draws = rng.random((n_steps, 2))
+        quantity = market['quantity']
+        sigma = market['sigma']
+        T = strategy.T
+
+        state = shared['state'][index]
+        limits = shared['limits'][index]
+        equity_out = shared['equity'][index]
+        inventory_out = shared['inventory'][index]
+        rejected = 0
+
+        for start in range(0, n_steps, sync_every):
+            buy_budget, sell_budget = int(limits[0]), int(limits[1])
+            batch_start_inventory = engine.inventory
+            for i in range(start, min(start + sync_every, n_steps)):
+                current_time = i * 1_000_000_000  # one step per second, in ns
+                price = float(prices[i])
+                time_left = max(0, T - (i / n_steps) * T)
+                engine.update_mid(price, current_time)
+
+                quotes = strategy.quote(price, engine.inventory, sigma=sigma, time_left=time_left)
+                prob_fill = np.exp(-strategy.k * quotes['spread'] / 2)
+
+                if fill_draws[i, 0] < prob_fill:
+                    if engine.inventory + quantity - batch_start_inventory <= buy_budget:
+                        engine.process_fill('buy', quotes['bid'], quantity, current_time)
+                    else:
+                        rejected += 1
+                if fill_draws[i, 1] < prob_fill:
+                    if batch_start_inventory - (engine.inventory - quantity) <= sell_budget:
+                        engine.process_fill('sell', quotes['ask'], quantity, current_time)
+                    else:
+                        rejected += 1
+
+                equity_out[i] = engine.capital + engine.inventory * price
+                inventory_out[i] = engine.inventory
+
+            state[:] = (engine.inventory, engine.capital, engine.mid_price,
+                        engine.capital + engine.inventory * engine.mid_price, rejected)
+            barrier.wait()  # state published
+            barrier.wait()  # new limits written
+
+        snapshot = engine.calculate_metrics()
+        shared['metrics'][index] = [snapshot[field] for field in METRIC_FIELDS]
+    finally:
+        shared.close()
+
+
+class PortfolioBacktester:
+    """
+    Multi-symbol backtest with one worker process per symbol and a coordinator
+    enforcing portfolio-wide exposure limits.
+
+    Workers and coordinator share a single block of memory: workers write their
+    positions, cash and marks, the coordinator writes per-symbol trading budgets
+    back. Every `sync_every` steps they meet at a barrier, the coordinator
+    aggregates gross and net exposure, and splits the remaining headroom evenly
+    across symbols as the maximum net buy/sell quantity for the next batch, so
+    the limits hold (at sync-time marks) however the symbols trade in between.
+    Trades that reduce a symbol's position always fit the gross budget.
+    """
+
+    def __init__(self, jobs, max_gross=None, max_net=None, sync_every=50, timeout=60.0):
+        """
+        Args:
+            jobs: list of ScenarioJob, one per symbol (tag = symbol name). All
+                jobs must share the same n_steps.
+            max_gross (float): limit on sum(|position| * mid), None for no limit.
+            max_net (float): limit on |sum(position * mid)|, None for no limit.
+            sync_every (int): steps between coordinator syncs; larger batches
+                mean less synchronization but coarser risk control.
+            timeout (float): seconds to wait at a sync before giving up on the workers.
+        """
+        self.jobs = list(jobs)
+        self.symbols = [job.tag for job in self.jobs]
+        n_steps = {dict(DEFAULT_MARKET_PARAMS, **job.market_params)['n_steps'] for job in self.jobs}
+        if len(n_steps) != 1:
+            raise ValueError("All symbols must run for the same number of steps")
+        self.n_steps = n_steps.pop()
+        self.initial_capital = sum(dict(DEFAULT_MARKET_PARAMS, **job.market_params)['initial_capital']
+                                   for job in self.jobs)
+        self.max_gross = max_gross
+        self.max_net = max_net
+        self.sync_every = sync_every
+        self.timeout = timeout
+        self.exposure_history = []
+
+    def _budgets(self, state):
+        """Per-symbol (buy, sell) quantity budgets for the next batch."""
+        inventory, mid = state[:, STATE['inventory']], state[:, STATE['mid']]
+        n = len(self.jobs)
+        notional = inventory * mid
+        gross, net = np.abs(notional).sum(), notional.sum()
+
+        gross_room = np.inf if self.max_gross is None else max(self.max_gross - gross, 0.0)
+        long_room = np.inf if self.max_net is None else max(self.max_net - net, 0.0)
+        short_room = np.inf if self.max_net is None else max(self.max_net + net, 0.0)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Buying back a short (selling down a long) never adds gross exposure
+            buy = np.minimum(gross_room / n / mid + np.maximum(-inventory, 0), long_room / n / mid)
+            sell = np.minimum(gross_room / n / mid + np.maximum(inventory, 0), short_room / n / mid)
+        big = np.iinfo(np.int64).max // 2
+        budgets = np.empty((n, 2), dtype=np.int64)
+        budgets[:, 0] = np.where(np.isfinite(buy), np.floor(np.nan_to_num(buy)), big)
+        budgets[:, 1] = np.where(np.isfinite(sell), np.floor(np.nan_to_num(sell)), big)
+        return budgets, gross, net
+
+    def run(self):
+        """
+        Run all symbols to completion.
+
+        Returns:
+            dict with 'symbols' (per-symbol metrics DataFrame), 'portfolio'
+            (portfolio metrics dict), 'equity' (per-step DataFrame of symbol and
+            total equity) and 'exposure' (gross/net at each sync).
+        """
+        n = len(self.jobs)
+        layout = {
+            'state': ((n, len(STATE_FIELDS)), np.float64),
+            'limits': ((n, 2), np.int64),
+            'equity': ((n, self.n_steps), np.float64),
+            'inventory': ((n, self.n_steps), np.int64),
+            'metrics': ((n, len(METRIC_FIELDS)), np.float64),
+        }
+        shared = SharedArrays(layout)
+        barrier = mp.Barrier(n + 1, timeout=self.timeout)
+        workers = []
+        try:
+            for index, job in enumerate(self.jobs):
+                market = dict(DEFAULT_MARKET_PARAMS, **job.market_params)
+                shared['state'][index, STATE['inventory']] = 0
+                shared['state'][index, STATE['mid']] = market['initial_price']
+            shared['limits'][:], _, _ = self._budgets(shared['state'])
+
+            for index, job in enumerate(self.jobs):
+                worker = mp.Process(target=_symbol_worker, name=f"portfolio-{job.tag}",
+                                    args=(index, job, shared.name, layout, barrier, self.sync_every))
+                worker.start()
+                workers.append(worker)
+
+            self.exposure_history = []
+            for start in range(0, self.n_steps, self.sync_every):
+                barrier.wait()  # all workers published their state
+                budgets, gross, net = self._budgets(shared['state'])
+                step = min(start + self.sync_every, self.n_steps) - 1
+                self.exposure_history.append((step, gross, net))
+                shared['limits'][:] = budgets
+                barrier.wait()  # release workers into the next batch
+
+            for worker in workers:
+                worker.join(self.timeout)
+            failed = [w.name for w in workers if w.exitcode != 0]
+            if failed:
+                raise RuntimeError(f"Portfolio workers failed: {failed}")
+            return self._collect(shared)
+        except BrokenBarrierError:
+            raise RuntimeError("A portfolio worker stopped responding") from None
+        finally:
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()
+                    worker.join()
+            shared.close()
+            shared.unlink()
+
+    def _collect(self, shared):
+        symbols = pd.DataFrame(shared['metrics'].copy(), columns=METRIC_FIELDS)
+        symbols.insert(0, 'symbol', self.symbols)
+        symbols['final_inventory'] = shared['state'][:, STATE['inventory']].astype(np.int64)
+        symbols['rejected_fills'] = shared['state'][:, STATE['rejected']].astype(np.int64)
+
+        equity = pd.DataFrame(shared['equity'].T.copy(), columns=self.symbols)
+        equity['portfolio'] = equity[self.symbols].sum(axis=1)
+
+        # Anchored at the capital the symbols started with, not the first mark,
+        # so the first step's P&L counts towards returns and drawdown
+        portfolio = StreamingMetrics(self.initial_capital)
+        for value, inv in zip(equity['portfolio'].to_numpy(),
+                              np.abs(shared['inventory']).sum(axis=0)):
+            portfolio.update_equity(value)
+            portfolio.update_inventory(inv)
+        summary = portfolio.snapshot()
+        # Inventory stats above are for the gross position; fills come from the symbols
+        summary['n_fills'] = int(symbols['n_fills'].sum())
+        summary['traded_quantity'] = int(symbols['traded_quantity'].sum())
+        summary['turnover'] = float(symbols['turnover'].sum())
+        summary['final_equity'] = portfolio.last_equity
+
+        exposure = pd.DataFrame(self.exposure_history, columns=['step', 'gross', 'net'])
+        return {'symbols': symbols, 'portfolio': summary, 'equity': equity, 'exposure': exposure}
+
+
+def run_portfolio_backtest(stocks=('RELIANCE', 'TCS', 'INFY', 'HDFCBANK'), gamma=0.1, k=1.5,
+                           sim_steps=1000, max_gross=None, max_net=None, sync_every=50, seed=None):
+    """Portfolio version of the batch backtest: same stocks, run concurrently under shared limits."""
+    seeds = np.random.SeedSequence(seed).spawn(len(stocks))
+    jobs = []
+    for stock, seed_seq in zip(stocks, seeds):
+        stock_rng = np.random.default_rng(seed_seq.spawn(1)[0])
+        market = {
+            'n_steps': sim_steps,
+            'initial_price': 100 + stock_rng.standard_normal() * 10,
+            'sigma': stock_rng.uniform(1.0, 5.0),
+            'price_vol': 0.1,
+        }
+        jobs.append(ScenarioJob({'gamma': gamma, 'k': k}, market, seed_seq, stock))
+    return PortfolioBacktester(jobs, max_gross=max_gross, max_net=max_net,
+                               sync_every=sync_every).run()
+
+
+if __name__ == "__main__":
+    print("Starting Portfolio Backtest...")
+    start = time.perf_counter()
+    results = run_portfolio_backtest(max_gross=20000, max_net=5000, seed=42)
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+    print(results['symbols'].to_string(index=False))
+    print("\nPortfolio:")
+    for key, value in results['portfolio'].items():
+        print(f"  {key}: {value:.4f}" if isinstance(value, float) else f"  {key}: {value}")
+    exposure = results['exposure']
+    print(f"\nPeak gross exposure: {exposure['gross'].max():.0f}, "
+          f"peak |net| exposure: {exposure['net'].abs().max():.0f}")
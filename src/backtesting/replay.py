@@ -0,0 +1,340 @@
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Ensure src is in python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from src.analysis.result_cache import make_key
+from src.backtesting import checkpoint as ckpt
+from src.backtesting.engine import BacktestEngine
+from src.data_pipeline.lob_events import (CANCEL, TRADE, BUY, SELL, TICK_SIZE,
+                                          SIDE_NAMES, apply_event, generate_synthetic_events,
+                                          load_events)
+from src.data_pipeline.lob_structure import LimitOrderBook
+from src.strategy.avellaneda_stoikov import AvellanedaStoikovMarketMaker
+
+
+class RestingOrder:
+    """One of our passive orders, tracked outside the book (no market impact)."""
+    __slots__ = ('side', 'price', 'quantity', 'queue_ahead')
+
+    def __init__(self, side, price, quantity, queue_ahead):
+        self.side = side
+        self.price = price
+        self.quantity = quantity
+        self.queue_ahead = queue_ahead
+
+
+class ReplayBacktester:
+    """
+    Event-driven backtest that replays LOB events through a LimitOrderBook.
+
+    The strategy's quotes rest as virtual limit orders with a queue position:
+    they join behind the volume already at their price, move up the queue as
+    trades at that price consume it (and pro-rata as it is cancelled), and are
+    filled only when the queue ahead is exhausted or a trade prints through
+    their price. A quote is only re-placed, losing its queue position, when its
+    price changes.
+    """
+
+    def __init__(self, strategy, engine=None, sigma=2.0, quote_size=1,
+                 requote_every=10, tick_size=TICK_SIZE, indicators=None, rng=None):
+        """
+        Args:
+            strategy: object with quote(mid_price, inventory, sigma, time_left).
+            engine (BacktestEngine): receives the fills and mid updates; a default
+                one marking to mid every 100 ms is created if None.
+            sigma (float): volatility passed to the strategy.
+            quote_size (int): quantity of each resting quote.
+            requote_every (int): number of book events between strategy re-quotes.
+            tick_size (float): quotes are rounded away from mid onto this grid.
+            indicators (IndicatorEngine): optional, fed with every book/trade event.
+            rng (np.random.Generator): optional randomness of strategy extensions;
+                its state is saved with checkpoints.
+        """
+        self.strategy = strategy
+        self.engine = engine if engine is not None else BacktestEngine(mark_interval_ms=100)
+        self.sigma = sigma
+        self.quote_size = quote_size
+        self.requote_every = requote_every
+        self.tick_size = tick_size
+        self.indicators = indicators
+        self.lob = LimitOrderBook()
+        self.orders = {BUY: None, SELL: None}
+        self.rng = rng
+        self.n_fills = 0
+        self.n_events = 0
+        self.start_ns = None    # first event time and horizon of the run, kept so
+        self.horizon_ns = None  # that a resumed run computes the same time_left
+
+    def _place(self, side, price):
+        """Place or keep our quote on one side; None pulls the quote."""
+        current = self.orders[side]
+        if price is None or (isinstance(price, float) and math.isnan(price)):
+            self.orders[side] = None
+            return
+        if side == BUY:
+            price = round(math.floor(price / self.tick_size + 1e-9) * self.tick_size, 2)
+            if self.lob.best_ask < float('inf') and price >= self.lob.best_ask:
+                price = round(self.lob.best_ask - self.tick_size, 2)  # post-only
+            queue = self.lob.bids.get(price, 0)
+        else:
+            price = round(math.ceil(price / self.tick_size - 1e-9) * self.tick_size, 2)
+            if self.lob.best_bid > 0 and price <= self.lob.best_bid:
+                price = round(self.lob.best_bid + self.tick_size, 2)
+            queue = self.lob.asks.get(price, 0)
+        if current is not None and current.price == price:
+            return  # unchanged: keep queue position
+        self.orders[side] = RestingOrder(side, price, self.quote_size, queue)
+
+    def _requote(self, time_left):
+        mid = self.lob.get_mid_price()
+        if mid is None:
+            return
+        quotes = self.strategy.quote(mid, self.engine.inventory, self.sigma, time_left)
+        self._place(BUY, quotes['bid'])
+        self._place(SELL, quotes['ask'])
+
+    def _fill(self, order, quantity, timestamp):
+        if self.engine.process_fill(SIDE_NAMES[order.side], order.price, quantity, timestamp):
+            self.n_fills += 1
+        order.quantity -= quantity
+        if order.quantity <= 0:
+            self.orders[order.side] = None
+
+    def _on_trade(self, aggressor, price, quantity, timestamp):
+        # A buy aggressor can only hit our ask, a sell aggressor our bid
+        order = self.orders[-aggressor]
+        if order is None:
+            return
+        if order.side == BUY:
+            through = price < order.price
+            at_level = price == order.price
+        else:
+            through = price > order.price
+            at_level = price == order.price
+        if through:
+            self._fill(order, order.quantity, timestamp)
+        elif at_level:
+            left = quantity - order.queue_ahead
+            order.queue_ahead = max(0, order.queue_ahead - quantity)
+            if left > 0:
+                self._fill(order, min(left, order.quantity), timestamp)
+
+    def _on_cancel(self, side, price, quantity):
+        order = self.orders[side]
+        if order is None or order.price != price or order.queue_ahead <= 0:
+            return
+        level = (self.lob.bids if side == BUY else self.lob.asks).get(price, 0)
+        if level > 0:
+            # Cancels are assumed to be spread pro-rata over the queue, rounded
+            # to whole shares so queue positions and fills stay integral
+            share = int(round(quantity * order.queue_ahead / level))
+            order.queue_ahead = max(0, order.queue_ahead - share)
+
+    def run(self, events, horizon_ns=None, start_index=0, checkpoint_every=None, checkpoint_dir=None):
+        """
+        Replay an event array (EVENT_DTYPE) and return the backtest metrics.
+
+        Args:
+            events: structured array from lob_events (synthetic or recorded).
+            horizon_ns (int): strategy horizon T in nanoseconds; defaults to the
+                span of the events.
+            start_index (int): first event to process, e.g. the position
+                stored in a checkpoint.
+            checkpoint_every (int): write a checkpoint to `checkpoint_dir`
+                every this many events; None disables checkpointing.
+
+        Returns:
+            dict: engine metrics plus fill/event counts and replay speed.
+        """
+        if len(events) <= start_index:
+            return self.engine.calculate_metrics()
+        if self.start_ns is None:
+            self.start_ns = int(events['timestamp'][0])
+            self.horizon_ns = horizon_ns or max(1, int(events['timestamp'][-1]) - self.start_ns)
+        events = events[start_index:]
+        # Column lists iterate much faster than structured array rows
+        ts_col = events['timestamp'].tolist()
+        kind_col = events['kind'].tolist()
+        side_col = events['side'].tolist()
+        price_col = events['price'].tolist()
+        qty_col = events['quantity'].tolist()
+
+        start, horizon_ns = self.start_ns, self.horizon_ns
+        T = self.strategy.T
+        if checkpoint_every and checkpoint_dir is None:
+            raise ValueError("checkpoint_every needs a checkpoint_dir")
+        wall_start = time.perf_counter()
+
+        for i in range(len(ts_col)):
+            ts, kind, side, price, qty = ts_col[i], kind_col[i], side_col[i], price_col[i], qty_col[i]
+            if kind == TRADE:
+                self._on_trade(side, price, qty, ts)
+                if self.indicators is not None:
+                    self.indicators.on_trade(price, qty, SIDE_NAMES[side], ts * 1e-9)
+            elif kind == CANCEL:
+                self._on_cancel(side, price, qty)
+            apply_event(self.lob, kind, side, price, qty, ts * 1e-9)
+            self.engine.update_mid(self.lob.get_mid_price(), ts)
+            if self.indicators is not None:
+                self.indicators.on_book_update(self.lob, ts * 1e-9)
+
+            self.n_events += 1
+            if self.n_events % self.requote_every == 0:
+                time_left = max(0.0, T * (1 - (ts - start) / horizon_ns))
+                self._requote(time_left)
+            if checkpoint_every and (i + 1) % checkpoint_every == 0:
+                position = start_index + i + 1
+                self.save_checkpoint(ckpt.checkpoint_path(checkpoint_dir, position), position)
+
+        elapsed = time.perf_counter() - wall_start
+        metrics = self.engine.calculate_metrics()
+        metrics.update({
+            'n_events': self.n_events,
+            'final_inventory': self.engine.inventory,
+            'events_per_second': len(ts_col) / elapsed if elapsed > 0 else float('inf'),
+            'speedup_vs_realtime': (ts_col[-1] - ts_col[0]) * 1e-9 / elapsed if elapsed > 0 else float('inf'),
+        })
+        return metrics
+
+    def save_checkpoint(self, path, position):
+        """
+        Write engine, book, strategy, resting quotes and RNG state to `path`.
+
+        Args:
+            position (int): index of the next event to replay on resume.
+        """
+        arrays = {}
+        orders = [[o.side, o.price, o.quantity, o.queue_ahead]
+                  for o in (self.orders[BUY], self.orders[SELL]) if o is not None]
+        meta = {
+            'position': position,
+            'engine': ckpt.engine_state(self.engine, arrays),
+            'book': ckpt.book_state(self.lob, arrays),
+            'strategy': ckpt.strategy_state(self.strategy, arrays),
+            'rng': None if self.rng is None else ckpt.rng_state(self.rng),
+            'replay': {
+                'sigma': self.sigma, 'quote_size': self.quote_size,
+                'requote_every': self.requote_every, 'tick_size': self.tick_size,
+                'n_fills': self.n_fills, 'n_events': self.n_events,
+                'start_ns': self.start_ns, 'horizon_ns': self.horizon_ns,
+                'orders': orders,
+            },
+        }
+        return ckpt.save_checkpoint(path, meta, arrays)
+
+    @classmethod
+    def from_checkpoint(cls, path, strategy_overrides=None, **overrides):
+        """
+        Rebuild a backtester from a checkpoint.
+
+        Args:
+            strategy_overrides (dict): strategy attributes to change, e.g.
+                {'gamma': 0.5} to fork a what-if from this point.
+            overrides: replay settings to change (sigma, quote_size, requote_every).
+
+        Returns:
+            (ReplayBacktester, position): position is the next event to replay.
+        """
+        state = ckpt.restore_common(path, strategy_overrides)
+        settings = state.meta['replay']
+        rng = None if state.meta['rng'] is None else ckpt.restore_rng(state.meta['rng'])
+        backtester = cls(state.strategy, state.engine,
+                         sigma=overrides.get('sigma', settings['sigma']),
+                         quote_size=overrides.get('quote_size', settings['quote_size']),
+                         requote_every=overrides.get('requote_every', settings['requote_every']),
+                         tick_size=settings['tick_size'], rng=rng)
+        ckpt.restore_book(backtester.lob, state.meta['book'], state.arrays)
+        for side, price, quantity, queue_ahead in settings['orders']:
+            backtester.orders[side] = RestingOrder(side, price, quantity, queue_ahead)
+        backtester.n_fills = settings['n_fills']
+        backtester.n_events = settings['n_events']
+        backtester.start_ns = settings['start_ns']
+        backtester.horizon_ns = settings['horizon_ns']
+        return backtester, state.meta['position']
+
+
+def resume_replay(checkpoint_path, events, strategy_overrides=None, **overrides):
+    """
+    Continue a replay from a checkpoint over the same events.
+
+    Args:
+        events: the event array, or a path for load_events (memory-mapped).
+    """
+    if isinstance(events, str):
+        events = load_events(events, mmap=True)
+    backtester, position = ReplayBacktester.from_checkpoint(checkpoint_path, strategy_overrides, **overrides)
+    metrics = backtester.run(events, start_index=position)
+    metrics['resumed_from'] = position
+    return metrics
+
+
+def _run_fork(args):
+    checkpoint_path, events, variant = args
+    variant = dict(variant)
+    strategy_overrides = variant.pop('strategy', None)
+    return resume_replay(checkpoint_path, events, strategy_overrides, **variant)
+
+
+def fork_replay(checkpoint_path, events, variants, max_workers=None):
+    """
+    Run several what-if variants from one checkpoint in parallel.
+
+    Args:
+        events: path of a saved event file (each worker memory-maps it) or an
+            event array (pickled to each worker).
+        variants (list of dict): replay overrides per variant; a 'strategy'
+            key holds strategy attribute overrides, e.g.
+            [{'strategy': {'gamma': 0.05}}, {'strategy': {'gamma': 0.5}, 'sigma': 0.1}].
+
+    Returns:
+        list of metrics dicts, in the order of `variants`.
+    """
+    args = [(checkpoint_path, events, variant) for variant in variants]
+    if max_workers == 1:
+        return [_run_fork(a) for a in args]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_run_fork, args))
+
+
+def run_replay_backtest(events=None, gamma=0.1, k=20.0, sigma=0.05, n_events=100000, seed=42,
+                        checkpoint_every=None, checkpoint_dir=None, cache=None):
+    """
+    Replay recorded events (or a synthetic day) through an A-S strategy.
+
+    Args:
+        events: event array, a path for load_events, or None for a synthetic day.
+        cache (ResultCache): memoizes the metrics of runs without checkpoints.
+            A path is keyed on the file's identity, an array on its contents.
+    """
+    path = events if isinstance(events, str) else None
+    key = None
+    if cache is not None and not checkpoint_every:
+        key = make_key('replay_backtest', data_files=(path,) if path else (),
+                       events=events if path is None else None,
+                       synthetic=[n_events, seed] if events is None else None,
+                       gamma=gamma, k=k, sigma=sigma)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    if path is not None:
+        events = load_events(path, mmap=True)
+    elif events is None:
+        events = generate_synthetic_events(n_events, seed=seed)
+    strategy = AvellanedaStoikovMarketMaker(gamma=gamma, k=k, T=1.0)
+    backtester = ReplayBacktester(strategy, BacktestEngine(initial_capital=100000, mark_interval_ms=100), sigma=sigma)
+    metrics = backtester.run(events, checkpoint_every=checkpoint_every, checkpoint_dir=checkpoint_dir)
+    if key is not None:
+        cache.put(key, metrics)
+    return metrics
+
+
+if __name__ == "__main__":
+    print("Running queue-position replay backtest on synthetic events...")
+    results = run_replay_backtest()
+    for key, value in results.items():
+        print(f"{key}: {value}")
@@ -0,0 +1,160 @@
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+
+import numpy as np
+
+# Ensure src is in python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from src.analysis.result_cache import make_key
+from src.backtesting.engine import BacktestEngine
+from src.strategy.avellaneda_stoikov import AvellanedaStoikovMarketMaker
+
+# strategy_params: kwargs for AvellanedaStoikovMarketMaker (gamma, k, T)
+# market_params: overrides of DEFAULT_MARKET_PARAMS
+# seed: np.random.SeedSequence (or int) driving every random draw of the job
+# tag: anything the caller wants echoed back with the result
+ScenarioJob = namedtuple('ScenarioJob', ['strategy_params', 'market_params', 'seed', 'tag'])
+
+DEFAULT_MARKET_PARAMS = {
+    'n_steps': 1000,
+    'initial_price': 100.0,
+    'price_vol': 0.1,        # std of the per-step mid-price change
+    'sigma': 2.0,            # volatility passed to the strategy
+    'max_position': 100,
+    'initial_capital': 100000,
+    'quantity': 1,
+    'mark_interval_ms': None,
+}
+
+
+def run_scenario(job):
+    """
+    Run one simulate-quote-fill backtest.
+
+    All randomness comes from a Generator built from `job.seed`, so a job gives
+    the same result wherever and in whatever order it runs.
+
+    Returns:
+        dict: strategy params, engine metrics, final inventory and the job tag.
+    """
+    market = dict(DEFAULT_MARKET_PARAMS, **job.market_params)
+    rng = np.random.default_rng(job.seed)
+    strategy = AvellanedaStoikovMarketMaker(**job.strategy_params)
+    engine = BacktestEngine(initial_capital=market['initial_capital'],
+                            max_position=market['max_position'],
+                            mark_interval_ms=market['mark_interval_ms'])
+
+    n_steps = market['n_steps']
+    prices = market['initial_price'] + np.concatenate(
+        ([0.0], np.cumsum(rng.normal(0, market['price_vol'], n_steps))))
+    fill_draws = rng.random((n_steps, 2))
+    quantity = market['quantity']
+    sigma = market['sigma']
+    T = strategy.T
+
+    for i in range(n_steps):
+        current_time = i * 1_000_000_000  # one step per second, in ns
+        price = float(prices[i])
+        time_left = max(0, T - (i / n_steps) * T)
+        engine.update_mid(price, current_time)
+
+        quotes = strategy.quote(price, engine.inventory, sigma=sigma, time_left=time_left)
+        prob_fill = np.exp(-strategy.k * quotes['spread'] / 2)
+
+        if fill_draws[i, 0] < prob_fill:
+            engine.process_fill('buy', quotes['bid'], quantity, current_time)
+        if fill_draws[i, 1] < prob_fill:
+            engine.process_fill('sell', quotes['ask'], quantity, current_time)
+
+    result = dict(job.strategy_params)
+    result.update(engine.calculate_metrics())
+    result['final_inventory'] = engine.inventory
+    result['tag'] = job.tag
+    return result
+
+
+def make_jobs(strategy_grid, market_params=None, n_seeds=1, seed=None, common_random_numbers=False):
+    """
+    Build jobs for every (strategy params, seed replica) combination.
+
+    Seeds are spawned from one SeedSequence, so jobs get statistically
+    independent streams. With `common_random_numbers` every parameter set
+    reuses the same n_seeds streams, making comparisons between parameter sets
+    less noisy.
+
+    Args:
+        strategy_grid: list of strategy param dicts, or a dict of lists
+            (expanded as a cartesian product).
+        market_params (dict): market overrides shared by all jobs.
+        n_seeds (int): replicas per parameter set.
+        seed: root entropy for the SeedSequence.
+    """
+    if isinstance(strategy_grid, dict):
+        keys = list(strategy_grid)
+        strategy_grid = [dict(zip(keys, values)) for values in product(*strategy_grid.values())]
+    market_params = market_params or {}
+
+    root = np.random.SeedSequence(seed)
+    if common_random_numbers:
+        shared = root.spawn(n_seeds)
+        seeds = [shared for _ in strategy_grid]
+    else:
+        children = root.spawn(len(strategy_grid) * n_seeds)
+        seeds = [children[i * n_seeds:(i + 1) * n_seeds] for i in range(len(strategy_grid))]
+
+    jobs = []
+    for params, param_seeds in zip(strategy_grid, seeds):
+        for replica, seed_seq in enumerate(param_seeds):
+            jobs.append(ScenarioJob(params, market_params, seed_seq, replica))
+    return jobs
+
+
+def scenario_key(job):
+    """Cache key of a job: everything that determines its result, but not its tag."""
+    return make_key('scenario', strategy=job.strategy_params,
+                    market=dict(DEFAULT_MARKET_PARAMS, **job.market_params), seed=job.seed)
+
+
+def run_scenarios(jobs, max_workers=None, cache=None):
+    """
+    Execute jobs over a process pool, yielding results as they complete.
+
+    Args:
+        jobs: iterable of ScenarioJob.
+        max_workers (int): pool size; defaults to the CPU count. 1 runs
+            in-process, which is handy for debugging and tiny grids.
+        cache (ResultCache): if given, cached jobs are yielded immediately and
+            only the missing ones are computed (and then stored).
+    """
+    pending = []
+    for job in jobs:
+        if cache is not None:
+            key = scenario_key(job)
+            cached = cache.get(key)
+            if cached is not None:
+                yield dict(cached, tag=job.tag)
+                continue
+        else:
+            key = None
+        pending.append((job, key))
+
+    def finish(key, result):
+        if cache is not None:
+            cache.put(key, result)
+        return result
+
+    if max_workers == 1:
+        for job, key in pending:
+            yield finish(key, run_scenario(job))
+        return
+    if not pending:
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(run_scenario, job): key for job, key in pending}
+        for future in as_completed(futures):
+            yield finish(futures[future], future.result())
@@ -0,0 +1,256 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+# Ensure src is in python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from src.analysis.result_cache import make_key
+from src.backtesting import checkpoint as ckpt
+from src.backtesting.engine import BacktestEngine
+from src.backtesting.replay import ReplayBacktester
+from src.data_pipeline.lob_events import TRADE, TICK_SIZE, apply_event, generate_synthetic_events, load_events
+from src.data_pipeline.lob_structure import LimitOrderBook
+from src.models.hawkes import HawkesProcess
+from src.strategy.avellaneda_stoikov import AvellanedaStoikovMarketMaker
+from src.strategy.fill_calibration import FillIntensityCalibrator
+
+
+def scan_windows(events, n_windows):
+    """
+    One sequential pass over the events, split into `n_windows` windows of
+    equal duration.
+
+    Yields, per window, what calibration and out-of-sample trading need: the
+    event index range, a snapshot of the book at the window start, market
+    order arrival times (seconds from window start), how far each market
+    order reached from the pre-trade mid, and the mid sampled once a second.
+    """
+    ts = events['timestamp']
+    t0, t1 = int(ts[0]), int(ts[-1]) + 1
+    bounds = np.linspace(t0, t1, n_windows + 1).astype(np.int64)
+    cuts = np.searchsorted(ts, bounds)
+
+    ts_col = ts.tolist()
+    kind_col = events['kind'].tolist()
+    side_col = events['side'].tolist()
+    price_col = events['price'].tolist()
+    qty_col = events['quantity'].tolist()
+    lob = LimitOrderBook()
+
+    for w in range(n_windows):
+        start, stop = int(cuts[w]), int(cuts[w + 1])
+        book_arrays = {}
+        book_meta = ckpt.book_state(lob, book_arrays)
+
+        order_times, reaches, mids = [], [], np.full(stop - start, np.nan)
+        last_order, order_mid = None, None
+        for i in range(start, stop):
+            kind, side, price = kind_col[i], side_col[i], price_col[i]
+            if kind == TRADE:
+                # A walking market order prints one trade per level, all with one timestamp
+                if (ts_col[i], side) != last_order:
+                    last_order = (ts_col[i], side)
+                    order_mid = lob.get_mid_price()
+                    order_times.append((ts_col[i] - bounds[w]) * 1e-9)
+                    reaches.append(0.0)
+                if order_mid is not None:
+                    reaches[-1] = max(reaches[-1], side * (price - order_mid))
+            apply_event(lob, kind, side, price, qty_col[i], ts_col[i] * 1e-9)
+            mid = lob.get_mid_price()
+            if mid is not None:
+                mids[i - start] = mid
+
+        # Mid on a one-second grid: last known mid at or before each tick
+        grid = np.arange(bounds[w], bounds[w + 1], 1_000_000_000)
+        at = np.searchsorted(ts[start:stop], grid, side='right') - 1
+        mid_grid = mids[at[at >= 0]]
+        mid_grid = mid_grid[~np.isnan(mid_grid)]
+
+        yield {
+            'window': w,
+            'start': start,
+            'stop': stop,
+            'duration': (bounds[w + 1] - bounds[w]) * 1e-9,
+            'book': (book_meta, book_arrays),
+            'order_times': np.asarray(order_times),
+            'reaches': np.asarray(reaches),
+            'mid_grid': mid_grid,
+        }
+
+
+def calibrate_window(window, hawkes, fill_calibrator, cache=None):
+    """
+    Fit the Hawkes model to the market order arrivals, the fill intensity
+    A * exp(-k * delta) to how far market orders reached, and sigma to the mid.
+
+    `hawkes` and `fill_calibrator` carry the previous window's estimates, so
+    the Hawkes MLE starts from them and the fill fit falls back to them when a
+    window has too few trades.
+
+    Returns:
+        dict: mu, alpha, beta, the in-sample Hawkes log-likelihood per event,
+        A, k and sigma (the std of the mid over one window, the strategy horizon).
+    """
+    times = window['order_times']
+    if len(times) > 10:
+        hawkes.fit(times, cache=cache)
+    ll = hawkes.log_likelihood(times) / max(len(times), 1)
+
+    # A quote delta from mid on either side is filled by every market order
+    # on the other side that reaches at least delta
+    calibrator = FillIntensityCalibrator(max_distance=fill_calibrator.max_distance,
+                                         n_bins=fill_calibrator.n_bins,
+                                         A=fill_calibrator.A, k=fill_calibrator.k,
+                                         min_fills=fill_calibrator.min_fills)
+    reaches = np.sort(window['reaches'])
+    fills = len(reaches) - np.searchsorted(reaches, calibrator.centers, side='left')
+    calibrator.record_histogram(np.full(calibrator.n_bins, 2 * window['duration']), fills)
+    calibrator.estimate()
+
+    steps = np.diff(window['mid_grid'])
+    sigma = float(np.std(steps) * np.sqrt(len(steps))) if len(steps) > 1 else None
+
+    return {'mu': hawkes.mu, 'alpha': hawkes.alpha, 'beta': hawkes.beta, 'hawkes_ll': ll,
+            'A': calibrator.A, 'k': calibrator.k, 'sigma': sigma}, calibrator
+
+
+def trade_window(job):
+    """
+    Out-of-sample replay of one window with parameters calibrated on the previous one.
+    Runs in a worker process; the book is restored from the window-start snapshot.
+    """
+    params = job['params']
+    strategy = AvellanedaStoikovMarketMaker(gamma=job['gamma'], k=params['k'], T=1.0)
+    strategy.set_fill_params(A=params['A'], k=params['k'])
+    backtester = ReplayBacktester(strategy, BacktestEngine(initial_capital=job['initial_capital'],
+                                                           mark_interval_ms=100),
+                                  sigma=params['sigma'])
+    ckpt.restore_book(backtester.lob, *job['book'])
+    metrics = backtester.run(job['events'], horizon_ns=int(job['duration'] * 1e9))
+
+    hawkes = HawkesProcess(params['mu'], params['alpha'], params['beta'])
+    times = job['order_times']
+    row = {'fold': job['fold'], 'train_window': job['fold'], 'test_window': job['fold'] + 1}
+    row.update({f"cal_{key}": value for key, value in params.items()})
+    row['hawkes_ll_oos'] = hawkes.log_likelihood(times) / max(len(times), 1)
+    for key in ('sharpe', 'total_return', 'max_drawdown', 'n_fills', 'final_inventory',
+                'inventory_std', 'n_events', 'events_per_second'):
+        row[key] = metrics.get(key)
+    return row
+
+
+def walk_forward(events, n_windows=10, gamma=0.1, initial_capital=100000, max_workers=None,
+                 hawkes=None, cache=None):
+    """
+    Rolling out-of-sample evaluation: calibrate on window i, trade window i + 1.
+
+    Calibration is a single sequential pass (each window warm-starts from the
+    previous estimates), and every fold's replay is handed to a process pool
+    as soon as its parameters are known, so calibrating later windows
+    overlaps with trading earlier ones. Fold rows are yielded as they finish.
+
+    Args:
+        events: event array (EVENT_DTYPE).
+        n_windows (int): number of equal-duration windows (n_windows - 1 folds).
+        gamma (float): risk aversion; a preference, so not calibrated.
+        max_workers (int): pool size; 1 runs every fold in-process.
+        hawkes (HawkesProcess): starting point of the first Hawkes fit.
+        cache (ResultCache): optional cache for the Hawkes fits.
+    """
+    hawkes = hawkes or HawkesProcess(mu=1.0, alpha=0.5, beta=1.0)
+    fill_calibrator = FillIntensityCalibrator(max_distance=40 * TICK_SIZE, n_bins=40, A=1.0, k=20.0)
+    pool = None if max_workers == 1 else ProcessPoolExecutor(max_workers=max_workers)
+    futures = []
+    params = None
+    try:
+        for window in scan_windows(events, n_windows):
+            if params is not None and params['sigma'] is not None:
+                job = {
+                    'fold': window['window'] - 1,
+                    'params': params,
+                    'gamma': gamma,
+                    'initial_capital': initial_capital,
+                    'book': window['book'],
+                    'events': np.ascontiguousarray(events[window['start']:window['stop']]),
+                    'duration': window['duration'],
+                    'order_times': window['order_times'],
+                }
+                if pool is None:
+                    yield trade_window(job)
+                else:
+                    futures.append(pool.submit(trade_window, job))
+            params, fill_calibrator = calibrate_window(window, hawkes, fill_calibrator, cache)
+
+            for future in [f for f in futures if f.done()]:
+                futures.remove(future)
+                yield future.result()
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def _print_fold(row):
+    print(f"[fold {row['fold']}] k={row['cal_k']:.2f} sigma={row['cal_sigma']:.3f} "
+          f"hawkes(mu={row['cal_mu']:.2f}, alpha={row['cal_alpha']:.2f}, beta={row['cal_beta']:.2f}) "
+          f"ll in/out={row['cal_hawkes_ll']:.3f}/{row['hawkes_ll_oos']:.3f} "
+          f"return={row['total_return']:.4%} fills={row['n_fills']}")
+
+
+def run_walk_forward(events=None, n_windows=10, gamma=0.1, n_events=200000, seed=42,
+                     max_workers=None, output_csv=None, cache=None):
+    """
+    Walk-forward driver: prints (and optionally appends to CSV) each fold as it completes.
+
+    Args:
+        events: event array, a path for load_events, or None for a synthetic day.
+        cache (ResultCache): memoizes the fold table and the Hawkes fits. A
+            path is keyed on the file's identity, an array on its contents.
+    """
+    path = events if isinstance(events, str) else None
+    key = None
+    if cache is not None:
+        key = make_key('walk_forward', data_files=(path,) if path else (),
+                       events=events if path is None else None,
+                       synthetic=[n_events, seed] if events is None else None,
+                       n_windows=n_windows, gamma=gamma)
+    if path is not None:
+        events = load_events(path, mmap=True)
+    elif events is None:
+        events = generate_synthetic_events(n_events, seed=seed)
+    print(f"Walk-forward over {len(events)} events, {n_windows} windows...")
+    if output_csv and os.path.exists(output_csv):
+        os.remove(output_csv)
+
+    start = time.perf_counter()
+    rows = cache.get(key) if key is not None else None
+    if rows is not None:
+        for row in rows:
+            _print_fold(row)
+        if output_csv:
+            pd.DataFrame(rows).to_csv(output_csv, index=False)
+    else:
+        rows = []
+        for row in walk_forward(events, n_windows=n_windows, gamma=gamma, max_workers=max_workers,
+                                cache=cache):
+            rows.append(row)
+            _print_fold(row)
+            if output_csv:
+                pd.DataFrame([row]).to_csv(output_csv, mode='a', header=len(rows) == 1, index=False)
+        if key is not None:
+            cache.put(key, rows)
+
+    df = pd.DataFrame(rows).sort_values('fold').reset_index(drop=True)
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+    return df
+
+
+if __name__ == "__main__":
+    results = run_walk_forward()
+    print(results[['fold', 'cal_k', 'cal_sigma', 'hawkes_ll_oos', 'sharpe', 'total_return', 'n_fills']])
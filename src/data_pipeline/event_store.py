@@ -0,0 +1,245 @@
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from src.data_pipeline.lob_events import TRADE, SIDE_NAMES, apply_event, load_events
+from src.data_pipeline.lob_structure import LimitOrderBook
+
+INDEX_VERSION = 1
+
+
+def _book_levels(lob):
+    bids = sorted(lob.bids.items())
+    asks = sorted(lob.asks.items())
+    return bids, asks
+
+
+def book_from_levels(bid_prices, bid_qty, ask_prices, ask_qty):
+    """A LimitOrderBook holding exactly the given price levels."""
+    lob = LimitOrderBook()
+    lob.bids.update(zip(bid_prices.tolist(), bid_qty.tolist()))
+    lob.asks.update(zip(ask_prices.tolist(), ask_qty.tolist()))
+    lob.best_bid = float(bid_prices.max()) if len(bid_prices) else 0.0
+    lob.best_ask = float(ask_prices.min()) if len(ask_prices) else float('inf')
+    return lob
+
+
+class EventStore:
+    """
+    Recorded event file with a sidecar index of periodic book snapshots.
+
+    The index (`<events>.index.npz`) holds the full book every
+    `snapshot_every` events. Rebuilding the book at any position restores the
+    nearest snapshot at or before it and applies at most `snapshot_every`
+    deltas, so a seek costs the same late in the day as at the open. The index
+    is built in one pass on first open and rebuilt when the event file changes.
+    """
+
+    def __init__(self, path, snapshot_every=20000, rebuild=False):
+        """
+        Args:
+            path (str): .npy (memory-mapped) or CSV event file, see lob_events.load_events.
+            snapshot_every (int): events between book snapshots; seek cost is
+                proportional to it, index size inversely.
+            rebuild (bool): ignore an existing index.
+        """
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.events = load_events(path, mmap=True)
+        self.timestamps = self.events['timestamp']
+        self.index_path = str(path) + '.index.npz'
+
+        identity = self._identity()
+        index = None if rebuild else self._load_index(identity)
+        if index is None:
+            index = self._build_index()
+            self._save_index(index, identity)
+        self.index = index
+
+    def __len__(self):
+        return len(self.events)
+
+    @property
+    def start_ns(self):
+        return int(self.timestamps[0]) if len(self) else 0
+
+    @property
+    def end_ns(self):
+        return int(self.timestamps[-1]) if len(self) else 0
+
+    def position_at(self, timestamp_ns):
+        """Number of events with timestamp <= timestamp_ns (the book position at that time)."""
+        return int(np.searchsorted(self.timestamps, timestamp_ns, side='right'))
+
+    def time_at(self, position):
+        """Timestamp of the last event applied at `position` (the first event's time at 0)."""
+        if len(self) == 0:
+            return 0
+        return int(self.timestamps[min(max(position - 1, 0), len(self) - 1)])
+
+    def _identity(self):
+        st = os.stat(self.path)
+        return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'n_events': len(self),
+                'snapshot_every': self.snapshot_every, 'version': INDEX_VERSION}
+
+    def _load_index(self, identity):
+        if not os.path.exists(self.index_path):
+            return None
+        with np.load(self.index_path, allow_pickle=False) as data:
+            index = {key: data[key] for key in data.files}
+        meta = json.loads(index.pop('__meta__').tobytes().decode())
+        return index if meta == identity else None
+
+    def _save_index(self, index, identity):
+        payload = dict(index)
+        payload['__meta__'] = np.frombuffer(json.dumps(identity).encode(), dtype=np.uint8)
+        directory = os.path.dirname(os.path.abspath(self.index_path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **payload)
+        os.replace(tmp, self.index_path)
+
+    def _build_index(self, chunk=1_000_000):
+        positions, bid_rows, ask_rows = [], [], []
+        lob = LimitOrderBook()
+
+        def snapshot(position):
+            bids, asks = _book_levels(lob)
+            positions.append(position)
+            bid_rows.append(bids)
+            ask_rows.append(asks)
+
+        snapshot(0)
+        for start in range(0, len(self), chunk):
+            stop = min(start + chunk, len(self))
+            # Snapshot boundaries in (start, stop]
+            first = (start // self.snapshot_every + 1) * self.snapshot_every
+            marks = range(first, stop + 1, self.snapshot_every)
+            cursor = start
+            for mark in marks:
+                self.apply(lob, cursor, mark)
+                snapshot(mark)
+                cursor = mark
+            self.apply(lob, cursor, stop)
+
+        def flatten(rows):
+            offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum([len(r) for r in rows])
+            prices = np.array([p for r in rows for p, _ in r], dtype=np.float64)
+            qty = np.array([q for r in rows for _, q in r], dtype=np.int64)
+            return offsets, prices, qty
+
+        bid_offsets, bid_prices, bid_qty = flatten(bid_rows)
+        ask_offsets, ask_prices, ask_qty = flatten(ask_rows)
+        return {'positions': np.asarray(positions, dtype=np.int64),
+                'bid_offsets': bid_offsets, 'bid_prices': bid_prices, 'bid_qty': bid_qty,
+                'ask_offsets': ask_offsets, 'ask_prices': ask_prices, 'ask_qty': ask_qty}
+
+    def _snapshot_book(self, k):
+        ix = self.index
+        b0, b1 = ix['bid_offsets'][k], ix['bid_offsets'][k + 1]
+        a0, a1 = ix['ask_offsets'][k], ix['ask_offsets'][k + 1]
+        return book_from_levels(ix['bid_prices'][b0:b1], ix['bid_qty'][b0:b1],
+                             ix['ask_prices'][a0:a1], ix['ask_qty'][a0:a1])
+
+    def book_at(self, position):
+        """A new LimitOrderBook with the first `position` events applied."""
+        position = min(max(int(position), 0), len(self))
+        k = int(np.searchsorted(self.index['positions'], position, side='right')) - 1
+        lob = self._snapshot_book(k)
+        self.apply(lob, int(self.index['positions'][k]), position)
+        return lob
+
+    def apply(self, lob, start, stop, indicators=None, book_sample_ns=0):
+        """
+        Apply events [start, stop) to `lob`.
+
+        Args:
+            indicators (IndicatorEngine): optional; gets every trade, and book
+                updates at most every `book_sample_ns` of event time.
+        """
+        if stop <= start:
+            return lob
+        chunk = self.events[start:stop]
+        ts_col = chunk['timestamp'].tolist()
+        kind_col = chunk['kind'].tolist()
+        side_col = chunk['side'].tolist()
+        price_col = chunk['price'].tolist()
+        qty_col = chunk['quantity'].tolist()
+        last_book = None
+        for i in range(len(ts_col)):
+            ts, kind, side, price, qty = ts_col[i], kind_col[i], side_col[i], price_col[i], qty_col[i]
+            apply_event(lob, kind, side, price, qty, ts * 1e-9)
+            if indicators is None:
+                continue
+            if kind == TRADE:
+                indicators.on_trade(price, qty, SIDE_NAMES[side], ts * 1e-9)
+            elif last_book is None or ts - last_book >= book_sample_ns:
+                indicators.on_book_update(lob, ts * 1e-9)
+                last_book = ts
+        return lob
+
+
+class ReplayCursor:
+    """
+    A book positioned somewhere in an EventStore, with indicators kept in sync.
+
+    `seek` jumps anywhere (snapshot + deltas, then a short indicator warm-up);
+    `advance_to` plays forward from the current position.
+    """
+
+    def __init__(self, store, indicator_factory, warmup_events=2000, book_sample_ms=50):
+        """
+        Args:
+            indicator_factory: callable returning a fresh IndicatorEngine, used
+                on every seek so panels never mix histories from two places.
+            warmup_events (int): events replayed through the indicators before
+                the seek target, so rolling indicators are populated.
+            book_sample_ms (float): minimum event-time gap between book-based
+                indicator updates (trades are always processed).
+        """
+        self.store = store
+        self.indicator_factory = indicator_factory
+        self.warmup_events = warmup_events
+        self.book_sample_ns = int(book_sample_ms * 1e6)
+        self.indicators = indicator_factory()
+        self.lob = LimitOrderBook()
+        self.position = 0
+        self.last_seek_seconds = 0.0
+
+    @property
+    def time_ns(self):
+        return self.store.time_at(self.position)
+
+    def seek(self, position):
+        start = time.perf_counter()
+        position = min(max(int(position), 0), len(self.store))
+        warm_from = max(position - self.warmup_events, 0)
+        self.lob = self.store.book_at(warm_from)
+        self.indicators = self.indicator_factory()
+        self.store.apply(self.lob, warm_from, position, self.indicators, self.book_sample_ns)
+        self.position = position
+        self.last_seek_seconds = time.perf_counter() - start
+        return self.lob
+
+    def seek_time(self, timestamp_ns):
+        return self.seek(self.store.position_at(timestamp_ns))
+
+    def advance_to(self, timestamp_ns, max_events=None):
+        """Play forward to `timestamp_ns`; returns the number of events applied."""
+        stop = self.store.position_at(timestamp_ns)
+        if max_events is not None:
+            stop = min(stop, self.position + max_events)
+        if stop <= self.position:
+            return 0
+        self.store.apply(self.lob, self.position, stop, self.indicators, self.book_sample_ns)
+        applied = stop - self.position
+        self.position = stop
+        return applied
+
+    @property
+    def at_end(self):
+        return self.position >= len(self.store)
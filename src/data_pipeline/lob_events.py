@@ -0,0 +1,137 @@
+import random
+
+import numpy as np
+
+from src.data_pipeline.lob_structure import LimitOrderBook
+
+# Flat event record shared by the replay backtester, recorders and feeds.
+# timestamp is nanoseconds, side is the resting side for adds/cancels and the
+# aggressor side for trades.
+EVENT_DTYPE = np.dtype([
+    ('timestamp', 'i8'),
+    ('kind', 'i1'),
+    ('side', 'i1'),
+    ('price', 'f8'),
+    ('quantity', 'i8'),
+])
+
+ADD, CANCEL, TRADE = 0, 1, 2
+BUY, SELL = 1, -1
+KIND_NAMES = {ADD: 'add', CANCEL: 'cancel', TRADE: 'trade'}
+SIDE_NAMES = {BUY: 'buy', SELL: 'sell'}
+TICK_SIZE = 0.05
+
+
+def apply_event(lob, kind, side, price, quantity, timestamp=None):
+    """
+    Apply one event to a LimitOrderBook.
+    A trade removes the traded quantity from the opposite (resting) side.
+    """
+    if kind == ADD:
+        lob.add_order(SIDE_NAMES[side], price, quantity, timestamp)
+    elif kind == CANCEL:
+        book = lob.bids if side == BUY else lob.asks
+        if price in book:
+            lob.cancel_order(SIDE_NAMES[side], price, min(quantity, book[price]), timestamp)
+    elif kind == TRADE:
+        book = lob.asks if side == BUY else lob.bids
+        if price in book:
+            lob.cancel_order(SIDE_NAMES[-side], price, min(quantity, book[price]), timestamp)
+    return lob
+
+
+def generate_synthetic_events(n_events, mid_price=100.0, depth=20, volatility=0.5,
+                              trade_prob=0.1, max_trade_size=300, event_rate=1000.0, seed=None):
+    """
+    Generate a synthetic LOB event stream.
+
+    The initial book is emitted as ADD events at t=0, followed by limit order
+    adds/cancels with the same price dynamics as `simulate_lob_step`, and market
+    orders that walk the book (one TRADE event per level consumed).
+
+    Args:
+        n_events (int): Number of generated order events after the initial book.
+        event_rate (float): Mean events per second (exponential inter-arrivals).
+        trade_prob (float): Probability an event is a market order.
+        max_trade_size (int): Market order sizes are uniform in [1, max_trade_size];
+            sizes above the touch volume walk the book and move the price.
+
+    Returns:
+        np.ndarray with EVENT_DTYPE.
+    """
+    rng = random.Random(seed)
+    lob = LimitOrderBook()
+    out = []
+
+    def emit(ts, kind, side, price, qty):
+        out.append((ts, kind, side, price, qty))
+        apply_event(lob, kind, side, price, qty, ts * 1e-9)
+
+    for i in range(depth):
+        emit(0, ADD, BUY, round(mid_price - (i * TICK_SIZE) - TICK_SIZE, 2), rng.randint(10, 100))
+        emit(0, ADD, SELL, round(mid_price + (i * TICK_SIZE) + TICK_SIZE, 2), rng.randint(10, 100))
+
+    ts = 0
+    mean_gap_ns = 1e9 / event_rate
+    for _ in range(n_events):
+        ts += max(1, int(rng.expovariate(1.0) * mean_gap_ns))
+        side = BUY if rng.random() < 0.5 else SELL
+
+        if rng.random() < trade_prob:
+            # Market order: walk the opposite side until filled or the book is empty
+            book = lob.asks if side == BUY else lob.bids
+            remaining = rng.randint(1, max_trade_size)
+            while remaining > 0 and book:
+                price = lob.best_ask if side == BUY else lob.best_bid
+                traded = min(remaining, book[price])
+                emit(ts, TRADE, side, price, traded)
+                remaining -= traded
+            continue
+
+        offset = int(rng.expovariate(1.0 / (volatility * 10))) * TICK_SIZE
+        best_bid = lob.best_bid if lob.best_bid > 0 else mid_price - TICK_SIZE
+        best_ask = lob.best_ask if lob.best_ask < float('inf') else mid_price + TICK_SIZE
+        if side == BUY:
+            price = round(best_bid + rng.choice([-1, 0, 1]) * offset, 2)
+            if price >= best_ask:
+                price = round(best_ask - TICK_SIZE, 2)
+        else:
+            price = round(best_ask + rng.choice([-1, 0, 1]) * offset, 2)
+            if price <= best_bid:
+                price = round(best_bid + TICK_SIZE, 2)
+
+        quantity = rng.randint(1, 100)
+        if rng.random() < 0.7:
+            emit(ts, ADD, side, price, quantity)
+        else:
+            book = lob.bids if side == BUY else lob.asks
+            if price in book:
+                emit(ts, CANCEL, side, price, min(quantity, book[price]))
+
+    return np.array(out, dtype=EVENT_DTYPE)
+
+
+def save_events(path, events):
+    """Save an event array as .npy (memory-mappable on load)."""
+    np.save(path, np.asarray(events, dtype=EVENT_DTYPE))
+
+
+def load_events(path, mmap=True):
+    """
+    Load recorded events.
+
+    Supports .npy files written by `save_events` and CSV files with columns
+    timestamp (ns), kind (add/cancel/trade), side (buy/sell), price, quantity.
+    """
+    if str(path).endswith('.npy'):
+        return np.load(path, mmap_mode='r' if mmap else None)
+
+    import pandas as pd
+    df = pd.read_csv(path)
+    events = np.empty(len(df), dtype=EVENT_DTYPE)
+    events['timestamp'] = df['timestamp'].to_numpy(dtype=np.int64)
+    events['kind'] = df['kind'].map({v: k for k, v in KIND_NAMES.items()}).to_numpy()
+    events['side'] = df['side'].map({v: k for k, v in SIDE_NAMES.items()}).to_numpy()
+    events['price'] = df['price'].to_numpy(dtype=np.float64)
+    events['quantity'] = df['quantity'].to_numpy(dtype=np.int64)
+    return events
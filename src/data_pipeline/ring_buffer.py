@@ -0,0 +1,166 @@
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Fixed-capacity circular buffer backed by a preallocated NumPy array.
+
+    Appends are O(1) and never allocate; once full, the oldest value is
+    overwritten. `values()` returns the contents in insertion order.
+    """
+
+    def __init__(self, capacity, dtype=np.float64):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=dtype)
+        self._head = 0  # next write position
+        self._size = 0
+
+    def append(self, value):
+        """
+        Append a value. Returns the value that was evicted, or None if the
+        buffer was not yet full.
+        """
+        evicted = None
+        if self._size == self.capacity:
+            evicted = self._data[self._head].item()
+        else:
+            self._size += 1
+        self._data[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        return evicted
+
+    def last(self, default=None):
+        if self._size == 0:
+            return default
+        return self._data[(self._head - 1) % self.capacity].item()
+
+    def values(self):
+        """Contents as a new array, oldest first."""
+        if self._size < self.capacity:
+            return self._data[:self._size].copy()
+        return np.concatenate((self._data[self._head:], self._data[:self._head]))
+
+    def clear(self):
+        self._head = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+
+class MultiResolutionSeries:
+    """
+    One time series kept at several resolutions in fixed memory.
+
+    The raw level holds the last `capacity` (time, value) samples. Each
+    coarser level aggregates `bucket_size` consecutive samples into one
+    bucket (min and max with their times, plus the last value) and also keeps
+    `capacity` buckets, so it covers `bucket_size` times more history. Appends
+    cost O(levels) and memory is bounded however long the series runs.
+    """
+
+    FIELDS = ('t_min', 'min', 't_max', 'max', 'last')
+
+    def __init__(self, capacity=1000, bucket_sizes=(10, 100)):
+        self.capacity = capacity
+        self.bucket_sizes = tuple(bucket_sizes)
+        self.times = RingBuffer(capacity)
+        self.values = RingBuffer(capacity)
+        self.levels = [{f: RingBuffer(capacity) for f in self.FIELDS} for _ in self.bucket_sizes]
+        self._open = [None] * len(self.bucket_sizes)  # bucket in progress per level
+        self.n_appended = 0
+
+    def append(self, timestamp, value):
+        self.times.append(timestamp)
+        self.values.append(value)
+        self.n_appended += 1
+        for i, size in enumerate(self.bucket_sizes):
+            b = self._open[i]
+            if b is None:
+                b = self._open[i] = [timestamp, value, timestamp, value, value, 0]
+            else:
+                if value < b[1]:
+                    b[0], b[1] = timestamp, value
+                if value > b[3]:
+                    b[2], b[3] = timestamp, value
+                b[4] = value
+            b[5] += 1
+            if b[5] == size:
+                level = self.levels[i]
+                for field, x in zip(self.FIELDS, b):
+                    level[field].append(x)
+                self._open[i] = None
+
+    def last(self, default=None):
+        return self.values.last(default)
+
+    def __len__(self):
+        return len(self.values)
+
+    def _level_points(self, i):
+        """Bucket min/max points of level i (incl. the open bucket), in time order."""
+        level = self.levels[i]
+        t_min, v_min = level['t_min'].values(), level['min'].values()
+        t_max, v_max = level['t_max'].values(), level['max'].values()
+        if self._open[i] is not None:
+            b = self._open[i]
+            t_min, v_min = np.append(t_min, b[0]), np.append(v_min, b[1])
+            t_max, v_max = np.append(t_max, b[2]), np.append(v_max, b[3])
+        t = np.concatenate((t_min, t_max))
+        v = np.concatenate((v_min, v_max))
+        order = np.argsort(t, kind='stable')
+        return t[order], v[order]
+
+    def view(self, max_points=None, method='minmax'):
+        """
+        (times, values) covering as much history as is kept, at most
+        `max_points` long.
+
+        The finest level that still holds the whole history (or else the
+        coarsest level) is selected and, if it is over budget, downsampled. The
+        cost is bounded by `capacity`, not by the session length.
+        """
+        from src.visualization.downsampling import downsample
+
+        if max_points is None or (self.n_appended <= self.capacity and len(self) <= max_points):
+            return self.times.values(), self.values.values()
+        t, v = self.times.values(), self.values.values()
+        if self.n_appended > self.capacity:
+            for i, size in enumerate(self.bucket_sizes):
+                t, v = self._level_points(i)
+                if self.n_appended <= self.capacity * size:
+                    break
+        return downsample(t, v, max_points, method)
+
+
+class TimeSeriesStore:
+    """Named MultiResolutionSeries sharing one capacity and set of bucket sizes."""
+
+    def __init__(self, capacity=1000, bucket_sizes=(10, 100)):
+        self.capacity = capacity
+        self.bucket_sizes = bucket_sizes
+        self.series = {}
+
+    def add(self, name):
+        if name not in self.series:
+            self.series[name] = MultiResolutionSeries(self.capacity, self.bucket_sizes)
+        return self.series[name]
+
+    def append(self, name, timestamp, value):
+        series = self.series.get(name) or self.add(name)
+        series.append(timestamp, value)
+
+    def last(self, name, default=None):
+        series = self.series.get(name)
+        return default if series is None else series.last(default)
+
+    def view(self, name, max_points=None, method='minmax'):
+        return self.series[name].view(max_points, method)
+
+    def __contains__(self, name):
+        return name in self.series
+
+    def __iter__(self):
+        return iter(self.series)
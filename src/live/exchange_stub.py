@@ -0,0 +1,215 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+# Ensure src is in python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from src.analysis import latency
+from src.data_pipeline.lob_events import apply_event, generate_synthetic_events, load_events
+from src.data_pipeline.lob_structure import LimitOrderBook
+from src.live.feed_handler import (END, INCREMENTAL, REQUEST_FEED, REQUEST_SNAPSHOT, SNAPSHOT,
+                                   UDP_MAX_EVENTS, FeedHandler, book_levels, encode_packet, frame)
+
+
+class _UDPFeed(asyncio.DatagramProtocol):
+    """Collects UDP subscribers: any datagram starting with REQUEST_FEED subscribes its sender."""
+
+    def __init__(self, stub):
+        self.stub = stub
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if data[:1] == REQUEST_FEED:
+            self.stub._udp_subscribers.add(addr)
+            self.stub._subscribed.set()
+
+
+class ExchangeStub:
+    """
+    Local stand-in for an exchange market-data feed, for load-testing FeedHandler.
+
+    Streams recorded or synthetic events as numbered INCREMENTAL packets over
+    TCP and/or UDP at a configurable event rate, keeps its own book so it can
+    answer snapshot requests at any sequence number, and can drop packets at
+    random to exercise gap recovery. The feed starts when the first
+    subscriber connects and ends with an END packet.
+    """
+
+    def __init__(self, events, host='127.0.0.1', port=0, rate=None, batch_size=50, udp=False,
+                 drop_rate=0.0, seed=None):
+        """
+        Args:
+            events: EVENT_DTYPE array to replay.
+            port (int): TCP (and UDP) port; 0 picks a free one, see `port` after `start()`.
+            rate (float): events per second; None sends as fast as subscribers take them.
+            batch_size (int): events per packet (capped to fit a datagram when udp).
+            udp (bool): also serve the incremental stream over UDP.
+            drop_rate (float): probability of dropping a packet per subscriber.
+        """
+        self.events = events
+        self.host, self.port = host, port
+        self.rate = rate
+        self.batch_size = min(batch_size, UDP_MAX_EVENTS) if udp else batch_size
+        self.udp = udp
+        self.drop_rate = drop_rate
+        self.rng = np.random.default_rng(seed)
+        self.lob = LimitOrderBook()
+        self.seq = 0  # last event applied to self.lob and sent
+        self.stats = {'packets': 0, 'events': 0, 'dropped': 0, 'snapshots': 0}
+        self._tcp_subscribers = []
+        self._udp_subscribers = set()
+        self._subscribed = asyncio.Event()
+        self._server = None
+        self._udp = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._on_connect, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.udp:
+            loop = asyncio.get_running_loop()
+            transport, self._udp = await loop.create_datagram_endpoint(
+                lambda: _UDPFeed(self), local_addr=(self.host, self.port))
+        return self
+
+    async def stop(self):
+        for writer in self._tcp_subscribers:
+            writer.close()
+        if self._udp is not None:
+            self._udp.transport.close()
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _on_connect(self, reader, writer):
+        request = await reader.read(1)
+        if request == REQUEST_SNAPSHOT:
+            # Built and written without yielding, so it is exactly the book after self.seq
+            writer.write(frame(encode_packet(SNAPSHOT, self.seq, book_levels(self.lob))))
+            self.stats['snapshots'] += 1
+            await writer.drain()
+            writer.close()
+        elif request == REQUEST_FEED:
+            self._tcp_subscribers.append(writer)
+            self._subscribed.set()
+        else:
+            writer.close()
+
+    def _send(self, packet, droppable=True):
+        for writer in list(self._tcp_subscribers):
+            if writer.is_closing():
+                self._tcp_subscribers.remove(writer)
+            elif droppable and self.drop_rate and self.rng.random() < self.drop_rate:
+                self.stats['dropped'] += 1
+            else:
+                writer.write(frame(packet))
+        if self._udp is not None:
+            for addr in self._udp_subscribers:
+                if droppable and self.drop_rate and self.rng.random() < self.drop_rate:
+                    self.stats['dropped'] += 1
+                else:
+                    self._udp.transport.sendto(packet, addr)
+
+    async def _drain(self):
+        # TCP backpressure: wait while any subscriber's socket buffer is full
+        for writer in list(self._tcp_subscribers):
+            try:
+                await writer.drain()
+            except ConnectionError:
+                self._tcp_subscribers.remove(writer)
+
+    async def run(self, wait_for_subscriber=True):
+        """Replay all events to the subscribers; returns the stub's stats."""
+        if wait_for_subscriber:
+            await self._subscribed.wait()
+        events = self.events
+        ts_col = events['timestamp'].tolist()
+        kind_col = events['kind'].tolist()
+        side_col = events['side'].tolist()
+        price_col = events['price'].tolist()
+        qty_col = events['quantity'].tolist()
+        start = time.perf_counter()
+        for lo in range(0, len(events), self.batch_size):
+            hi = min(lo + self.batch_size, len(events))
+            if self.rate:
+                delay = start + lo / self.rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            # Apply, then send, with no await in between: a snapshot taken at any
+            # await point covers exactly the events already sent
+            for i in range(lo, hi):
+                apply_event(self.lob, kind_col[i], side_col[i], price_col[i], qty_col[i],
+                            ts_col[i] * 1e-9)
+            self._send(encode_packet(INCREMENTAL, self.seq + 1, events[lo:hi]))
+            self.seq += hi - lo
+            self.stats['packets'] += 1
+            self.stats['events'] += hi - lo
+            await self._drain()
+            if not self.rate:
+                await asyncio.sleep(0)  # let snapshot requests and receivers in
+        # END is resent a few times since a datagram may be lost
+        for _ in range(3 if self.udp else 1):
+            self._send(encode_packet(END, self.seq), droppable=False)
+            await self._drain()
+            await asyncio.sleep(0.01)
+        self.stats['elapsed'] = time.perf_counter() - start
+        return self.stats
+
+
+async def load_test(events, transport='tcp', rate=None, batch_size=50, drop_rate=0.0,
+                    queue_size=1024, seed=None):
+    """
+    Stub and handler in one event loop on localhost.
+
+    Returns:
+        (stub stats, handler report, whether the handler's final book matches the stub's).
+    """
+    stub = await ExchangeStub(events, rate=rate, batch_size=batch_size, udp=transport == 'udp',
+                              drop_rate=drop_rate, seed=seed).start()
+    handler = FeedHandler(port=stub.port, transport=transport, queue_size=queue_size, idle_timeout=2.0)
+    try:
+        stub_stats, report = await asyncio.gather(stub.run(), handler.run())
+    finally:
+        await stub.stop()
+    in_sync = dict(handler.lob.bids) == dict(stub.lob.bids) and dict(handler.lob.asks) == dict(stub.lob.asks)
+    return stub_stats, report, in_sync
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the feed handler against a local exchange stub.")
+    parser.add_argument('--events', help="recorded event file (.npy/.csv); synthetic if omitted")
+    parser.add_argument('--n-events', type=int, default=200000)
+    parser.add_argument('--transport', choices=['tcp', 'udp'], default='tcp')
+    parser.add_argument('--rate', type=float, default=None, help="events/s (default: unthrottled)")
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--drop-rate', type=float, default=0.0)
+    parser.add_argument('--queue-size', type=int, default=1024)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--latency', action='store_true', help="print per-stage latency histograms")
+    args = parser.parse_args()
+    if args.latency:
+        latency.enable()
+
+    events = load_events(args.events) if args.events else generate_synthetic_events(args.n_events, seed=args.seed)
+    print(f"Streaming {len(events)} events over {args.transport} "
+          f"({'unthrottled' if args.rate is None else f'{args.rate:.0f} events/s'}, "
+          f"drop rate {args.drop_rate:.2%})...")
+    stub_stats, report, in_sync = asyncio.run(load_test(
+        events, args.transport, args.rate, args.batch_size, args.drop_rate, args.queue_size, args.seed))
+    print(f"Stub: {stub_stats['packets']} packets, {stub_stats['dropped']} dropped, "
+          f"{stub_stats['snapshots']} snapshots served")
+    for key, value in sorted(report.items()):
+        print(f"  {key}: {value:,.1f}" if isinstance(value, float) else f"  {key}: {value}")
+    print(f"Book in sync with exchange: {in_sync}")
+    if args.latency:
+        print(latency.format_report())
+
+
+if __name__ == "__main__":
+    main()
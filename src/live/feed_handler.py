@@ -0,0 +1,285 @@
+import asyncio
+import collections
+import struct
+import time
+
+import numpy as np
+
+from src.analysis import latency
+from src.data_pipeline.event_store import book_from_levels
+from src.data_pipeline.lob_events import EVENT_DTYPE, TRADE, BUY, apply_event
+from src.data_pipeline.lob_structure import LimitOrderBook
+
+# Wire protocol (little-endian). Every packet is a header followed by
+# `n_entries` fixed-size records; over TCP each packet is prefixed with its
+# length as u32, over UDP one datagram carries one packet.
+#   INCREMENTAL: EVENT_DTYPE records, numbered seq, seq + 1, ...
+#   SNAPSHOT:    LEVEL_DTYPE records, the full book after event `seq`
+#   END:         no records, the feed is finished after event `seq`
+# A TCP client opens a connection with one request byte: REQUEST_FEED to be
+# streamed packets, REQUEST_SNAPSHOT for a single snapshot reply. A UDP client
+# subscribes by sending REQUEST_FEED to the same port.
+HEADER = struct.Struct('<BBHQQ')  # msg_type, flags, n_entries, seq, send time (ns)
+FRAME = struct.Struct('<I')
+LEVEL_DTYPE = np.dtype([('side', 'i1'), ('price', 'f8'), ('quantity', 'i8')])
+INCREMENTAL, SNAPSHOT, END = 1, 2, 3
+REQUEST_FEED, REQUEST_SNAPSHOT = b'F', b'S'
+# Events per UDP datagram that keep a packet within a 1500-byte MTU
+UDP_MAX_EVENTS = (1472 - HEADER.size) // EVENT_DTYPE.itemsize
+
+
+def encode_packet(msg_type, seq, records=None, send_ns=None):
+    """Header plus the raw bytes of a structured array (EVENT_DTYPE or LEVEL_DTYPE)."""
+    n = 0 if records is None else len(records)
+    header = HEADER.pack(msg_type, 0, n, seq, time.time_ns() if send_ns is None else send_ns)
+    return header if records is None else header + records.tobytes()
+
+
+def decode_packet(packet):
+    """
+    Returns:
+        (msg_type, seq, send_ns, records) with records a read-only view of the
+        payload (no copy), None for END.
+    """
+    msg_type, _, n, seq, send_ns = HEADER.unpack_from(packet)
+    if msg_type == INCREMENTAL:
+        records = np.frombuffer(packet, EVENT_DTYPE, count=n, offset=HEADER.size)
+    elif msg_type == SNAPSHOT:
+        records = np.frombuffer(packet, LEVEL_DTYPE, count=n, offset=HEADER.size)
+    else:
+        records = None
+    return msg_type, seq, send_ns, records
+
+
+def frame(packet):
+    return FRAME.pack(len(packet)) + packet
+
+
+async def read_frame(reader):
+    (size,) = FRAME.unpack(await reader.readexactly(FRAME.size))
+    return await reader.readexactly(size)
+
+
+def book_levels(lob):
+    """The whole book as a LEVEL_DTYPE array (bids then asks)."""
+    levels = np.empty(len(lob.bids) + len(lob.asks), dtype=LEVEL_DTYPE)
+    n_bids = len(lob.bids)
+    levels['side'][:n_bids] = BUY
+    levels['side'][n_bids:] = -BUY
+    levels['price'] = list(lob.bids.keys()) + list(lob.asks.keys())
+    levels['quantity'] = list(lob.bids.values()) + list(lob.asks.values())
+    return levels
+
+
+class _DatagramReceiver(asyncio.DatagramProtocol):
+    """UDP side of the handler: datagrams go to the bounded queue, or are dropped when it is full."""
+
+    def __init__(self, handler):
+        self.handler = handler
+
+    def datagram_received(self, data, addr):
+        self.handler._enqueue_nowait(data)
+
+    def error_received(self, exc):
+        self.handler.stats['socket_errors'] += 1
+
+
+class FeedHandler:
+    """
+    Asyncio client of the binary incremental feed (see ExchangeStub).
+
+    A receiver task reads packets into a bounded queue; an applier task drains
+    whatever is queued (up to `max_batch_packets`), checks sequence numbers,
+    applies the events to the book in one pass and calls `on_batch` once per
+    batch. Over TCP a full queue stops the receiver reading, so backpressure
+    reaches the sender through the socket; over UDP there is no backpressure
+    and overflowing packets are dropped. Either way a sequence gap is repaired
+    by fetching a snapshot over TCP, rebuilding the book from it and
+    discarding queued packets the snapshot already covers.
+    """
+
+    def __init__(self, host='127.0.0.1', port=9000, transport='tcp', lob=None, queue_size=1024,
+                 max_batch_packets=64, on_batch=None, latency_samples=100000, idle_timeout=5.0):
+        """
+        Args:
+            transport (str): 'tcp' or 'udp' for the incremental stream; snapshots always use TCP.
+            lob (LimitOrderBook): book to maintain; a new one if None. Replaced
+                by a fresh book on every snapshot recovery.
+            queue_size (int): packets buffered between receiver and applier.
+            max_batch_packets (int): packets applied per batch at most.
+            on_batch: optional callable(lob, events) after each applied batch,
+                e.g. to update indicators or publish the top of book.
+            latency_samples (int): send-to-apply latencies kept for the stats.
+            idle_timeout (float): seconds without packets after which `run` returns.
+        """
+        if transport not in ('tcp', 'udp'):
+            raise ValueError(f"Unknown transport '{transport}'")
+        self.host, self.port, self.transport = host, port, transport
+        self.lob = lob if lob is not None else LimitOrderBook()
+        self.queue_size = queue_size
+        self.max_batch_packets = max_batch_packets
+        self.on_batch = on_batch
+        self.idle_timeout = idle_timeout
+        self.next_seq = 1
+        self.finished = False
+        self.latencies_ns = collections.deque(maxlen=latency_samples)
+        self.stats = collections.Counter()
+        self._queue = None
+        self._started = None
+
+    def _enqueue_nowait(self, packet):
+        try:
+            self._queue.put_nowait((packet, time.time_ns()))
+        except asyncio.QueueFull:
+            self.stats['queue_drops'] += 1
+
+    async def _receive_tcp(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        writer.write(REQUEST_FEED)
+        try:
+            while True:
+                packet = await read_frame(reader)
+                # Blocks while the queue is full: the socket buffer fills and the sender slows down
+                await self._queue.put((packet, time.time_ns()))
+                self.stats['max_queue'] = max(self.stats['max_queue'], self._queue.qsize())
+                if packet[0] == END:
+                    return
+        except asyncio.IncompleteReadError:
+            self.stats['disconnects'] += 1
+        finally:
+            writer.close()
+
+    async def _receive_udp(self):
+        loop = asyncio.get_running_loop()
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: _DatagramReceiver(self), remote_addr=(self.host, self.port))
+        try:
+            transport.sendto(REQUEST_FEED)
+            while not self.finished:
+                await asyncio.sleep(0.05)
+                self.stats['max_queue'] = max(self.stats['max_queue'], self._queue.qsize())
+        finally:
+            transport.close()
+
+    async def fetch_snapshot(self):
+        """Request the current book; returns (seq, LEVEL_DTYPE array)."""
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(REQUEST_SNAPSHOT)
+            msg_type, seq, _, levels = decode_packet(await read_frame(reader))
+        finally:
+            writer.close()
+        if msg_type != SNAPSHOT:
+            raise ValueError(f"Expected a snapshot, got message type {msg_type}")
+        return seq, levels
+
+    async def recover(self):
+        """Rebuild the book from a snapshot and continue after the event it covers."""
+        seq, levels = await self.fetch_snapshot()
+        bids, asks = levels[levels['side'] == BUY], levels[levels['side'] != BUY]
+        self.lob = book_from_levels(bids['price'], bids['quantity'], asks['price'], asks['quantity'])
+        self.next_seq = seq + 1
+        self.stats['recoveries'] += 1
+
+    async def _apply(self):
+        queue = self._queue
+        while not self.finished:
+            try:
+                batch = [await asyncio.wait_for(queue.get(), self.idle_timeout)]
+            except asyncio.TimeoutError:
+                self.stats['idle_timeouts'] += 1
+                return
+            while len(batch) < self.max_batch_packets and not queue.empty():
+                batch.append(queue.get_nowait())
+            # Time the oldest packet of the batch waited between socket and applier
+            now = time.time_ns()
+            lag_us = (now - batch[0][1]) // 1000
+            self.stats['max_queue_lag_us'] = max(self.stats['max_queue_lag_us'], lag_us)
+            if latency.ENABLED:
+                for _, received_ns in batch:
+                    latency.record('feed.queue_lag', now - received_ns, kind='lag')
+
+            chunks, send_times = [], []
+            for packet, _ in batch:
+                msg_type, seq, send_ns, events = decode_packet(packet)
+                self.stats['packets'] += 1
+                if msg_type == END:
+                    self.finished = True
+                    if seq >= self.next_seq:
+                        # Lost the tail of the feed: end on the final book
+                        self._apply_events(chunks, send_times)
+                        chunks, send_times = [], []
+                        self.stats['gaps'] += 1
+                        await self.recover()
+                    break
+                if msg_type != INCREMENTAL:
+                    continue
+                if seq + len(events) <= self.next_seq:
+                    self.stats['stale_packets'] += 1  # already covered by a snapshot
+                    continue
+                if seq > self.next_seq:
+                    # Gap: apply what is consistent so far, then resynchronize
+                    self._apply_events(chunks, send_times)
+                    chunks, send_times = [], []
+                    self.stats['gaps'] += 1
+                    await self.recover()
+                    if seq + len(events) <= self.next_seq or seq > self.next_seq:
+                        continue
+                chunks.append(events[self.next_seq - seq:] if seq < self.next_seq else events)
+                send_times.append(send_ns)
+                self.next_seq = seq + len(events)
+            self._apply_events(chunks, send_times)
+
+    def _apply_events(self, chunks, send_times):
+        if not chunks:
+            return
+        start = time.perf_counter_ns()
+        events = np.concatenate(chunks) if len(chunks) > 1 else chunks[0]
+        lob = self.lob
+        ts_col = events['timestamp'].tolist()
+        kind_col = events['kind'].tolist()
+        side_col = events['side'].tolist()
+        price_col = events['price'].tolist()
+        qty_col = events['quantity'].tolist()
+        for i in range(len(ts_col)):
+            apply_event(lob, kind_col[i], side_col[i], price_col[i], qty_col[i], ts_col[i] * 1e-9)
+        if self.on_batch is not None:
+            self.on_batch(lob, events)
+        now = time.time_ns()
+        self.latencies_ns.extend(now - t for t in send_times)
+        if latency.ENABLED:
+            latency.record('feed.apply_batch', time.perf_counter_ns() - start)
+            for t in send_times:
+                latency.record('feed.send_to_apply', now - t, kind='lag')
+        self.stats['events'] += len(ts_col)
+        self.stats['trades'] += int(np.count_nonzero(events['kind'] == TRADE))
+        self.stats['batches'] += 1
+
+    async def run(self):
+        """Consume the feed until it ends (or goes idle); returns `report()`."""
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self.finished = False
+        self._started = time.perf_counter()
+        receive = self._receive_tcp() if self.transport == 'tcp' else self._receive_udp()
+        receiver = asyncio.ensure_future(receive)
+        try:
+            await self._apply()
+        finally:
+            self.finished = True
+            receiver.cancel()
+            await asyncio.gather(receiver, return_exceptions=True)
+        self.stats['elapsed'] = time.perf_counter() - self._started
+        return self.report()
+
+    def report(self):
+        """Counters plus throughput and send-to-apply latency percentiles (microseconds)."""
+        report = dict(self.stats)
+        elapsed = report.get('elapsed') or (time.perf_counter() - self._started if self._started else 0.0)
+        report['events_per_second'] = report.get('events', 0) / elapsed if elapsed else 0.0
+        if self.latencies_ns:
+            latencies = np.fromiter(self.latencies_ns, dtype=np.int64) / 1e3
+            for q in (50, 99, 99.9):
+                report[f'latency_p{q:g}_us'] = float(np.percentile(latencies, q))
+            report['latency_max_us'] = float(latencies.max())
+        report['last_seq'] = self.next_seq - 1
+        return report
@@ -0,0 +1,141 @@
+import multiprocessing as mp
+import random
+import time
+
+import numpy as np
+
+from src.data_pipeline.lob_loader import generate_initial_lob, simulate_lob_step
+from src.live.shm import TopOfBookPublisher, TopOfBookReader
+
+# Reference prices of the symbols the dashboard knows about
+DEFAULT_SYMBOLS = {'RELIANCE': 2500.0, 'TCS': 3500.0, 'INFY': 1500.0, 'HDFCBANK': 1600.0,
+                   'MOCK-DATA': 100.0}
+
+
+def _feed_process(index, mid_price, shm_name, rate, stop, publish_interval, seed):
+    """
+    Drive one symbol's book and publish its top of book every `publish_interval` seconds.
+    Runs until `stop` is set; the book itself never leaves this process.
+    """
+    random.seed(seed)
+    publisher = TopOfBookPublisher(name=shm_name)
+    try:
+        lob = generate_initial_lob(mid_price=mid_price, depth=50)
+        n_updates = 0
+        next_step = time.monotonic()
+        last_publish = 0.0
+        while not stop.is_set():
+            now = time.monotonic()
+            # Catch up on missed steps (bounded) so the feed rate holds under load
+            for _ in range(1000):
+                if now < next_step:
+                    break
+                simulate_lob_step(lob, mid_price=mid_price)
+                n_updates += 1
+                next_step += 1.0 / max(rate.value, 0.1)
+            else:
+                next_step = now
+
+            if now - last_publish >= publish_interval:
+                publisher.publish(lob, index, n_updates=n_updates)
+                last_publish = now
+            stop.wait(max(0.0, min(next_step - time.monotonic(), publish_interval)))
+    finally:
+        publisher.close()
+
+
+class MultiSymbolFeed:
+    """
+    One simulated book per symbol, each driven by its own feed process.
+
+    Feed processes publish compact top-N snapshots into one shared-memory
+    top-of-book block (one seqlocked book per symbol, see TopOfBookPublisher);
+    `snapshot()` reads a symbol without locking, so the reader's cost does not
+    depend on feed rates and adding symbols adds cores, not UI work. Other
+    processes can attach their own TopOfBookReader to `block_name`.
+    """
+
+    def __init__(self, symbols=None, levels=10, steps_per_second=20.0, publish_interval=0.1,
+                 history=300, seed=None):
+        """
+        Args:
+            symbols (dict): symbol -> reference mid price; DEFAULT_SYMBOLS if None.
+            levels (int): book levels published per side.
+            steps_per_second (float): book updates per second and symbol.
+            publish_interval (float): seconds between snapshots of one symbol.
+            history (int): published mids kept per symbol.
+        """
+        self.symbols = dict(DEFAULT_SYMBOLS if symbols is None else symbols)
+        self.names = list(self.symbols)
+        self.levels = levels
+        self.history = history
+        self.publish_interval = publish_interval
+        self.seed = seed
+        # Spawn, not fork: the dashboard forks from a multi-threaded server
+        self._ctx = mp.get_context('spawn')
+        self._rate = self._ctx.Value('d', max(float(steps_per_second), 0.1), lock=False)
+        self._publisher = None
+        self._reader = None
+        self._stop = None
+        self._processes = []
+
+    @property
+    def block_name(self):
+        """Shared-memory name of the top-of-book block (book i is self.names[i])."""
+        return self._publisher.name if self._publisher is not None else None
+
+    def start(self):
+        if self._processes:
+            return self
+        self._publisher = TopOfBookPublisher(len(self.names), self.levels, self.history)
+        self._reader = TopOfBookReader(self._publisher.name)
+        self._stop = self._ctx.Event()
+        seeds = np.random.SeedSequence(self.seed).generate_state(len(self.names))
+        for index, name in enumerate(self.names):
+            process = self._ctx.Process(
+                target=_feed_process, name=f"feed-{name}", daemon=True,
+                args=(index, self.symbols[name], self._publisher.name, self._rate,
+                      self._stop, self.publish_interval, int(seeds[index])))
+            process.start()
+            self._processes.append(process)
+        return self
+
+    def stop(self, timeout=2.0):
+        if not self._processes:
+            return
+        self._stop.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        self._reader.close()
+        self._publisher.close()
+        self._reader = self._publisher = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def alive(self):
+        """symbol -> whether its feed process is running."""
+        return {name: p.is_alive() for name, p in zip(self.names, self._processes)}
+
+    def set_rate(self, steps_per_second):
+        """Book updates per second for every symbol; feeds pick it up on their next step."""
+        self._rate.value = max(float(steps_per_second), 0.1)
+
+    def snapshot(self, symbol):
+        """
+        Latest published state of one symbol (see TopOfBookReader.read):
+        mid, spread, n_updates, timestamp, 'bids' / 'asks' as {price: volume}
+        best first and 'mid_history' oldest first.
+        """
+        return self._reader.read(self.names.index(symbol))
+
+    def snapshots(self):
+        """symbol -> snapshot for every symbol."""
+        return {name: self.snapshot(name) for name in self.names}
@@ -0,0 +1,234 @@
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class SharedArrays:
+    """
+    Named NumPy arrays laid out back to back in one SharedMemory block.
+
+    The coordinator creates the block; workers attach to it by name with the
+    same layout, so both sides read and write the same memory without any
+    pickling after start-up.
+    """
+
+    def __init__(self, layout, name=None):
+        """
+        Args:
+            layout (dict): array name -> (shape, dtype).
+            name (str): existing block to attach to; a new one is created if None.
+        """
+        self.layout = layout
+        offsets, size = {}, 0
+        for key, (shape, dtype) in layout.items():
+            size = -(-size // 8) * 8  # keep every array 8-byte aligned
+            offsets[key] = size
+            size += int(np.prod(shape)) * np.dtype(dtype).itemsize
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.arrays = {key: np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offsets[key])
+                       for key, (shape, dtype) in layout.items()}
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def __getitem__(self, key):
+        return self.arrays[key]
+
+    def close(self):
+        self.arrays = {}  # views must go before the buffer can be released
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+# Per-book scalars of a top-of-book block, in column order of the `top` array
+TOP_FIELDS = ['mid', 'spread', 'n_updates', 'timestamp',
+              'last_price', 'last_quantity', 'last_side', 'last_timestamp']
+TOP = {name: i for i, name in enumerate(TOP_FIELDS)}
+HEADER = {'header': ((4,), np.int64)}  # n_books, levels, history, layout version
+LAYOUT_VERSION = 1
+
+
+def top_of_book_layout(n_books, levels, history):
+    layout = dict(HEADER)
+    layout.update({
+        'seq': ((n_books,), np.int64),
+        'bid_px': ((n_books, levels), np.float64),
+        'bid_qty': ((n_books, levels), np.float64),
+        'ask_px': ((n_books, levels), np.float64),
+        'ask_qty': ((n_books, levels), np.float64),
+        'top': ((n_books, len(TOP_FIELDS)), np.float64),
+        'mid_history': ((n_books, max(history, 1)), np.float64),
+        'n_published': ((n_books,), np.int64),
+    })
+    return layout
+
+
+def _attach_layout(name):
+    """Layout of an existing top-of-book block, read from its header."""
+    header = SharedArrays(HEADER, name=name)
+    n_books, levels, history, version = (int(v) for v in header['header'])
+    header.close()
+    if version != LAYOUT_VERSION:
+        raise ValueError(f"Top-of-book block '{name}' has layout version {version}, "
+                         f"expected {LAYOUT_VERSION}")
+    return n_books, levels, history
+
+
+class TopOfBookPublisher:
+    """
+    Publishes top-N levels, last trade and counters of one or more books into
+    shared memory, for readers in any process (see TopOfBookReader).
+
+    Every book has a seqlock: a sequence number the writer makes odd before
+    and even after each update. Readers copy without taking any lock and retry
+    if the sequence was odd or moved during the copy, so a slow or crashed
+    reader can never block the writer. There must be a single writer per book;
+    different books of one block may be written by different processes.
+    """
+
+    def __init__(self, n_books=1, levels=10, history=0, name=None):
+        """
+        Args:
+            n_books (int): books in the block (e.g. one per symbol).
+            levels (int): price levels published per side.
+            history (int): published mids kept per book in a ring, 0 for none.
+            name (str): attach to an existing block (e.g. from a feed process)
+                instead of creating one; the shape is read from its header.
+        """
+        self.owner = name is None
+        if not self.owner:
+            n_books, levels, history = _attach_layout(name)
+        self.n_books, self.levels, self.history = n_books, levels, history
+        self.shared = SharedArrays(top_of_book_layout(n_books, levels, history), name=name)
+        if self.owner:
+            self.shared['header'][:] = (n_books, levels, history, LAYOUT_VERSION)
+            for key in ('bid_px', 'ask_px', 'top', 'mid_history'):
+                self.shared[key][:] = np.nan
+        self._seq = self.shared['seq']
+
+    @property
+    def name(self):
+        return self.shared.name
+
+    def publish(self, lob, index=0, n_updates=None, timestamp=None, last_trade=None):
+        """
+        Publish the current state of `lob` as book `index`.
+
+        Args:
+            n_updates (int): writer-side update counter, published as is.
+            timestamp (float): seconds; defaults to now.
+            last_trade (tuple): (price, quantity, side, timestamp) of the latest
+                print, side +1 buy / -1 sell (0 unknown); the previous one is
+                kept if None.
+        """
+        levels = self.levels
+        bids = sorted(lob.bids.items(), reverse=True)[:levels]
+        asks = sorted(lob.asks.items())[:levels]
+        mid, spread = lob.get_mid_price(), lob.get_spread()
+        shared = self.shared
+        top = shared['top'][index]
+
+        self._seq[index] += 1  # odd: update in progress
+        for px, qty, side in ((shared['bid_px'][index], shared['bid_qty'][index], bids),
+                              (shared['ask_px'][index], shared['ask_qty'][index], asks)):
+            px[len(side):] = np.nan
+            qty[len(side):] = 0.0
+            if side:
+                px[:len(side)], qty[:len(side)] = zip(*side)
+        top[TOP['mid']] = np.nan if mid is None else mid
+        top[TOP['spread']] = np.nan if spread is None else spread
+        if n_updates is not None:
+            top[TOP['n_updates']] = n_updates
+        top[TOP['timestamp']] = time.time() if timestamp is None else timestamp
+        if last_trade is not None:
+            top[TOP['last_price']:TOP['last_timestamp'] + 1] = last_trade
+        if self.history:
+            n_published = shared['n_published'][index]
+            shared['mid_history'][index, n_published % self.history] = top[TOP['mid']]
+        shared['n_published'][index] += 1
+        self._seq[index] += 1  # even: consistent again
+
+    def close(self):
+        self._seq = None
+        self.shared.close()
+        if self.owner:
+            self.shared.unlink()
+
+
+class TopOfBookReader:
+    """
+    Lock-free reader of a TopOfBookPublisher block, usable from any process.
+
+    Reads copy a book's rows between two loads of its sequence number and
+    retry when the writer was active, so every returned snapshot is one the
+    writer actually published. `sequence(index)` is a single load, for
+    consumers that only want to act on changes.
+    """
+
+    def __init__(self, name):
+        self.n_books, self.levels, self.history = _attach_layout(name)
+        self.shared = SharedArrays(top_of_book_layout(self.n_books, self.levels, self.history),
+                                   name=name)
+        self.retries = 0
+
+    def sequence(self, index=0):
+        """Sequence number of book `index`; changes (by 2) on every publish."""
+        return int(self.shared['seq'][index])
+
+    def read(self, index=0, max_retries=10000):
+        """
+        Consistent snapshot of book `index`.
+
+        Returns:
+            dict: sequence, the TOP_FIELDS scalars (mid/spread None when a
+            side is empty), 'bids' / 'asks' as {price: volume} best first and
+            'mid_history' (oldest first, empty unless the block keeps history).
+
+        Raises:
+            TimeoutError: the writer stayed mid-update for `max_retries` attempts
+                (it most likely died while publishing).
+        """
+        shared = self.shared
+        seq = shared['seq']
+        for attempt in range(max_retries):
+            before = int(seq[index])
+            if before & 1:
+                if attempt % 100 == 99:
+                    time.sleep(0)  # let a descheduled writer finish
+                continue
+            bid_px, bid_qty = shared['bid_px'][index].copy(), shared['bid_qty'][index].copy()
+            ask_px, ask_qty = shared['ask_px'][index].copy(), shared['ask_qty'][index].copy()
+            top = shared['top'][index].copy()
+            ring = shared['mid_history'][index].copy() if self.history else None
+            n_published = int(shared['n_published'][index])
+            if int(seq[index]) == before:
+                break
+            self.retries += 1
+        else:
+            raise TimeoutError(f"Book {index} was being written during {max_retries} read attempts")
+
+        snap = {'sequence': before}
+        snap.update((name, float(top[i])) for i, name in enumerate(TOP_FIELDS))
+        for key in ('mid', 'spread'):
+            snap[key] = None if np.isnan(snap[key]) else snap[key]
+        snap['n_updates'] = 0 if np.isnan(snap['n_updates']) else int(snap['n_updates'])
+        bids, asks = ~np.isnan(bid_px), ~np.isnan(ask_px)
+        snap['bids'] = dict(zip(bid_px[bids].tolist(), bid_qty[bids].tolist()))
+        snap['asks'] = dict(zip(ask_px[asks].tolist(), ask_qty[asks].tolist()))
+        if ring is None:
+            snap['mid_history'] = np.empty(0)
+        elif n_published > self.history:
+            snap['mid_history'] = np.roll(ring, -(n_published % self.history))
+        else:
+            snap['mid_history'] = ring[:n_published]
+        return snap
+
+    def close(self):
+        self.shared.close()
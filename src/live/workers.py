@@ -0,0 +1,377 @@
+import itertools
+import threading
+import time
+import traceback
+
+import numpy as np
+
+from src.data_pipeline.event_store import ReplayCursor
+from src.data_pipeline.lob_loader import generate_initial_lob, simulate_lob_step
+from src.models.indicators import IndicatorEngine
+
+
+def book_view(lob, indicators, levels, max_points):
+    """Published part of a book plus indicators: top of book, depth and series views."""
+    depth_bids, depth_asks = lob.get_depth(levels=levels)
+    return {
+        'mid': lob.get_mid_price(),
+        'spread': lob.get_spread(),
+        'bids': depth_bids,
+        'asks': depth_asks,
+        'latest': indicators.snapshot(),
+        # Downsampled views: snapshot size stays constant however long we run
+        'history': {name: indicators.store.view(name, max_points) for name in indicators.store},
+    }
+
+
+class MarketSimulationWorker:
+    """
+    Advances the simulated book on a background thread at its own rate.
+
+    The worker owns the book and the IndicatorEngine; readers never touch
+    them. Instead the worker publishes an immutable snapshot (top of book,
+    depth, indicator histories) at most every `publish_interval` seconds by
+    swapping a single reference, so the UI can poll `snapshot()` at any rate
+    without locking or re-running the simulation.
+    """
+
+    def __init__(self, steps_per_second=10.0, mid_price=100.0, depth=50, levels=20,
+                 history=1000, max_points=300, publish_interval=0.1, publisher=None):
+        """
+        Args:
+            steps_per_second (float): simulated book updates per second.
+            depth (int): levels per side of the initial book.
+            levels (int): depth levels included in snapshots.
+            history (int): raw samples kept per series; coarser aggregates
+                extend the retained history beyond that.
+            max_points (int): point budget of each published series.
+            publish_interval (float): minimum seconds between snapshots.
+            publisher (TopOfBookPublisher): optional; the book is also published
+                there at every snapshot, for consumers in other processes.
+        """
+        self.steps_per_second = steps_per_second
+        self.publisher = publisher
+        self.last_trade = None
+        self.levels = levels
+        self.max_points = max_points
+        self.publish_interval = publish_interval
+        self.lob = generate_initial_lob(mid_price=mid_price, depth=depth)
+        self.indicators = IndicatorEngine(capacity=history)
+        self.indicators.store.add('mid')
+        self.indicators.store.add('trade_volume')
+        self.n_steps = 0
+        self.error = None
+        self._snapshot = None
+        self._stop = threading.Event()
+        self._paused = threading.Event()
+        self._thread = None
+        self._publish(time.time())
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='market-sim', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def pause(self):
+        self._paused.set()
+
+    def resume(self):
+        self._paused.clear()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive() and not self._paused.is_set()
+
+    def set_rate(self, steps_per_second):
+        self.steps_per_second = max(float(steps_per_second), 0.1)
+
+    def step(self, now=None):
+        """One book update plus the indicator updates it triggers."""
+        now = time.time() if now is None else now
+        simulate_lob_step(self.lob)
+        self.indicators.on_book_update(self.lob, now)
+        # The simulator has no trade tape, so feed a mock trade print at mid
+        # to drive the trade-based indicators (VPIN, Hawkes intensity)
+        trade_vol = np.abs(np.random.normal(100, 20))
+        mid = self.lob.get_mid_price()
+        self.indicators.on_trade(mid, trade_vol, timestamp=now)
+        if mid is not None:
+            self.last_trade = (mid, trade_vol, 0, now)
+        # Price and volume histories share the indicators' bounded store
+        if mid is not None:
+            self.indicators.store.append('mid', now, mid)
+        self.indicators.store.append('trade_volume', now, trade_vol)
+        self.n_steps += 1
+
+    def _run(self):
+        next_step = time.monotonic()
+        last_publish = 0.0
+        try:
+            while not self._stop.is_set():
+                if self._paused.is_set():
+                    self._stop.wait(0.05)
+                    next_step = time.monotonic()
+                    continue
+                # Catch up on missed steps (bounded) so the feed rate holds under load
+                now = time.monotonic()
+                for _ in range(100):
+                    if now < next_step:
+                        break
+                    self.step()
+                    next_step += 1.0 / self.steps_per_second
+                else:
+                    next_step = now
+                if now - last_publish >= self.publish_interval:
+                    self._publish(time.time())
+                    last_publish = now
+                self._stop.wait(max(0.0, min(next_step - time.monotonic(), self.publish_interval)))
+        except Exception:
+            self.error = traceback.format_exc()
+            raise
+
+    def _publish(self, wall_time):
+        snapshot = {'time': wall_time, 'n_steps': self.n_steps}
+        snapshot.update(book_view(self.lob, self.indicators, self.levels, self.max_points))
+        self._snapshot = snapshot
+        if self.publisher is not None:
+            self.publisher.publish(self.lob, n_updates=self.n_steps, timestamp=wall_time,
+                                   last_trade=self.last_trade)
+
+    def snapshot(self):
+        """Latest published state; a plain dict the caller may keep or mutate."""
+        return self._snapshot
+
+
+class ReplayPlayer:
+    """
+    Plays a recorded EventStore forward at N x event-time speed on a background thread.
+
+    Like MarketSimulationWorker it publishes immutable snapshots for the UI to
+    poll. `seek_time` jumps anywhere in the file (snapshot plus deltas, see
+    ReplayCursor) and may be called from the UI thread while playing; the
+    cursor is only ever touched under the player's lock.
+    """
+
+    def __init__(self, store, speed=10.0, levels=20, history=1000, max_points=300,
+                 publish_interval=0.1, max_events_per_tick=50000, warmup_events=2000):
+        """
+        Args:
+            store (EventStore): indexed event file to replay.
+            speed (float): event-time seconds played per wall-clock second.
+            max_events_per_tick (int): cap on events applied between two
+                publishes; when the file is busier than `speed` allows, the
+                replay clock falls back to the events actually applied.
+            warmup_events (int): indicator warm-up before every seek target.
+        """
+        self.store = store
+        self.speed = speed
+        self.levels = levels
+        self.history = history
+        self.max_points = max_points
+        self.publish_interval = publish_interval
+        self.max_events_per_tick = max_events_per_tick
+        self.cursor = ReplayCursor(store, self._new_indicators, warmup_events=warmup_events)
+        self.clock_ns = store.start_ns
+        self.lagging = False
+        self.error = None
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._playing = threading.Event()
+        self._thread = None
+        self.seek_time(store.start_ns)
+
+    def _new_indicators(self):
+        return IndicatorEngine(capacity=self.history)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='replay-player', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def play(self):
+        self._playing.set()
+
+    def pause(self):
+        self._playing.clear()
+        self._publish()
+
+    @property
+    def playing(self):
+        return self._playing.is_set()
+
+    def set_speed(self, speed):
+        self.speed = max(float(speed), 0.0)
+
+    def seek_time(self, timestamp_ns):
+        """Reposition the replay at `timestamp_ns`; the new state is published immediately."""
+        timestamp_ns = min(max(int(timestamp_ns), self.store.start_ns), self.store.end_ns)
+        with self._lock:
+            self.cursor.seek_time(timestamp_ns)
+            self.clock_ns = timestamp_ns
+            self.lagging = False
+        self._publish()
+
+    def _run(self):
+        last = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                if not self._playing.is_set():
+                    self._stop.wait(0.05)
+                    last = time.monotonic()
+                    continue
+                now = time.monotonic()
+                with self._lock:
+                    target = self.clock_ns + int((now - last) * self.speed * 1e9)
+                    applied = self.cursor.advance_to(target, max_events=self.max_events_per_tick)
+                    self.lagging = applied >= self.max_events_per_tick
+                    self.clock_ns = self.cursor.time_ns if self.lagging else min(target, self.store.end_ns)
+                    finished = self.cursor.at_end
+                last = now
+                if finished:
+                    self._playing.clear()
+                self._publish()
+                self._stop.wait(max(0.0, self.publish_interval - (time.monotonic() - now)))
+        except Exception:
+            self.error = traceback.format_exc()
+            raise
+
+    def _publish(self):
+        with self._lock:
+            cursor = self.cursor
+            snapshot = {
+                'time_ns': self.clock_ns,
+                'position': cursor.position,
+                'n_events': len(self.store),
+                'playing': self._playing.is_set(),
+                'speed': self.speed,
+                'lagging': self.lagging,
+                'seek_seconds': cursor.last_seek_seconds,
+            }
+            snapshot.update(book_view(cursor.lob, cursor.indicators, self.levels, self.max_points))
+        self._snapshot = snapshot
+
+    def snapshot(self):
+        """Latest published state; a plain dict the caller may keep or mutate."""
+        return self._snapshot
+
+
+class Job:
+    """State of one background job, updated by the runner thread and read by the UI."""
+
+    def __init__(self, job_id, name):
+        self.id = job_id
+        self.name = name
+        self.status = 'queued'  # queued -> running -> done | failed | cancelled
+        self.progress = 0.0
+        self.message = ''
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.cancel_requested = threading.Event()
+
+    @property
+    def done(self):
+        return self.status in ('done', 'failed', 'cancelled')
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobRunner:
+    """
+    Runs heavy dashboard jobs (backtests, sensitivity grids) off the UI thread.
+
+    Jobs execute one at a time on a daemon thread, in submission order. A job
+    function receives a `progress(fraction, message='')` callback as keyword
+    argument; calling it updates the job's progress and raises JobCancelled if
+    cancellation was requested. Jobs that fan out to processes (the scenario
+    runner) keep the work itself off the GIL as well.
+    """
+
+    def __init__(self, max_jobs=50):
+        self.max_jobs = max_jobs
+        self.jobs = {}
+        self._ids = itertools.count(1)
+        self._queue = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread = threading.Thread(target=self._run, name='job-runner', daemon=True)
+        self._thread.start()
+
+    def submit(self, name, fn, *args, **kwargs):
+        """Queue fn(*args, progress=..., **kwargs); returns the Job."""
+        with self._lock:
+            job = Job(next(self._ids), name)
+            self.jobs[job.id] = job
+            self._queue.append((job, fn, args, kwargs))
+            self._trim()
+            self._wakeup.notify()
+        return job
+
+    def cancel(self, job):
+        job.cancel_requested.set()
+
+    def latest(self, name):
+        """Most recently submitted job with this name, or None."""
+        with self._lock:
+            matches = [job for job in self.jobs.values() if job.name == name]
+        return matches[-1] if matches else None
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(0, len(self.jobs) - self.max_jobs)]:
+            del self.jobs[job_id]
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._queue:
+                    self._wakeup.wait()
+                job, fn, args, kwargs = self._queue.pop(0)
+
+            if job.cancel_requested.is_set():
+                job.status = 'cancelled'
+                continue
+
+            def progress(fraction, message='', job=job):
+                job.progress = min(max(float(fraction), 0.0), 1.0)
+                job.message = message
+                if job.cancel_requested.is_set():
+                    raise JobCancelled()
+
+            job.status = 'running'
+            job.started = time.time()
+            try:
+                job.result = fn(*args, progress=progress, **kwargs)
+                job.progress = 1.0
+                job.status = 'done'
+            except JobCancelled:
+                job.status = 'cancelled'
+            except Exception:
+                job.error = traceback.format_exc()
+                job.status = 'failed'
+            job.finished = time.time()
@@ -1,5 +1,8 @@
+import math
+
 import numpy as np
-from scipy.optimize import minimize
+
+from src.analysis.result_cache import make_key
 
 class HawkesProcess:
     def __init__(self, mu=1.0, alpha=0.5, beta=1.0):
@@ -21,16 +24,22 @@ class HawkesProcess:
         if len(event_times) == 0:
             return 0
             
+        event_times = np.asarray(event_times, dtype=np.float64)
         T = event_times[-1]
         
-        # Log of intensity at each event
-        log_sum = 0
-        for i, ti in enumerate(event_times):
-            # For efficiency in loop, could optimize, but keeping simple for now
-            # Only consider events strictly before ti
-            lam = self.intensity(ti, event_times[:i])
+        # Log of intensity at each event, using the recursion
+        #   A_i = sum_{j<i} exp(-beta*(t_i - t_j)) = exp(-beta*(t_i - t_{i-1})) * (1 + A_{i-1})
+        # so lambda(t_i) = mu + alpha * A_i costs O(1) per event instead of O(i)
+        decays = np.exp(-self.beta * np.diff(event_times)).tolist()
+        mu, alpha = self.mu, self.alpha
+        if mu <= 0: return -np.inf # Safety check
+        log_sum = math.log(mu)
+        excitation = 0.0
+        for decay in decays:
+            excitation = decay * (1.0 + excitation)
+            lam = mu + alpha * excitation
             if lam <= 0: return -np.inf # Safety check
-            log_sum += np.log(lam)
+            log_sum += math.log(lam)
         
         # Compensator integral
         # Integral of lambda(t) from 0 to T
@@ -38,13 +47,24 @@ class HawkesProcess:
         # alpha * exp(-beta*(t-ti)) -> integral is (alpha/beta) * (1 - exp(-beta*(T-ti)))
         
         compensator = self.mu * T
-        for ti in event_times:
-            compensator += (self.alpha / self.beta) * (1 - np.exp(-self.beta * (T - ti)))
+        compensator += (self.alpha / self.beta) * np.sum(1 - np.exp(-self.beta * (T - event_times)))
         
         return log_sum - compensator
     
-    def fit(self, event_times):
-        """Estimate parameters via MLE"""
+    def fit(self, event_times, cache=None):
+        """
+        Estimate parameters via MLE.
+        With a ResultCache, a fit of the same events from the same starting
+        parameters is loaded instead of re-optimized.
+        """
+        if cache is not None:
+            key = make_key('hawkes_fit', events=np.asarray(event_times, dtype=np.float64),
+                           x0=[float(self.mu), float(self.alpha), float(self.beta)])
+            cached = cache.get(key)
+            if cached is not None:
+                self.mu, self.alpha, self.beta = cached['params']
+                return cached['result']
+        
         def neg_log_likelihood(params):
             mu, alpha, beta = params
             # Constraints
@@ -56,6 +76,8 @@ class HawkesProcess:
             self.mu, self.alpha, self.beta = mu, alpha, beta
             return -self.log_likelihood(event_times)
         
+        from scipy.optimize import minimize  # deferred: scipy is only needed to fit
+        
         # Initial guess
         x0 = [max(0.1, self.mu), max(0.1, self.alpha), max(0.1, self.beta)]
         
@@ -66,6 +88,9 @@ class HawkesProcess:
         
         if result.success:
             self.mu, self.alpha, self.beta = result.x
+        
+        if cache is not None:
+            cache.put(key, {'params': (self.mu, self.alpha, self.beta), 'result': result})
             
         return result
 
@@ -0,0 +1,320 @@
+import heapq
+import math
+import time
+
+from src.data_pipeline.ring_buffer import RingBuffer, TimeSeriesStore
+
+# name -> Indicator subclass. Populated by @register_indicator.
+INDICATOR_REGISTRY = {}
+
+
+def register_indicator(name):
+    """Class decorator that makes an indicator available to IndicatorEngine by name."""
+    def decorator(cls):
+        cls.name = name
+        INDICATOR_REGISTRY[name] = cls
+        return cls
+    return decorator
+
+
+def _normal_cdf(z):
+    # math.erf is much cheaper than scipy.stats.norm.cdf for a single scalar
+    return 0.5 * (1.0 + math.erf(z / math.sqrt(2.0)))
+
+
+class RollingMoments:
+    """O(1) rolling mean/std over the last `window` samples."""
+
+    def __init__(self, window):
+        self.window = RingBuffer(window)
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def push(self, x):
+        evicted = self.window.append(x)
+        self.total += x
+        self.total_sq += x * x
+        if evicted is not None:
+            self.total -= evicted
+            self.total_sq -= evicted * evicted
+
+    def std(self):
+        n = len(self.window)
+        if n < 2:
+            return 0.0
+        mean = self.total / n
+        var = (self.total_sq - n * mean * mean) / (n - 1)
+        return math.sqrt(var) if var > 0 else 0.0
+
+
+class Indicator:
+    """
+    Base class for streaming indicators.
+
+    Subclasses list the event types they consume in `events` ('book', 'trade')
+    and implement the matching handler. A handler returns the new indicator
+    value, or None if this event does not produce one.
+    """
+    name = None
+    events = ()
+
+    def on_book(self, lob, timestamp):
+        return None
+
+    def on_trade(self, price, quantity, side, timestamp):
+        return None
+
+
+@register_indicator('spread')
+class SpreadIndicator(Indicator):
+    events = ('book',)
+
+    def on_book(self, lob, timestamp):
+        return lob.get_spread()
+
+
+@register_indicator('microprice')
+class MicropriceIndicator(Indicator):
+    """Top-of-book volume-weighted mid: (P_b * Q_a + P_a * Q_b) / (Q_a + Q_b)."""
+    events = ('book',)
+
+    def on_book(self, lob, timestamp):
+        if lob.best_bid <= 0 or lob.best_ask == float('inf'):
+            return None
+        bid_vol = lob.bids.get(lob.best_bid, 0)
+        ask_vol = lob.asks.get(lob.best_ask, 0)
+        if bid_vol + ask_vol == 0:
+            return lob.get_mid_price()
+        return (lob.best_bid * ask_vol + lob.best_ask * bid_vol) / (bid_vol + ask_vol)
+
+
+@register_indicator('depth_imbalance')
+class DepthImbalanceIndicator(Indicator):
+    """(V_bid - V_ask) / (V_bid + V_ask) over the top `levels` price levels."""
+    events = ('book',)
+
+    def __init__(self, levels=5):
+        self.levels = levels
+
+    def on_book(self, lob, timestamp):
+        if self.levels == 1:
+            bid_vol = lob.bids.get(lob.best_bid, 0)
+            ask_vol = lob.asks.get(lob.best_ask, 0)
+        else:
+            # nlargest/nsmallest avoid the full sort done by get_depth()
+            bid_vol = sum(lob.bids[p] for p in heapq.nlargest(self.levels, lob.bids))
+            ask_vol = sum(lob.asks[p] for p in heapq.nsmallest(self.levels, lob.asks))
+        if bid_vol + ask_vol == 0:
+            return 0.0
+        return (bid_vol - ask_vol) / (bid_vol + ask_vol)
+
+
+@register_indicator('ofi')
+class OFIIndicator(Indicator):
+    """
+    Order Flow Imbalance between consecutive book events.
+    Same definition as models.microstructure.calculate_ofi_step, but keeps the
+    previous top of book itself so the LOB does not have to be copied.
+    """
+    events = ('book',)
+
+    def __init__(self):
+        self._prev = None  # (bid_price, bid_vol, ask_price, ask_vol)
+
+    def on_book(self, lob, timestamp):
+        bid_p, ask_p = lob.best_bid, lob.best_ask
+        bid_v = lob.bids.get(bid_p, 0) if bid_p > 0 else 0
+        ask_v = lob.asks.get(ask_p, 0) if ask_p < float('inf') else 0
+        curr = (bid_p, bid_v, ask_p, ask_v)
+        prev, self._prev = self._prev, curr
+        if prev is None:
+            return 0
+
+        prev_bid_p, prev_bid_v, prev_ask_p, prev_ask_v = prev
+        if bid_p > 0 and prev_bid_p > 0:
+            if bid_p > prev_bid_p:
+                ofi_bid = bid_v
+            elif bid_p < prev_bid_p:
+                ofi_bid = -prev_bid_v
+            else:
+                ofi_bid = bid_v - prev_bid_v
+        else:
+            ofi_bid = 0
+
+        if ask_p < float('inf') and prev_ask_p < float('inf'):
+            if ask_p > prev_ask_p:
+                ofi_ask = -prev_ask_v
+            elif ask_p < prev_ask_p:
+                ofi_ask = ask_v
+            else:
+                ofi_ask = ask_v - prev_ask_v
+        else:
+            ofi_ask = 0
+
+        return ofi_bid - ofi_ask
+
+
+@register_indicator('realized_vol')
+class RealizedVolIndicator(Indicator):
+    """Rolling standard deviation of mid-price log returns."""
+    events = ('book',)
+
+    def __init__(self, window=100):
+        self.moments = RollingMoments(window)
+        self._last_mid = None
+
+    def on_book(self, lob, timestamp):
+        mid = lob.get_mid_price()
+        if mid is None:
+            return None
+        if self._last_mid is not None:
+            self.moments.push(math.log(mid / self._last_mid))
+        self._last_mid = mid
+        return self.moments.std()
+
+
+@register_indicator('vpin')
+class VPINIndicator(Indicator):
+    """
+    Streaming VPIN with Bulk Volume Classification.
+    Each trade's volume is split into buy/sell with N(dP / sigma), sigma being
+    the rolling std of trade-to-trade price changes. VPIN is the ratio of the
+    rolling sums of |V_buy - V_sell| and V_buy + V_sell over `window` trades.
+    """
+    events = ('trade',)
+
+    def __init__(self, window=50):
+        self.window = window
+        self.price_moments = RollingMoments(window)
+        self.imbalance = RingBuffer(window)
+        self.volume = RingBuffer(window)
+        self.imbalance_sum = 0.0
+        self.volume_sum = 0.0
+        self._last_price = None
+
+    def on_trade(self, price, quantity, side, timestamp):
+        dp = 0.0 if self._last_price is None else price - self._last_price
+        self._last_price = price
+        self.price_moments.push(dp)
+
+        sigma = self.price_moments.std() or 1e-6
+        v_buy = quantity * _normal_cdf(dp / sigma)
+        v_sell = quantity - v_buy
+
+        imb = abs(v_buy - v_sell)
+        evicted = self.imbalance.append(imb)
+        self.imbalance_sum += imb - (evicted or 0.0)
+        evicted = self.volume.append(quantity)
+        self.volume_sum += quantity - (evicted or 0.0)
+
+        if len(self.volume) < self.window or self.volume_sum <= 0:
+            return 0.5  # neutral until a full window is available
+        return self.imbalance_sum / self.volume_sum
+
+
+@register_indicator('hawkes_intensity')
+class HawkesIntensityIndicator(Indicator):
+    """
+    Exponential-kernel Hawkes intensity of trade arrivals, updated recursively:
+    lambda(t) = mu + (lambda(t_prev) - mu) * exp(-beta * dt), plus alpha per event.
+    The value emitted at a trade is the intensity just before that trade.
+    """
+    events = ('trade',)
+
+    def __init__(self, mu=1.0, alpha=0.5, beta=1.0, model=None):
+        if model is not None:
+            mu, alpha, beta = model.mu, model.alpha, model.beta
+        self.mu, self.alpha, self.beta = mu, alpha, beta
+        self._excitation = 0.0
+        self._last_time = None
+
+    def on_trade(self, price, quantity, side, timestamp):
+        if self._last_time is not None:
+            self._excitation *= math.exp(-self.beta * (timestamp - self._last_time))
+        self._last_time = timestamp
+        value = self.mu + self._excitation
+        self._excitation += self.alpha
+        return value
+
+
+DEFAULT_INDICATORS = ('spread', 'ofi', 'vpin', 'depth_imbalance', 'microprice',
+                      'realized_vol', 'hawkes_intensity')
+
+
+class IndicatorEngine:
+    """
+    Single-pass indicator engine.
+
+    Indicators subscribe to book and/or trade events; each event is dispatched
+    once to every subscriber and the results are written into a
+    multi-resolution TimeSeriesStore, so histories stay bounded and cheap to
+    chart however long the engine runs. The engine does not care where events come from, so the same
+    instance can be fed by the live simulator, a replay, or a backtest.
+    """
+
+    def __init__(self, indicators=DEFAULT_INDICATORS, capacity=1000, bucket_sizes=(10, 100)):
+        """
+        Args:
+            indicators: iterable of registered names, or (name, params) tuples.
+            capacity (int): raw history length kept per indicator.
+            bucket_sizes (tuple): aggregation factors of the coarser history levels.
+        """
+        self.capacity = capacity
+        self.indicators = {}
+        self.store = TimeSeriesStore(capacity, bucket_sizes)
+        self._book_subscribers = []
+        self._trade_subscribers = []
+        for spec in indicators:
+            if isinstance(spec, str):
+                self.add(spec)
+            else:
+                name, params = spec
+                self.add(name, **params)
+
+    def add(self, name, **params):
+        """Instantiate a registered indicator and subscribe it to its events."""
+        if name not in INDICATOR_REGISTRY:
+            raise KeyError(f"Unknown indicator '{name}'. Registered: {sorted(INDICATOR_REGISTRY)}")
+        if name in self.indicators:
+            raise ValueError(f"Indicator '{name}' already added")
+        indicator = INDICATOR_REGISTRY[name](**params)
+        self.indicators[name] = indicator
+        self.store.add(name)
+        if 'book' in indicator.events:
+            self._book_subscribers.append(indicator)
+        if 'trade' in indicator.events:
+            self._trade_subscribers.append(indicator)
+        return indicator
+
+    def _record(self, name, value, timestamp):
+        self.store.append(name, timestamp, value)
+
+    def on_book_update(self, lob, timestamp=None):
+        """Dispatch a book change to all book subscribers."""
+        timestamp = timestamp if timestamp is not None else time.time()
+        for indicator in self._book_subscribers:
+            value = indicator.on_book(lob, timestamp)
+            if value is not None:
+                self._record(indicator.name, value, timestamp)
+
+    def on_trade(self, price, quantity, side=None, timestamp=None):
+        """Dispatch a trade print to all trade subscribers."""
+        timestamp = timestamp if timestamp is not None else time.time()
+        for indicator in self._trade_subscribers:
+            value = indicator.on_trade(price, quantity, side, timestamp)
+            if value is not None:
+                self._record(indicator.name, value, timestamp)
+
+    def latest(self, name, default=None):
+        return self.store.last(name, default)
+
+    def history(self, name, max_points=None, method='minmax'):
+        """
+        (timestamps, values) arrays for an indicator, oldest first.
+        With `max_points`, the full retained history downsampled to that budget.
+        """
+        return self.store.view(name, max_points, method)
+
+    def snapshot(self):
+        """Latest value of every indicator."""
+        return {name: self.store.last(name) for name in self.indicators}
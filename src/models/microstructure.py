@@ -1,6 +1,5 @@
 import numpy as np
 import pandas as pd
-from scipy.stats import norm
 
 def calculate_ofi_step(prev_lob, curr_lob):
     """
@@ -55,6 +54,8 @@ def calculate_vpin(volume, price_change, sigma, window=50):
     if sigma == 0:
         sigma = 1e-6
         
+    from scipy.stats import norm  # deferred: scipy.stats is slow to import
+    
     z = price_change / sigma
     prob_buy = norm.cdf(z)
     
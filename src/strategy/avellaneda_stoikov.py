@@ -52,6 +52,66 @@ class AvellanedaStoikovMarketMaker:
             'reservation': r, 
             'spread': delta
         }
+
+    def quote_array(self, mid_price, inventory, sigma, time_left, gamma=None, k=None):
+        """
+        Array-native version of `quote`.
+        
+        All arguments broadcast against each other with NumPy rules, so one call
+        can quote a whole price/inventory path or a parameter surface. Results
+        match `quote` element for element.
+        
+        Args:
+            mid_price, inventory, sigma, time_left: scalars or arrays.
+            gamma, k: optional arrays overriding the instance parameters.
+        
+        Returns:
+            dict: {'bid', 'ask', 'reservation', 'spread'} as float64 arrays of the broadcast shape.
+        """
+        gamma = np.asarray(self.gamma if gamma is None else gamma, dtype=np.float64)
+        k = np.asarray(self.k if k is None else k, dtype=np.float64)
+        mid_price = np.asarray(mid_price, dtype=np.float64)
+        inventory = np.asarray(inventory, dtype=np.float64)
+        sigma = np.asarray(sigma, dtype=np.float64)
+        time_left = np.asarray(time_left, dtype=np.float64)
+        
+        r = mid_price - inventory * gamma * (sigma**2) * time_left
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            delta = gamma * (sigma**2) * time_left + (2 / gamma) * np.log(1 + gamma / k)
+        delta = np.where(gamma < 1e-9, 0.0, np.maximum(0.0, delta))
+        
+        r, delta = np.broadcast_arrays(r, delta)
+        return {
+            'bid': np.asarray(r - delta / 2),
+            'ask': np.asarray(r + delta / 2),
+            'reservation': np.array(r),
+            'spread': np.array(delta)
+        }
+
+    def quote_grid(self, gammas, ks, mid_price, inventory, sigma, time_left):
+        """
+        Quote every (gamma, k) combination in one call.
+        
+        Returns:
+            dict of arrays shaped (len(gammas), len(ks), *state_shape), where
+            state_shape is the broadcast shape of the market-state arguments.
+        """
+        state_ndim = np.broadcast(np.asarray(mid_price), np.asarray(inventory),
+                                  np.asarray(sigma), np.asarray(time_left)).nd
+        gammas = np.asarray(gammas, dtype=np.float64).reshape((-1, 1) + (1,) * state_ndim)
+        ks = np.asarray(ks, dtype=np.float64).reshape((1, -1) + (1,) * state_ndim)
+        return self.quote_array(mid_price, inventory, sigma, time_left, gamma=gammas, k=ks)
+    
+    def set_fill_params(self, A=None, k=None):
+        """
+        Update fill-intensity parameters in place, e.g. from an online calibrator.
+        A is not used by the A-S spread itself but is kept for subclasses that need it.
+        """
+        if A is not None:
+            self.A = A
+        if k is not None:
+            self.k = k
     
     def should_adjust_quotes(self, current_inventory, max_inventory):
         """
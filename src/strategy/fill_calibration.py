@@ -0,0 +1,148 @@
+import numpy as np
+
+
+class FillIntensityCalibrator:
+    """
+    Online estimator of the exponential fill intensity lambda(delta) = A * exp(-k * delta).
+
+    Each quote observation (distance from mid, time at risk, filled or not) is
+    added to fixed-size histograms of exposure and fill counts, so recording is
+    O(1) and memory does not grow with the run. Every `refit_every`
+    observations the per-bin rates fills / exposure are fitted with a weighted
+    log-linear regression, which is O(n_bins).
+
+    Older observations can be exponentially down-weighted (`halflife`, counted
+    in observations) so the estimate tracks changing market conditions.
+
+    Quotes through mid (negative distance) are dropped rather than folded into
+    the near-touch bins, and distances beyond `max_distance` are kept in a
+    separate overflow bin that the fit ignores, since its centre is undefined.
+    """
+
+    def __init__(self, max_distance=5.0, n_bins=50, refit_every=100, halflife=None,
+                 A=1.0, k=1.5, min_fills=20):
+        """
+        Args:
+            max_distance (float): Distances beyond this fall into the overflow bin.
+            n_bins (int): Histogram resolution.
+            refit_every (int): Observations between re-estimates.
+            halflife (float): Half-life of observation weights, None for no forgetting.
+            A, k (float): Initial parameters, used until enough fills are seen.
+            min_fills (int): Minimum total fills before the first re-estimate.
+        """
+        self.max_distance = max_distance
+        self.n_bins = n_bins
+        self.bin_width = max_distance / n_bins
+        self.centers = (np.arange(n_bins) + 0.5) * self.bin_width
+        self.exposure = np.zeros(n_bins)
+        self.fills = np.zeros(n_bins)
+        self.overflow_exposure = 0.0
+        self.overflow_fills = 0.0
+        self.n_crossed = 0  # dropped observations through mid
+        self.refit_every = refit_every
+        self.min_fills = min_fills
+        self.A = A
+        self.k = k
+        self.n_observations = 0
+        self._since_refit = 0
+
+        # Forgetting without touching every bin on each record: new observations
+        # get a growing weight and the histograms are renormalized occasionally.
+        self._growth = 1.0 if halflife is None else 2.0 ** (1.0 / halflife)
+        self._weight = 1.0
+
+    def record(self, distance, filled, dt=1.0):
+        """
+        Record one quote observation.
+
+        Args:
+            distance (float): Distance of the quote from mid on its passive
+                side (mid - bid, ask - mid) when the quote was live; negative
+                distances (crossed through mid) are dropped.
+            filled (bool): Whether the quote was filled during `dt`.
+            dt (float): Time the quote was at risk.
+
+        Returns:
+            bool: True if (A, k) were re-estimated on this call.
+        """
+        if distance < 0:
+            self.n_crossed += 1
+            return False
+        i = int(distance / self.bin_width)
+        self._weight *= self._growth
+        if i < self.n_bins:
+            self.exposure[i] += self._weight * dt
+            if filled:
+                self.fills[i] += self._weight
+        else:
+            self.overflow_exposure += self._weight * dt
+            if filled:
+                self.overflow_fills += self._weight
+        if self._weight > 1e100:
+            self.exposure /= self._weight
+            self.fills /= self._weight
+            self.overflow_exposure /= self._weight
+            self.overflow_fills /= self._weight
+            self._weight = 1.0
+
+        self.n_observations += 1
+        self._since_refit += 1
+        if self._since_refit >= self.refit_every:
+            self._since_refit = 0
+            return self.estimate() is not None
+        return False
+
+    def record_quotes(self, mid_price, quotes, bid_filled, ask_filled, dt=1.0):
+        """Convenience wrapper recording both sides of an A-S style quote dict."""
+        refit = False
+        if quotes.get('bid') is not None:
+            refit |= self.record(mid_price - quotes['bid'], bid_filled, dt)
+        if quotes.get('ask') is not None:
+            refit |= self.record(quotes['ask'] - mid_price, ask_filled, dt)
+        return refit
+
+    def record_histogram(self, exposure, fills):
+        """
+        Batch version of `record` for observations already binned on this
+        calibrator's grid (e.g. counted from historical trades).
+
+        Args:
+            exposure (array): Time at risk per bin, shape (n_bins,).
+            fills (array): Fill counts per bin, shape (n_bins,).
+        """
+        self.exposure += self._weight * np.asarray(exposure, dtype=np.float64)
+        self.fills += self._weight * np.asarray(fills, dtype=np.float64)
+
+    def estimate(self):
+        """
+        Re-fit (A, k) from the histograms.
+
+        Returns:
+            tuple (A, k), or None if there is not enough data or the fit is not a
+            decaying intensity; the previous estimate is kept in that case.
+        """
+        total_fills = self.fills.sum() / self._weight
+        mask = (self.fills > 0) & (self.exposure > 0)
+        if total_fills < self.min_fills or mask.sum() < 2:
+            return None
+
+        x = self.centers[mask]
+        y = np.log(self.fills[mask] / self.exposure[mask])
+        # Poisson counts: var(log rate) ~ 1 / fills
+        w = self.fills[mask]
+        x_bar = np.average(x, weights=w)
+        y_bar = np.average(y, weights=w)
+        sxx = np.sum(w * (x - x_bar) ** 2)
+        if sxx <= 0:
+            return None
+        slope = np.sum(w * (x - x_bar) * (y - y_bar)) / sxx
+        if slope >= 0:
+            return None
+
+        self.k = float(-slope)
+        self.A = float(np.exp(y_bar - slope * x_bar))
+        return self.A, self.k
+
+    def update_strategy(self, strategy):
+        """Push the current estimate into a strategy without reconstructing it."""
+        strategy.set_fill_params(A=self.A, k=self.k)
@@ -0,0 +1,203 @@
+import collections
+import math
+
+import numpy as np
+
+from src.strategy.avellaneda_stoikov import AvellanedaStoikovMarketMaker
+
+
+class GLFTMarketMaker(AvellanedaStoikovMarketMaker):
+    """
+    Gueant-Lehalle-Fernandez-Tapia market maker with bounded inventory.
+
+    Unlike plain A-S, the optimal offsets account for the hard limit
+    |q| <= max_inventory: at the limit the strategy stops quoting the side that
+    would breach it instead of sending orders the risk check will reject.
+
+    The value function solves the linear ODE system
+        v_q'(t) = alpha * q^2 * v_q - eta * (v_{q-1} + v_{q+1}),  v_q(T) = 1
+    with alpha = k/2 * gamma * sigma^2 and eta = A * (1 + gamma/k)^-(1 + k/gamma),
+    and the optimal offsets from mid are
+        delta_bid(q) = ln(v_q / v_{q+1}) / k + ln(1 + gamma/k) / gamma
+        delta_ask(q) = ln(v_q / v_{q-1}) / k + ln(1 + gamma/k) / gamma
+    The system is solved once per sigma for every inventory level and time
+    bucket, so quoting is a table lookup. Near the bound an offset can turn
+    negative, i.e. the strategy leans through mid to unload inventory.
+    """
+
+    # Sub-steps are added until alpha * max_inventory^2 * step <= this, so the
+    # fast decay of the outer inventory levels is resolved
+    MAX_STEP_DECAY = 4.0
+
+    # Tables are keyed on sigma rounded to a geometric grid with this relative
+    # step (1%), so a sigma estimate that drifts every tick reuses a solve
+    SIGMA_GRID_STEP = 0.01
+
+    def __init__(self, gamma=0.1, k=1.5, T=1.0, A=1.0, max_inventory=100, n_time_buckets=100,
+                 max_cached_tables=32):
+        """
+        Args:
+            gamma (float): Risk aversion parameter.
+            k (float): Decay of fill intensity with distance from mid.
+            T (float): Time horizon (normalized).
+            A (float): Fill intensity at zero distance, lambda(delta) = A * exp(-k * delta).
+            max_inventory (int): Inventory bound; should match BacktestEngine.max_position.
+            n_time_buckets (int): Number of time-to-horizon buckets in the tables.
+            max_cached_tables (int): Table sets kept for distinct sigmas; the
+                least recently used is dropped beyond this.
+        """
+        super().__init__(gamma=gamma, k=k, T=T)
+        self.A = A
+        self.max_inventory = int(max_inventory)
+        self.n_time_buckets = n_time_buckets
+        self.max_cached_tables = max_cached_tables
+        self._tables = collections.OrderedDict()  # sigma -> (bid_offsets, ask_offsets, spread), LRU order
+
+    def _solve_log_v(self, sigma):
+        """
+        log v_q at every time bucket, shape (n_time_buckets, 2 * max_inventory + 1).
+
+        v_q spans hundreds of orders of magnitude across inventory levels, far
+        beyond float64, so the system is stepped backward from the horizon in
+        log space. Each step decays v_q exactly by exp(-alpha q^2 h) and adds
+        the neighbour terms integrated over the step (exponential Euler); every
+        term is positive, so nothing cancels. Each row is shifted to max 0,
+        which rescales all v_q equally and leaves the offsets unchanged.
+        """
+        Q = self.max_inventory
+        q = np.arange(-Q, Q + 1, dtype=np.float64)
+        decay_rate = self.k / 2 * self.gamma * sigma**2 * q**2
+        eta = self.A * (1 + self.gamma / self.k) ** (-(1 + self.k / self.gamma))
+
+        bucket = self.T / max(self.n_time_buckets - 1, 1)
+        n_sub = max(1, math.ceil(decay_rate.max() * bucket / self.MAX_STEP_DECAY))
+        h = bucket / n_sub
+        decay = -decay_rate * h
+        # log(eta * (1 - exp(-a h)) / a), the limit log(eta * h) at a = 0
+        rate = np.where(decay_rate > 0, decay_rate, 1.0)
+        log_feed = np.log(eta * np.where(decay_rate > 0, -np.expm1(decay) / rate, h))
+
+        log_v = np.empty((self.n_time_buckets, len(q)))
+        u = np.zeros(len(q))  # v_q(T) = 1
+        log_v[0] = u
+        neighbours = np.empty(len(q))
+        for j in range(1, self.n_time_buckets):
+            for _ in range(n_sub):
+                neighbours[1:-1] = np.logaddexp(u[:-2], u[2:])
+                neighbours[0], neighbours[-1] = u[1], u[-2]
+                u = np.logaddexp(u + decay, log_feed + neighbours)
+                u -= u.max()
+            log_v[j] = u
+        return log_v
+
+    def _solve_tables(self, sigma):
+        """
+        Offset tables of shape (n_time_buckets, 2 * max_inventory + 1); NaN
+        where a side is not quoted. The spread table at the bounds, where one
+        side is pulled, repeats the spread of the adjacent inventory level.
+        """
+        log_v = self._solve_log_v(sigma)
+        const = np.log(1 + self.gamma / self.k) / self.gamma
+        bid = np.full_like(log_v, np.nan)
+        ask = np.full_like(log_v, np.nan)
+        bid[:, :-1] = (log_v[:, :-1] - log_v[:, 1:]) / self.k + const
+        ask[:, 1:] = (log_v[:, 1:] - log_v[:, :-1]) / self.k + const
+        spread = bid + ask
+        if self.max_inventory > 0:
+            spread[:, 0], spread[:, -1] = spread[:, 1], spread[:, -2]
+        else:
+            spread[:] = 2 * const
+        return bid, ask, spread
+
+    def _sigma_key(self, sigma):
+        """Nearest point of the geometric sigma grid (ratio 1 + SIGMA_GRID_STEP)."""
+        sigma = float(sigma)
+        if sigma <= 0:
+            return 0.0
+        log_step = math.log1p(self.SIGMA_GRID_STEP)
+        return math.exp(round(math.log(sigma) / log_step) * log_step)
+
+    def tables(self, sigma):
+        """
+        Cached (bid_offsets, ask_offsets, spread) for sigma, solving on first use.
+
+        sigma is snapped to a geometric grid with SIGMA_GRID_STEP (1%) relative
+        spacing, so quotes are those of a sigma within 0.5% of the one given.
+        """
+        key = self._sigma_key(sigma)
+        if key in self._tables:
+            self._tables.move_to_end(key)
+        else:
+            self._tables[key] = self._solve_tables(key)
+            while len(self._tables) > self.max_cached_tables:
+                self._tables.popitem(last=False)
+        return self._tables[key]
+
+    def set_fill_params(self, A=None, k=None):
+        """Update fill-intensity parameters and drop the now stale tables."""
+        super().set_fill_params(A=A, k=k)
+        self._tables.clear()
+
+    def _bucket(self, time_left):
+        frac = np.clip(np.asarray(time_left, dtype=np.float64) / self.T, 0.0, 1.0)
+        return np.rint(frac * (self.n_time_buckets - 1)).astype(np.intp)
+
+    def _level(self, inventory):
+        q = np.clip(np.rint(inventory), -self.max_inventory, self.max_inventory)
+        return q.astype(np.intp) + self.max_inventory
+
+    def quote(self, mid_price, inventory, sigma, time_left):
+        """
+        Generate bid and ask quotes from the precomputed tables.
+
+        Returns:
+            dict: {'bid': float or None, 'ask': float or None, 'reservation': float, 'spread': float}
+            A side is None when quoting it would breach the inventory bound.
+        """
+        bid_table, ask_table, spread_table = self.tables(sigma)
+        j = int(self._bucket(time_left))
+        i = int(self._level(inventory))
+        delta_b = bid_table[j, i]
+        delta_a = ask_table[j, i]
+        spread = spread_table[j, i]
+
+        bid = None if np.isnan(delta_b) else mid_price - delta_b
+        ask = None if np.isnan(delta_a) else mid_price + delta_a
+        # With one side pulled, place the reservation half the spread from the live side
+        if bid is None:
+            delta_b = spread - delta_a
+        if ask is None:
+            delta_a = spread - delta_b
+
+        return {
+            'bid': bid,
+            'ask': ask,
+            'reservation': mid_price + (delta_a - delta_b) / 2,
+            'spread': spread
+        }
+
+    def quote_array(self, mid_price, inventory, sigma, time_left, gamma=None, k=None):
+        """
+        Array version of `quote`; `sigma` must be a scalar (one table set).
+        Pulled sides are NaN.
+        """
+        if gamma is not None or k is not None:
+            raise ValueError("GLFT tables are built for the instance gamma/k; use set_fill_params or a new instance")
+        bid_table, ask_table, spread_table = self.tables(sigma)
+        mid_price = np.asarray(mid_price, dtype=np.float64)
+        j, i = np.broadcast_arrays(self._bucket(time_left), self._level(inventory))
+        delta_b = bid_table[j, i]
+        delta_a = ask_table[j, i]
+        spread = spread_table[j, i]
+        bid = mid_price - delta_b
+        ask = mid_price + delta_a
+        delta_b = np.where(np.isnan(delta_b), spread - delta_a, delta_b)
+        delta_a = np.where(np.isnan(delta_a), spread - delta_b, delta_a)
+        reservation = mid_price + (delta_a - delta_b) / 2
+        bid, ask, reservation, spread = np.broadcast_arrays(bid, ask, reservation, spread)
+        return {
+            'bid': np.array(bid),
+            'ask': np.array(ask),
+            'reservation': np.array(reservation),
+            'spread': np.array(spread)
+        }
@@ -0,0 +1,59 @@
+import os
+import sys
+
+import numpy as np
+
+# Add the repo root to path (the strategy modules import via src.)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.strategy.glft import GLFTMarketMaker
+
+
+def test_glft_quotes(sigmas=(0.5, 2.0, 5.0), times_left=(1.0, 0.5, 0.1)):
+    print("Testing GLFT quotes across the inventory range...")
+    mm = GLFTMarketMaker()
+    Q = mm.max_inventory
+    inventories = np.arange(-Q, Q + 1)
+    for sigma in sigmas:
+        for time_left in times_left:
+            quotes = [mm.quote(100.0, q, sigma, time_left) for q in inventories]
+            reservation = np.array([quote['reservation'] for quote in quotes])
+            spread = np.array([quote['spread'] for quote in quotes])
+            assert np.all(np.isfinite(reservation)), f"Non-finite reservation at sigma={sigma}, t={time_left}"
+            assert np.all(np.isfinite(spread)) and np.all(spread > 0), \
+                f"Spread not finite and positive at sigma={sigma}, t={time_left}: min {spread.min()}"
+            assert np.all(np.diff(reservation) < 0), \
+                f"Reservation not decreasing in inventory at sigma={sigma}, t={time_left}"
+            assert quotes[0]['bid'] is not None and quotes[0]['ask'] is None
+            assert quotes[-1]['ask'] is not None and quotes[-1]['bid'] is None
+            for quote in quotes[1:-1]:
+                assert quote['bid'] < quote['ask'], f"Crossed quote at sigma={sigma}, t={time_left}"
+            print(f"sigma={sigma} t={time_left}: reservation {reservation[0]:.2f}..{reservation[-1]:.2f}, "
+                  f"spread {spread.min():.2f}..{spread.max():.2f}")
+
+    # No skew at the horizon, symmetric quotes around zero inventory
+    flat = [mm.quote(100.0, q, 2.0, 0.0)['reservation'] for q in inventories[1:-1]]
+    assert np.allclose(flat, 100.0)
+    mid = mm.quote(100.0, 0, 2.0, 1.0)
+    assert abs(mid['reservation'] - 100.0) < 1e-9
+
+    # Array quoting agrees with scalar quoting, including the pulled sides
+    arr = mm.quote_array(100.0, inventories, 2.0, 1.0)
+    scalar = [mm.quote(100.0, q, 2.0, 1.0) for q in inventories]
+    assert np.allclose(arr['reservation'], [s['reservation'] for s in scalar])
+    assert np.allclose(arr['spread'], [s['spread'] for s in scalar])
+    assert np.isnan(arr['ask'][0]) and np.isnan(arr['bid'][-1])
+
+    # The per-sigma table cache stays bounded when sigma changes every step
+    for sigma in np.linspace(1.0, 2.0, 3 * mm.max_cached_tables):
+        mm.tables(sigma)
+    assert len(mm._tables) == mm.max_cached_tables
+
+    # A sigma estimate that drifts within the grid step reuses the same solve
+    assert mm.tables(2.0) is mm.tables(2.0 * (1 + mm.SIGMA_GRID_STEP / 4))
+    assert mm.tables(2.0) is not mm.tables(2.0 * (1 + mm.SIGMA_GRID_STEP))
+    print("GLFT Test Passed.")
+
+
+if __name__ == "__main__":
+    test_glft_quotes()
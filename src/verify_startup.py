@@ -0,0 +1,101 @@
+import ast
+import importlib.util
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Entry point -> (import-time budget in seconds, modules it must not load at startup).
+# Budgets are for a cold interpreter on a modest machine; scale them with the
+# STARTUP_BUDGET_SCALE environment variable on slower hardware.
+ENTRY_POINTS = {
+    'dashboard/app.py': (1.5, ['scipy', 'matplotlib', 'seaborn', 'plotly']),
+    'src/verify_day3.py': (1.5, ['scipy', 'matplotlib', 'seaborn']),
+    'src/verify_day4.py': (1.5, ['scipy', 'matplotlib', 'seaborn']),
+    'src/verify_hawkes.py': (1.5, ['scipy', 'matplotlib', 'seaborn']),
+    'src/verify_risk.py': (1.0, ['scipy', 'matplotlib', 'seaborn', 'plotly']),
+    'src/analysis/sensitivity.py': (1.0, ['scipy', 'matplotlib', 'seaborn', 'plotly']),
+    'src/backtesting/batch_runner.py': (1.0, ['scipy', 'matplotlib', 'seaborn', 'plotly']),
+    'src/backtesting/replay.py': (1.0, ['scipy', 'matplotlib', 'seaborn', 'plotly']),
+    'src/live/exchange_stub.py': (1.0, ['scipy', 'matplotlib', 'seaborn', 'plotly']),
+}
+
+MEASURE = """
+import sys, time
+sys.path[:] = {paths!r} + [p for p in sys.path if p not in ('', '.')]
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+print(elapsed)
+print(','.join(sorted({{m.split('.')[0] for m in sys.modules}})))
+"""
+
+
+def top_level_imports(path):
+    """Modules a script imports at module level, i.e. on every start."""
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            modules.append(node.module)
+    return modules
+
+
+def is_available(module):
+    """Project packages always are; third-party ones may not be installed here."""
+    top = module.split('.')[0]
+    if os.path.isdir(os.path.join(ROOT, top)) or os.path.isdir(os.path.join(ROOT, 'src', top)):
+        return True
+    return importlib.util.find_spec(top) is not None
+
+
+def measure(modules):
+    """Import `modules` in a fresh interpreter; returns (seconds, top-level packages loaded)."""
+    # Reproduce the script's own path setup: `src.x` imports mean the repo root
+    # is on the path, bare `x` imports mean only src/ is
+    uses_root = any(m == 'src' or m.startswith('src.') for m in modules)
+    path = ROOT if uses_root else os.path.join(ROOT, 'src')
+    code = MEASURE.format(paths=[path], modules=modules)
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=ROOT)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1])
+    elapsed, loaded = out.stdout.strip().splitlines()[-2:]
+    return float(elapsed), set(loaded.split(','))
+
+
+def test_startup_budget():
+    print("Testing import-time budgets of entry points...")
+    scale = float(os.environ.get('STARTUP_BUDGET_SCALE', '1.0'))
+    failures = []
+    for script, (budget, forbidden) in ENTRY_POINTS.items():
+        modules = top_level_imports(os.path.join(ROOT, script))
+        missing = [m for m in modules if not is_available(m)]
+        if missing:
+            print(f"  {script:35s} measured without {', '.join(missing)} (not installed)")
+            modules = [m for m in modules if m not in missing]
+        try:
+            elapsed, loaded = measure(modules)
+        except RuntimeError as e:
+            print(f"  {script:35s} import failed: {e}  FAIL")
+            failures.append(script)
+            continue
+        heavy = sorted(set(forbidden) & loaded)
+        ok = elapsed <= budget * scale and not heavy
+        print(f"  {script:35s} {elapsed:6.3f}s (budget {budget * scale:.2f}s)"
+              + (f"  loads {', '.join(heavy)}" if heavy else "") + ("" if ok else "  FAIL"))
+        if not ok:
+            failures.append(script)
+
+    if failures:
+        print(f"Startup budget exceeded: {failures}")
+        sys.exit(1)
+    print("Startup Budget Test Passed.")
+
+
+if __name__ == "__main__":
+    test_startup_budget()
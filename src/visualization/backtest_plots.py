@@ -1,28 +1,34 @@
 import plotly.graph_objects as go
 import numpy as np
 
-def create_equity_curve(timestamps, equity_values):
+from .downsampling import DEFAULT_MAX_POINTS, line_trace, points_label
+
+def create_equity_curve(timestamps, equity_values, max_points=DEFAULT_MAX_POINTS, x_range=None):
     """
     Create an Equity Curve chart.
     
     Args:
         timestamps (list): List of timestamps.
         equity_values (list): List of equity values (PnL history).
+        max_points (int): Point budget; longer series are min-max decimated
+            (None draws every point).
+        x_range (tuple): Optional (start, end) zoom window, drawn at full
+            resolution when it fits the budget.
         
     Returns:
         plotly.graph_objects.Figure
     """
     fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=timestamps, 
-        y=equity_values, 
+    trace, n_shown, n_total = line_trace(
+        timestamps, equity_values, max_points, x_range,
         mode='lines', 
         name='Equity',
         line=dict(color='#00ff00', width=2)
-    ))
+    )
+    fig.add_trace(trace)
     
     fig.update_layout(
-        title='Strategy Equity Curve',
+        title='Strategy Equity Curve' + points_label(n_shown, n_total),
         xaxis_title='Time',
         yaxis_title='Account Equity ($)',
         template='plotly_dark',
@@ -30,13 +36,18 @@ def create_equity_curve(timestamps, equity_values):
     )
     return fig
 
-def create_drawdown_chart(timestamps, equity_values):
+def create_drawdown_chart(timestamps, equity_values, max_points=DEFAULT_MAX_POINTS, x_range=None):
     """
     Create a Drawdown chart.
     
+    Drawdown is computed on the full series before decimation, and the
+    decimation keeps each bucket's minimum, so no trough is lost.
+    
     Args:
         timestamps (list): List of timestamps.
         equity_values (list): List of equity values.
+        max_points (int): Point budget (None draws every point).
+        x_range (tuple): Optional (start, end) zoom window.
     
     Returns:
         plotly.graph_objects.Figure
@@ -52,17 +63,17 @@ def create_drawdown_chart(timestamps, equity_values):
         drawdown = np.nan_to_num(drawdown)
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=timestamps, 
-        y=drawdown, 
+    trace, n_shown, n_total = line_trace(
+        timestamps, drawdown, max_points, x_range,
         mode='lines', 
         name='Drawdown',
         fill='tozeroy',
         line=dict(color='#ff0000', width=1)
-    ))
+    )
+    fig.add_trace(trace)
     
     fig.update_layout(
-        title='Strategy Drawdown',
+        title='Strategy Drawdown' + points_label(n_shown, n_total),
         xaxis_title='Time',
         yaxis_title='Drawdown (%)',
         template='plotly_dark',
@@ -0,0 +1,131 @@
+import numpy as np
+
+
+def _numeric(x):
+    """x as float64, with datetimes as nanoseconds."""
+    x = np.asarray(x)
+    if x.dtype.kind == 'M':
+        return x.astype('datetime64[ns]').view(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def minmax_indices(y, n_out):
+    """
+    Indices of a min-max decimation of `y` to about `n_out` points.
+
+    The series is cut into n_out / 2 equal buckets and the minimum and
+    maximum of each bucket are kept (plus the first and last point), so every
+    spike and trough survives whatever the decimation factor. Fully vectorized:
+    buckets are rows of a padded 2-D view.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= max(n_out, 2):
+        return np.arange(n)
+    n_buckets = max(1, n_out // 2)
+    width = -(-n // n_buckets)
+    padded = np.empty(n_buckets * width)
+    padded[:n] = y
+    padded[n:] = y[-1]  # repeating the last value never creates a new extreme
+    rows = padded.reshape(n_buckets, width)
+    missing = np.isnan(rows)
+    lo = np.argmin(np.where(missing, np.inf, rows), axis=1)
+    hi = np.argmax(np.where(missing, -np.inf, rows), axis=1)
+    base = np.arange(n_buckets) * width
+    idx = np.concatenate(([0, n - 1], np.minimum(base + lo, n - 1), np.minimum(base + hi, n - 1)))
+    return np.unique(idx)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Indices selected by Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last point and, from each of n_out - 2 buckets, the
+    point forming the largest triangle with the previously kept point and the
+    mean of the next bucket. Visually faithful for smooth series; use
+    `minmax_indices` when isolated extremes must be kept.
+    """
+    x, y = _numeric(x), np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    prev = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        nxt_lo, nxt_hi = hi, (edges[b + 2] if b + 2 < len(edges) else n)
+        avg_x = x[nxt_lo:nxt_hi].mean()
+        avg_y = y[nxt_lo:nxt_hi].mean()
+        area = np.abs((x[prev] - avg_x) * (y[lo:hi] - y[prev]) - (x[prev] - x[lo:hi]) * (avg_y - y[prev]))
+        prev = lo + int(np.argmax(area))
+        idx[b + 1] = prev
+    return idx
+
+
+def downsample(x, y, n_out, method='minmax'):
+    """
+    Downsample a series to about `n_out` points.
+
+    Args:
+        method (str): 'minmax' (extreme-preserving) or 'lttb' (shape-preserving).
+
+    Returns:
+        (x, y) arrays; the inputs unchanged if already within budget.
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    if len(y) <= n_out:
+        return x, y
+    if method == 'minmax':
+        idx = minmax_indices(y, n_out)
+    elif method == 'lttb':
+        idx = lttb_indices(x, y, n_out)
+    else:
+        raise ValueError(f"Unknown downsampling method '{method}'")
+    return x[idx], y[idx]
+
+
+# Above this many points a trace is rendered with WebGL (go.Scattergl)
+WEBGL_THRESHOLD = 10_000
+DEFAULT_MAX_POINTS = 5_000
+
+
+def window(x, y, x_range=None):
+    """Slice a series (sorted by x) to x_range = (start, end), inclusive."""
+    x, y = np.asarray(x), np.asarray(y)
+    if x_range is None or len(x) == 0:
+        return x, y
+    start, end = (np.asarray(bound, dtype=x.dtype) for bound in x_range)
+    lo = np.searchsorted(x, start, side='left')
+    hi = np.searchsorted(x, end, side='right')
+    return x[lo:hi], y[lo:hi]
+
+
+def line_trace(x, y, max_points=DEFAULT_MAX_POINTS, x_range=None, **trace_kwargs):
+    """
+    Plotly line trace that stays light for any series length.
+
+    The series is cut to `x_range` (a zoomed window gets full resolution once
+    it fits the budget), decimated server-side with `minmax_indices` so peaks
+    and troughs are always drawn, and emitted as Scattergl when large.
+
+    Returns:
+        (trace, n_shown, n_total)
+    """
+    import plotly.graph_objects as go
+
+    x, y = window(x, y, x_range)
+    n_total = len(y)
+    if max_points is not None and n_total > max_points:
+        idx = minmax_indices(y, max_points)
+        x, y = x[idx], y[idx]
+    trace_cls = go.Scattergl if n_total > WEBGL_THRESHOLD else go.Scatter
+    return trace_cls(x=x, y=y, **trace_kwargs), len(y), n_total
+
+
+def points_label(n_shown, n_total):
+    """Title suffix telling the reader a chart is decimated."""
+    if n_shown >= n_total:
+        return ''
+    return f" ({n_shown:,} of {n_total:,} points)"
@@ -2,6 +2,8 @@ import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 
+from .downsampling import DEFAULT_MAX_POINTS, line_trace, points_label
+
 def generate_mock_lob_data():
     """Generates mock LOB data for testing visualization."""
     # Mid price around 100
@@ -116,13 +118,15 @@ def plot_depth_chart(lob_data=None):
     
     return fig
 
-def plot_spread_evolution(timestamps=None, spreads=None):
+def plot_spread_evolution(timestamps=None, spreads=None, max_points=DEFAULT_MAX_POINTS, x_range=None):
     """
     Time series of bid-ask spread.
     
     Args:
         timestamps (list): List of timestamps.
         spreads (list): List of spread values.
+        max_points (int): Point budget; longer series are min-max decimated.
+        x_range (tuple): Optional (start, end) zoom window.
     """
     if timestamps is None or spreads is None:
         # Mock data: Time series over last 5 minutes
@@ -132,16 +136,16 @@ def plot_spread_evolution(timestamps=None, spreads=None):
 
     fig = go.Figure()
     
-    fig.add_trace(go.Scatter(
-        x=timestamps,
-        y=spreads,
+    trace, n_shown, n_total = line_trace(
+        timestamps, spreads, max_points, x_range,
         mode='lines',
         name='Spread',
         line=dict(color='blue')
-    ))
+    )
+    fig.add_trace(trace)
 
     fig.update_layout(
-        title='Bid-Ask Spread Evolution',
+        title='Bid-Ask Spread Evolution' + points_label(n_shown, n_total),
         xaxis_title='Time',
         yaxis_title='Spread',
         template='plotly_white'